@@ -10,9 +10,10 @@
  * @param string $inputPath Der Pfad oder die URL zum zu parsenden Dokument
  * @param string $mode Der Ausgabemodus ('text', 'sections', 'catalog')
  * @param string $outputPath Optional: Der Pfad zur JSON-Ausgabedatei
+ * @param array $extraArgs Optional: Zusätzliche Kommandozeilenargumente für den Parser
  * @return array Das Ergebnis des Parsings als Array oder false bei Fehler
  */
-function parseDocument($inputPath, $mode = 'text', $outputPath = null) {
+function parseDocument($inputPath, $mode = 'text', $outputPath = null, $extraArgs = []) {
     // Parameter überprüfen
     if (empty($inputPath)) {
         return [
@@ -43,51 +44,69 @@ function parseDocument($inputPath, $mode = 'text', $outputPath = null) {
         ];
     }
     
+    // Wenn ein Parser-Server läuft, diesen nutzen (spart den Python-Start pro Dokument)
+    if (!$outputPath && empty($extraArgs)) {
+        $serverResult = parseDocumentViaServer($inputPath, $mode);
+        if ($serverResult !== null) {
+            return $serverResult;
+        }
+    }
+
     // Kommando konstruieren
     $pythonPath = 'python3';
     $scriptPath = __DIR__ . '/../parsers/document_parser.py';
     
     $cmd = escapeshellcmd($pythonPath) . ' ' . escapeshellarg($scriptPath) . ' ' . escapeshellarg($inputPath) . ' --mode=' . escapeshellarg($mode);
     
+    // Optional im überwachten Worker-Prozess parsen (DOC_PARSER_SUPERVISED=1): Ein hängendes
+    // oder zu großes Dokument liefert dann einen Fehler mit 'limit' (timeout, memory, cpu).
+    // Standardmäßig aus, da der zusätzliche Worker den Kaltstart etwa verdreifacht; der
+    // Parser-Server (--serve --supervised) und der Ingest verwenden ihre Worker wieder.
+    if (getenv('DOC_PARSER_SUPERVISED')) {
+        $cmd .= ' --supervised --timeout=90';
+    }
+    
     if ($outputPath) {
         $cmd .= ' --output=' . escapeshellarg($outputPath);
     }
     
-    // Umleitung von stderr nach stdout
-    $cmd .= ' 2>&1';
+    foreach ($extraArgs as $arg) {
+        $cmd .= ' ' . escapeshellarg($arg);
+    }
+    
+    // stdout enthält nur das JSON-Ergebnis; Meldungen des Parsers (stderr) landen in einer eigenen Datei
+    $diagnosticsFile = tempnam(sys_get_temp_dir(), 'doc_parser_');
+    if ($diagnosticsFile !== false) {
+        $cmd .= ' 2>' . escapeshellarg($diagnosticsFile);
+    }
     
     // Führe das Kommando aus und erfasse die Ausgabe
     $output = shell_exec($cmd);
     
-    // Überprüfe, ob es einen Fehler gab
-    if ($output === null || $output === false) {
-        return [
-            'success' => false,
-            'error' => 'Fehler bei der Ausführung des Parsers.'
-        ];
+    if ($diagnosticsFile !== false) {
+        $diagnostics = trim((string)@file_get_contents($diagnosticsFile));
+        @unlink($diagnosticsFile);
+        if ($diagnostics !== '') {
+            error_log("Dokument-Parser: " . $diagnostics);
+        }
     }
     
     // Wenn eine Ausgabedatei angegeben wurde, lade die Ergebnisse von dort
     if ($outputPath && file_exists($outputPath)) {
         $jsonResult = file_get_contents($outputPath);
+    } elseif ($output === null || $output === false) {
+        // Überprüfe, ob es einen Fehler gab
+        return [
+            'success' => false,
+            'error' => 'Fehler bei der Ausführung des Parsers.'
+        ];
     } else {
         // Andernfalls, verwende die Ausgabe des Befehls
         $jsonResult = $output;
     }
     
-    // Entferne mögliche Fehlermeldungen, die vor dem JSON-Teil stehen könnten
-    $cleanedJson = $jsonResult;
-    // Suche nach der ersten öffnenden Klammer (Array oder Objekt)
-    $jsonStartPos = strpos($jsonResult, '[');
-    if ($jsonStartPos === false) {
-        $jsonStartPos = strpos($jsonResult, '{');
-    }
-    if ($jsonStartPos !== false) {
-        $cleanedJson = substr($jsonResult, $jsonStartPos);
-    }
-    
     // Versuche, das JSON zu dekodieren
-    $result = json_decode($cleanedJson, true);
+    $result = json_decode($jsonResult, true);
     
     // Überprüfe, ob das JSON erfolgreich dekodiert wurde
     if ($result === null) {
@@ -118,9 +137,115 @@ function parseDocument($inputPath, $mode = 'text', $outputPath = null) {
     return $result;
 }
 
+/**
+ * Sendet eine Anfrage an den laufenden Parser-Server (document_parser.py --serve --socket=...)
+ *
+ * Der Socket-Pfad kann über die Umgebungsvariable DOC_PARSER_SOCKET gesetzt werden.
+ *
+ * @param string $inputPath Der aufgelöste Pfad oder die URL zum zu parsenden Dokument
+ * @param string $mode Der Ausgabemodus ('text', 'sections', 'catalog')
+ * @param int $timeout Timeout in Sekunden
+ * @param array $request Optional: Weitere Felder der Anfrage (z.B. 'action' => 'catalog_diff')
+ * @return array|null Das Ergebnis des Parsings oder null, wenn kein Server erreichbar ist
+ */
+function parseDocumentViaServer($inputPath, $mode = 'text', $timeout = 120, $request = []) {
+    $socketPath = getenv('DOC_PARSER_SOCKET') ?: '/tmp/doj_document_parser.sock';
+    if (!file_exists($socketPath)) {
+        return null;
+    }
+
+    $socket = @stream_socket_client('unix://' . $socketPath, $errno, $errstr, 2);
+    if ($socket === false) {
+        return null;
+    }
+    stream_set_timeout($socket, $timeout);
+
+    $request = json_encode(array_merge(['action' => 'parse', 'input' => $inputPath, 'mode' => $mode], $request));
+    fwrite($socket, $request . "\n");
+    $line = fgets($socket);
+    fclose($socket);
+
+    if ($line === false) {
+        error_log("Parser-Server hat nicht geantwortet: " . $socketPath);
+        return null;
+    }
+
+    $response = json_decode($line, true);
+    if (!is_array($response)) {
+        error_log("Ungültige Antwort vom Parser-Server: " . json_last_error_msg());
+        return null;
+    }
+
+    if (empty($response['success'])) {
+        $error = [
+            'success' => false,
+            'error' => isset($response['error']) ? $response['error'] : 'Unbekannter Fehler'
+        ];
+        if (isset($response['limit'])) {
+            // Vom überwachten Server (--serve --supervised) überschrittenes Limit
+            $error['limit'] = $response['limit'];
+        }
+        return $error;
+    }
+
+    return $response['result'];
+}
+
+/**
+ * Gleicht die Bußgeldkatalog-Einträge eines Dokuments mit einer Katalogdatei ab
+ * 
+ * Liefert nur die Änderungen (added, changed, removed) und schreibt sie auf Wunsch
+ * gesperrt und atomar in die Katalogdatei (siehe parsers/catalog_diff.py).
+ * 
+ * @param string $inputPath Der Pfad oder die URL zum zu parsenden Dokument
+ * @param string $catalogFile Der Pfad zur Katalogdatei
+ * @param bool $apply Ob die Änderungen in die Katalogdatei geschrieben werden sollen
+ * @param bool $removals Ob Einträge, die im Dokument fehlen, gelöscht werden sollen
+ * @return array Das Ergebnis des Abgleichs oder ein Fehler-Array
+ */
+function diffFineCatalog($inputPath, $catalogFile, $apply = false, $removals = false) {
+    if (!preg_match('~^https?://~i', $inputPath) && realpath($inputPath) !== false) {
+        $inputPath = realpath($inputPath);
+    }
+    
+    $serverResult = parseDocumentViaServer($inputPath, 'catalog', 120, [
+        'action' => 'catalog_diff',
+        'catalog' => $catalogFile,
+        'apply' => $apply,
+        'remove' => $removals
+    ]);
+    if ($serverResult !== null) {
+        return $serverResult;
+    }
+    
+    $args = ['--diff-against=' . $catalogFile];
+    if ($apply) {
+        $args[] = '--apply';
+    }
+    if ($removals) {
+        $args[] = '--apply-removals';
+    }
+    return parseDocument($inputPath, 'catalog', null, $args);
+}
+
 /**
  * Importiert Bußgeldkatalog-Einträge aus einem Dokument
  * 
+ * Es werden nur neue und geänderte Einträge geschrieben; unveränderte Einträge
+ * behalten ihre ID. Ohne $merge werden Einträge, die im Dokument nicht mehr
+ * vorkommen, aus dem Katalog entfernt.
+ * 
+ * Geänderte Semantik gegenüber dem früheren Anhängen aller Einträge (siehe
+ * parsers/CHANGELOG.md und parsers/tests/test_catalog_diff.py):
+ * - Mit $merge werden Einträge mit gleicher Kategorie und gleichem Verstoß
+ *   aktualisiert statt doppelt angehängt; Einträge einer anderen Kategorie
+ *   werden nur bei einer eindeutig umbenannten Kategorie übernommen.
+ * - Ohne $merge bleiben IDs unveränderter Einträge erhalten, statt den Katalog
+ *   mit neuen IDs ab 1 zu ersetzen.
+ * - Alle Einträge werden wie bisher beim Schreiben auf die Felder
+ *   amount_min/-max, prison_days_min/-max und community_service_hours_min/-max
+ *   normalisiert.
+ * 
  * @param string $inputPath Der Pfad oder die URL zum zu parsenden Dokument
  * @param bool $merge Ob bestehende Einträge beibehalten werden sollen
  * @return array Statusnachricht und Anzahl der importierten Einträge
@@ -129,19 +254,23 @@ function importFineCatalog($inputPath, $merge = true) {
     // Datei für den Bußgeldkatalog
     $fineCatalogFile = __DIR__ . '/../data/fine_catalog.json';
     
-    // Parsen des Dokuments im Katalog-Modus
-    $parseResult = parseDocument($inputPath, 'catalog');
+    // Parsen des Dokuments und Abgleich mit dem bestehenden Katalog
+    $diff = diffFineCatalog($inputPath, $fineCatalogFile, true, !$merge);
     
-    if (!is_array($parseResult) || isset($parseResult['success']) && $parseResult['success'] === false) {
+    if (!is_array($diff) || empty($diff['success']) || !isset($diff['added'], $diff['changed'])) {
         return [
             'success' => false,
-            'message' => 'Fehler beim Parsen des Dokuments: ' . (isset($parseResult['error']) ? $parseResult['error'] : 'Unbekannter Fehler'),
+            'message' => 'Fehler beim Parsen des Dokuments: ' . (isset($diff['error']) ? $diff['error'] : 'Unbekannter Fehler'),
             'count' => 0
         ];
     }
     
+    $added = count($diff['added']);
+    $changed = count($diff['changed']);
+    $removed = !empty($diff['removals_applied']) ? count($diff['removed']) : 0;
+    
     // Wenn keine Einträge gefunden wurden
-    if (empty($parseResult)) {
+    if ($added + $changed + (int)$diff['unchanged'] === 0) {
         return [
             'success' => false,
             'message' => 'Keine Bußgeldkatalog-Einträge im Dokument gefunden.',
@@ -149,128 +278,100 @@ function importFineCatalog($inputPath, $merge = true) {
         ];
     }
     
-    // Lade den bestehenden Katalog, falls vorhanden
-    $existingCatalog = [];
-    if (file_exists($fineCatalogFile) && $merge) {
-        $existingCatalog = json_decode(file_get_contents($fineCatalogFile), true);
-        if (!is_array($existingCatalog)) {
-            $existingCatalog = [];
-        }
-    }
-
-    // Bestehende Einträge auf neue Felder und Typen normalisieren
-    foreach ($existingCatalog as &$existingEntry) {
-        if (!isset($existingEntry['amount_min'])) {
-            $existingEntry['amount_min'] = isset($existingEntry['amount']) ? (float)$existingEntry['amount'] : 0;
-        }
-        if (!isset($existingEntry['amount_max'])) {
-            $existingEntry['amount_max'] = isset($existingEntry['amount']) ? (float)$existingEntry['amount'] : $existingEntry['amount_min'];
-        }
-        if (!isset($existingEntry['community_service_hours'])) {
-            $existingEntry['community_service_hours'] = 0;
-        }
-        if (!isset($existingEntry['community_service_hours_min'])) {
-            $existingEntry['community_service_hours_min'] = (int)$existingEntry['community_service_hours'];
-        }
-        if (!isset($existingEntry['community_service_hours_max'])) {
-            $existingEntry['community_service_hours_max'] = (int)$existingEntry['community_service_hours'];
-        }
-        if (!isset($existingEntry['prison_days_min'])) {
-            $existingEntry['prison_days_min'] = isset($existingEntry['prison_days']) ? (int)$existingEntry['prison_days'] : 0;
-        }
-        if (!isset($existingEntry['prison_days_max'])) {
-            $existingEntry['prison_days_max'] = isset($existingEntry['prison_days']) ? (int)$existingEntry['prison_days'] : (int)$existingEntry['prison_days_min'];
-        }
-        $existingEntry['amount_min'] = (float)$existingEntry['amount_min'];
-        $existingEntry['amount_max'] = (float)$existingEntry['amount_max'];
-        $existingEntry['community_service_hours'] = (int)$existingEntry['community_service_hours'];
-        $existingEntry['community_service_hours_min'] = (int)$existingEntry['community_service_hours_min'];
-        $existingEntry['community_service_hours_max'] = (int)$existingEntry['community_service_hours_max'];
-        if (!isset($existingEntry['prison_days'])) {
-            $existingEntry['prison_days'] = 0;
-        }
-        $existingEntry['prison_days_min'] = (int)$existingEntry['prison_days_min'];
-        $existingEntry['prison_days_max'] = (int)$existingEntry['prison_days_max'];
-    }
-    unset($existingEntry);
-    
-    // Finde die höchste ID im bestehenden Katalog
-    $maxId = 0;
-    foreach ($existingCatalog as $entry) {
-        if (isset($entry['id']) && $entry['id'] > $maxId) {
-            $maxId = (int)$entry['id'];
-        }
-    }
+    // Protokolliere den Import für die Fehlerbehebung
+    error_log(sprintf("Bußgeldkatalog-Import: %d neu, %d geändert, %d unverändert, %d entfernt",
+                      $added, $changed, (int)$diff['unchanged'], $removed));
     
-    // Füge neue Einträge hinzu und setze IDs
-    $newEntries = [];
-    foreach ($parseResult as $entry) {
-        // Ignoriere Einträge ohne 'violation'-Feld
-        if (!isset($entry['violation']) || empty($entry['violation'])) {
-            continue;
-        }
-        
-        // Stelle sicher, dass alle erforderlichen Felder existieren
-        if (!isset($entry['category'])) $entry['category'] = 'Allgemein';
-        if (!isset($entry['description'])) $entry['description'] = $entry['violation'];
-        if (!isset($entry['amount'])) $entry['amount'] = 0;
-        if (!isset($entry['amount_min'])) $entry['amount_min'] = isset($entry['amount']) ? (float)$entry['amount'] : 0;
-        if (!isset($entry['amount_max'])) $entry['amount_max'] = isset($entry['amount']) ? (float)$entry['amount'] : $entry['amount_min'];
-        if (!isset($entry['community_service_hours'])) $entry['community_service_hours'] = 0;
-        if (!isset($entry['community_service_hours_min'])) $entry['community_service_hours_min'] = (int)$entry['community_service_hours'];
-        if (!isset($entry['community_service_hours_max'])) $entry['community_service_hours_max'] = (int)$entry['community_service_hours'];
-        if (!isset($entry['prison_days'])) $entry['prison_days'] = 0;
-        if (!isset($entry['prison_days_min'])) $entry['prison_days_min'] = (int)$entry['prison_days'];
-        if (!isset($entry['prison_days_max'])) $entry['prison_days_max'] = (int)$entry['prison_days'];
-        if (!isset($entry['notes'])) $entry['notes'] = '';
+    return [
+        'success' => true,
+        'message' => sprintf('%d Einträge erfolgreich importiert (%d neu, %d geändert, %d unverändert).', $added + $changed, $added, $changed, (int)$diff['unchanged'])
+            . ($merge ? ' Bestehende Einträge wurden beibehalten.' : ' ' . $removed . ' nicht mehr enthaltene Einträge wurden entfernt.'),
+        'count' => $added + $changed,
+        'added' => $added,
+        'changed' => $changed,
+        'removed' => $removed,
+        'unchanged' => (int)$diff['unchanged']
+    ];
+}
 
-        // Typkonvertierungen und Ableitung eines kompatiblen Einzelbetrags
-        $entry['amount_min'] = (float)$entry['amount_min'];
-        $entry['amount_max'] = (float)$entry['amount_max'];
-        $entry['amount'] = isset($entry['amount']) ? (float)$entry['amount'] : (float)$entry['amount_max'];
-        if ($entry['amount'] === 0 && $entry['amount_max'] > 0) {
-            $entry['amount'] = (float)$entry['amount_max'];
-        }
-        if ($entry['amount_min'] > 0 && $entry['amount_max'] === 0) {
-            $entry['amount_max'] = $entry['amount_min'];
-        }
-        $entry['community_service_hours'] = (int)$entry['community_service_hours'];
-        $entry['community_service_hours_min'] = (int)$entry['community_service_hours_min'];
-        $entry['community_service_hours_max'] = (int)$entry['community_service_hours_max'];
-        $entry['prison_days'] = (int)$entry['prison_days'];
-        $entry['prison_days_min'] = (int)$entry['prison_days_min'];
-        $entry['prison_days_max'] = (int)$entry['prison_days_max'];
-        
-        // Wenn eine ID bereits existiert, behalte sie bei
-        if (!isset($entry['id']) || empty($entry['id'])) {
-            $maxId++;
-            $entry['id'] = $maxId;
-        }
-        
-        $newEntries[] = $entry;
+/**
+ * Legt ein Dokument zum Import im Hintergrund im Eingangsordner des Ingest ab
+ * 
+ * Der Ingest-Prozess (document_parser.py --watch) parst die Datei und legt
+ * Ergebnis und Status im Ausgangsordner ab; der Status kann mit
+ * getDocumentImportStatus() abgefragt werden, ohne auf den Parser zu warten.
+ * Der Ordner kann über die Umgebungsvariable DOC_PARSER_INGEST_DIR gesetzt werden.
+ * 
+ * @param string $inputPath Der Pfad zum zu parsenden Dokument
+ * @param string $mode Der Ausgabemodus ('text', 'sections', 'catalog')
+ * @return array Mit 'success' und dem Namen des Auftrags ('name', z.B. "catalog/import_....html") oder einem Fehler
+ */
+function queueDocumentImport($inputPath, $mode = 'text') {
+    if (!in_array($mode, ['text', 'sections', 'catalog']) || !is_file($inputPath)) {
+        return [
+            'success' => false,
+            'error' => 'Ungültiger Modus oder Eingabedatei wurde nicht gefunden: ' . $inputPath
+        ];
     }
     
-    // Protokolliere den Import für die Fehlerbehebung
-    error_log(sprintf("Bußgeldkatalog-Import: %d Einträge geparst, %d gültige Einträge importiert", 
-                      count($parseResult), count($newEntries)));
-    
-    // Kombiniere existierende und neue Einträge
-    $combinedCatalog = $merge ? array_merge($existingCatalog, $newEntries) : $newEntries;
+    $ingestDir = getenv('DOC_PARSER_INGEST_DIR') ?: __DIR__ . '/../data/ingest';
+    $inboxDir = $ingestDir . '/inbox/' . $mode;
+    if (!is_dir($inboxDir) && !mkdir($inboxDir, 0755, true)) {
+        return [
+            'success' => false,
+            'error' => 'Eingangsordner konnte nicht angelegt werden: ' . $inboxDir
+        ];
+    }
     
-    // Speichere den aktualisierten Katalog
-    if (file_put_contents($fineCatalogFile, json_encode($combinedCatalog, JSON_PRETTY_PRINT))) {
+    // Eindeutiger Name; unter .part geschrieben und danach umbenannt, damit der Ingest keine halbe Datei liest
+    $extension = strtolower(pathinfo($inputPath, PATHINFO_EXTENSION));
+    $name = uniqid('import_', true) . ($extension !== '' ? '.' . $extension : '');
+    $partPath = $inboxDir . '/' . $name . '.part';
+    if (!copy($inputPath, $partPath) || !rename($partPath, $inboxDir . '/' . $name)) {
+        @unlink($partPath);
         return [
-            'success' => true,
-            'message' => count($newEntries) . ' Einträge erfolgreich importiert.' . ($merge ? ' Bestehende Einträge wurden beibehalten.' : ' Bestehende Einträge wurden überschrieben.'),
-            'count' => count($newEntries)
+            'success' => false,
+            'error' => 'Datei konnte nicht im Eingangsordner abgelegt werden.'
         ];
+    }
+    
+    // Der Ingest benennt Aufträge nach dem Pfad relativ zum Eingangsordner
+    return [
+        'success' => true,
+        'name' => $mode . '/' . $name
+    ];
+}
+
+/**
+ * Fragt den Status eines mit queueDocumentImport() abgelegten Dokuments ab
+ * 
+ * @param string $name Der Name des Auftrags aus queueDocumentImport() (ggf. mit Modus-Unterordner)
+ * @return array Der Status ('state': pending, queued, processing, done, error);
+ *               bei 'done' enthält 'result' das Ergebnis des Parsers
+ */
+function getDocumentImportStatus($name) {
+    // Nur ein Dateiname, optional im Unterordner eines Modus; keine anderen Pfade
+    $parts = explode('/', (string)$name, 2);
+    if (count($parts) === 2 && in_array($parts[0], ['text', 'sections', 'catalog'])) {
+        $name = $parts[0] . '/' . basename($parts[1]);
     } else {
+        $name = basename($name);
+    }
+    $outboxDir = (getenv('DOC_PARSER_INGEST_DIR') ?: __DIR__ . '/../data/ingest') . '/outbox';
+    
+    $status = json_decode((string)@file_get_contents($outboxDir . '/' . $name . '.status.json'), true);
+    if (!is_array($status)) {
+        // Noch nicht vom Ingest übernommen
         return [
-            'success' => false,
-            'message' => 'Fehler beim Speichern des Bußgeldkatalogs.',
-            'count' => 0
+            'name' => $name,
+            'state' => 'pending'
         ];
     }
+    
+    if ($status['state'] === 'done' && !empty($status['result'])) {
+        $status['result'] = json_decode((string)@file_get_contents($outboxDir . '/' . $name . '.json'), true);
+    }
+    return $status;
 }
 
 /**
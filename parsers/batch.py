@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stapelverarbeitung für den Dokument-Parser.
+
+Verarbeitet viele Dateien, Glob-Muster oder ganze Verzeichnisse in einem
+Aufruf. Die Dokumente werden mit einem begrenzten Prozesspool parallel
+geparst; für jedes Dokument wird ein NDJSON-Datensatz geschrieben, sobald es
+fertig ist:
+
+    {"index": 0, "path": "...", "mode": "catalog", "status": "ok",
+     "elapsed_ms": 12.3, "success": true, "result": [...]}
+    {"index": 1, "path": "...", "mode": "catalog", "status": "error",
+     "elapsed_ms": 0.4, "success": false, "error": "..."}
+
+Fehler einzelner Dateien brechen den Stapel nicht ab; mit --supervised
+gelten zusätzlich Zeit- und Speicherlimits je Datei (siehe supervisor.py).
+URLs werden im Hauptprozess gleichzeitig geladen (siehe
+url_fetcher.AsyncFetcher) und jeweils geparst, sobald ihre Antwort vorliegt,
+während die übrigen noch laden; die Dateien laufen derweil im Prozesspool.
+"""
+
+import os
+import sys
+import glob
+import time
+import itertools
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Anzahl der Aufträge pro Worker, die gleichzeitig eingereicht werden
+_QUEUE_FACTOR = 4
+
+# Anzahl der geladenen, noch nicht geparsten URLs (begrenzt den Speicherbedarf)
+_FETCH_WINDOW = 64
+
+# Parser-Instanz des jeweiligen Worker-Prozesses
+_worker_parser = None
+
+
+def _is_url(input_path: str) -> bool:
+    return input_path.startswith(('http://', 'https://'))
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    Löst Pfade, Glob-Muster und Verzeichnisse in eine Liste von Eingaben auf.
+
+    URLs und nicht existierende Pfade werden unverändert übernommen, damit sie
+    einen Fehler-Datensatz erhalten statt stillschweigend zu verschwinden.
+
+    Args:
+        patterns: Dateien, Verzeichnisse, Glob-Muster oder URLs
+
+    Returns:
+        Die Eingaben in stabiler Reihenfolge, ohne Duplikate
+    """
+    inputs = []
+    for pattern in patterns:
+        if _is_url(pattern):
+            inputs.append(pattern)
+        elif os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                inputs.extend(os.path.join(root, name) for name in sorted(files) if not name.startswith('.'))
+        elif glob.has_magic(pattern):
+            inputs.extend(path for path in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(path))
+        else:
+            inputs.append(pattern)
+    return list(dict.fromkeys(inputs))
+
+
+def _init_worker(make_parser: Callable):
+    global _worker_parser
+    _worker_parser = make_parser()
+
+
+def _parse_one(index: int, input_path: str, mode: str, options: Dict, doc_parser=None) -> Dict:
+    """Parst ein Dokument im Worker und erzeugt den zugehörigen Datensatz."""
+    started = time.perf_counter()
+    try:
+        result = (doc_parser or _worker_parser).process(input_path, mode, **options)
+    except Exception as e:
+        result = {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+    record = {
+        'index': index,
+        'path': input_path,
+        'mode': mode,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    if isinstance(result, dict) and result.get('success') is False:
+        record['status'] = 'error'
+        record.update(result)
+    else:
+        record['status'] = 'ok'
+        record['success'] = True
+        record['result'] = result
+    return record
+
+
+def _error_record(index: int, input_path: str, mode: str, error: Exception) -> Dict:
+    return {
+        'index': index,
+        'path': input_path,
+        'mode': mode,
+        'elapsed_ms': 0.0,
+        'status': 'error',
+        'success': False,
+        'error': str(error)
+    }
+
+
+def _iter_urls(make_parser: Callable, urls: List[Tuple[int, str]], mode: str, options: Dict,
+               fetch_options: Dict):
+    """Lädt die URLs gleichzeitig und parst jede im eigenen Prozess, sobald ihre Antwort vorliegt."""
+    doc_parser = make_parser()
+    # Gestreamte Downloads laden jede Seite erst beim Parsen, mit ihren Grenzen
+    if options.get('stream_download'):
+        for index, url in urls:
+            yield _parse_one(index, url, mode, options, doc_parser)
+        return
+
+    indices = {}
+    for index, url in urls:
+        indices.setdefault(url, []).append(index)
+    for url in doc_parser.iter_prefetched(list(indices), window=_FETCH_WINDOW, **fetch_options):
+        for index in indices[url]:
+            yield _parse_one(index, url, mode, options, doc_parser)
+
+
+def iter_batch(make_parser: Callable, inputs: List[str], mode: str = 'text',
+               options: Dict = None, jobs: int = 0, fetch_options: Dict = None, supervision: Dict = None):
+    """
+    Parst die Eingaben parallel und liefert die Datensätze in Fertigstellungsreihenfolge.
+
+    Args:
+        make_parser: Aufrufbares Objekt ohne Argumente, das einen DocumentParser
+            erzeugt (muss für den Prozesspool picklebar sein, z.B. functools.partial)
+        inputs: Die Eingaben, siehe expand_inputs()
+        mode: Ausgabemodus ('text', 'sections' oder 'catalog')
+        options: Zusätzliche Parser-Optionen (z.B. pages)
+        jobs: Anzahl der Worker-Prozesse (0 = alle CPU-Kerne, 1 = im eigenen Prozess)
+        fetch_options: Optionen für das Vorladen von URLs (max_connections, per_host, ...)
+        supervision: Limits für die überwachte Ausführung der Dateien (timeout, memory_limit_mb, ...,
+            siehe supervisor.SupervisedParser); None = Prozesspool ohne Limits
+
+    Yields:
+        Ein Datensatz pro Eingabe
+    """
+    options = dict(options or {})
+    # Kein zweiter Prozesspool pro PDF innerhalb der Batch-Worker
+    options.pop('workers', None)
+
+    urls = [(index, input_path) for index, input_path in enumerate(inputs) if _is_url(input_path)]
+    files = [(index, input_path) for index, input_path in enumerate(inputs) if not _is_url(input_path)]
+    # URLs werden im Hauptprozess geparst, während der Pool die Dateien bearbeitet
+    url_records = _iter_urls(make_parser, urls, mode, options, fetch_options or {}) if urls else ()
+
+    jobs = jobs or os.cpu_count() or 1
+    if supervision is not None:
+        if files:
+            yield from _iter_supervised(make_parser, files, mode, options, min(jobs, len(files)), supervision,
+                                        url_records)
+        else:
+            yield from url_records
+        return
+
+    if jobs == 1 or len(files) <= 1:
+        yield from url_records
+        _init_worker(make_parser)
+        for index, input_path in files:
+            yield _parse_one(index, input_path, mode, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files)), initializer=_init_worker,
+                             initargs=(make_parser,)) as executor:
+        yield from _iter_pool(executor, files, mode, jobs,
+                              lambda index, input_path: executor.submit(_parse_one, index, input_path, mode, options),
+                              url_records)
+
+
+def _iter_supervised(make_parser: Callable, files: List[Tuple[int, str]], mode: str, options: Dict,
+                     workers: int, supervision: Dict, url_records: Iterable[Dict] = ()):
+    """Parst die Dateien in überwachten Worker-Prozessen, siehe supervisor.SupervisedParser."""
+    from supervisor import SupervisedParser
+
+    # Die Threads warten nur auf die Worker-Prozesse, die eigentliche Arbeit geschieht dort
+    with SupervisedParser(make_parser, workers=workers, **supervision) as supervised, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from _iter_pool(executor, files, mode, workers,
+                              lambda index, input_path: executor.submit(_parse_one, index, input_path, mode,
+                                                                        options, supervised),
+                              url_records)
+
+
+def _iter_pool(executor, files: List[Tuple[int, str]], mode: str, jobs: int, submit: Callable,
+               url_records: Iterable[Dict] = ()):
+    """
+    Reicht die Dateien begrenzt beim Pool ein und liefert die Datensätze in Fertigstellungsreihenfolge.
+
+    Solange url_records noch Datensätze liefert, werden diese im eigenen Prozess
+    erzeugt, während der Pool arbeitet; fertige Dateien werden dazwischen geliefert.
+    """
+    queue = iter(files)
+    url_records = iter(url_records)
+    pending = {}
+
+    def fill():
+        for index, input_path in itertools.islice(queue, jobs * _QUEUE_FACTOR - len(pending)):
+            pending[submit(index, input_path)] = (index, input_path)
+
+    fill()
+    while pending or url_records is not None:
+        if url_records is not None:
+            record = next(url_records, None)
+            if record is None:
+                url_records = None
+            else:
+                yield record
+            done = [future for future in pending if future.done()]
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, input_path = pending.pop(future)
+            try:
+                yield future.result()
+            except Exception as e:
+                # z.B. ein abgestürzter Worker-Prozess
+                yield _error_record(index, input_path, mode, e)
+        fill()
+
+
+def run_batch(make_parser: Callable, patterns: Iterable[str], mode: str = 'text',
+              options: Dict = None, jobs: int = 0, out=None, fetch_options: Dict = None,
+              supervision: Dict = None) -> int:
+    """
+    Führt einen Stapel aus und schreibt die Datensätze als NDJSON.
+
+    Args:
+        make_parser: Fabrik für den DocumentParser, siehe iter_batch()
+        patterns: Dateien, Verzeichnisse, Glob-Muster oder URLs
+        mode: Ausgabemodus
+        options: Zusätzliche Parser-Optionen
+        jobs: Anzahl der Worker-Prozesse
+        out: output_writer.OutputWriter für die Datensätze (Standard: stdout)
+        fetch_options: Optionen für das Vorladen von URLs, siehe iter_batch()
+        supervision: Limits für die überwachte Ausführung, siehe iter_batch()
+
+    Returns:
+        Exit-Code (0 wenn alle Dokumente erfolgreich waren, sonst 1)
+    """
+    if out is None:
+        from output_writer import OutputWriter
+        out = OutputWriter(output_format='ndjson')
+    inputs = expand_inputs(patterns)
+    started = time.perf_counter()
+    failed = 0
+
+    for record in iter_batch(make_parser, inputs, mode, options, jobs, fetch_options, supervision):
+        if not record['success']:
+            failed += 1
+        out.write_record(record)
+
+    print(f"Batch: {len(inputs) - failed} erfolgreich, {failed} fehlgeschlagen "
+          f"in {time.perf_counter() - started:.2f} s", file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark-Suite für den Dokument-Parser.
+
+Erzeugt einen reproduzierbaren synthetischen Korpus (PDFs, HTML-Kataloge im
+Format von attached_assets/Bußgeldkatalog.html, DOCX-Kataloge, §-gegliederte
+Texte und "Verstoß:/Bußgeld:"-Textkataloge) und misst für parse_pdf,
+parse_html, parse_docx, parse_docx_catalog, extract_sections,
+iter_text_sections, extract_fine_catalog, parse_text_catalog und
+extract_fine_catalog_from_html Laufzeit, Durchsatz und Spitzenspeicher (tracemalloc, in einem eigenen Lauf).
+
+Für das Laden von URLs starten zwei lokale http.server-Instanzen (zwei Hosts),
+die jede Anfrage um --latency-ms verzögern und einen HTML-Katalog aus dem
+Korpus ausliefern. Gemessen werden fetch_sequential (ein Abruf nach dem
+anderen über die gemeinsame Session) gegen fetch_async (AsyncFetcher) sowie
+process_urls_sequential (process() je URL) gegen batch_urls (iter_batch()
+mit Vorladen über den AsyncFetcher).
+
+Die Ergebnisse werden als JSON ausgegeben und können als Baseline gespeichert
+werden. Mit --baseline schlägt das Skript fehl (Exit-Code 1), wenn ein Fall
+langsamer ist oder mehr Speicher braucht als die Toleranz erlaubt.
+
+Aufruf:
+    python3 parsers/benchmark.py [--size small|full] [--only extract_sections]
+                                 [--save-baseline baseline.json] [--baseline baseline.json]
+                                 [--latency-ms 20]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from document_parser import PARSER_VERSION, DocumentParser
+
+# Umfang des Korpus je Größe: Seiten, Tabellenzeilen, Abschnitte bzw. Katalogeinträge
+CORPUS_SIZES = {
+    'small': {
+        'pdf': [1, 10, 100],
+        'html': [100, 1000, 10000],
+        'docx': [100, 1000],
+        'sections': [100, 1000, 10000],
+        'catalog': [100, 1000, 10000]
+    },
+    'full': {
+        'pdf': [1, 10, 100, 1000],
+        'html': [100, 1000, 10000, 100000],
+        'docx': [100, 1000, 10000],
+        'sections': [100, 1000, 10000, 100000],
+        'catalog': [100, 1000, 10000, 100000]
+    }
+}
+
+# Anzahl der URLs je Größe für die Fälle mit lokalem HTTP-Server
+URL_COUNTS = {
+    'small': [16, 64],
+    'full': [16, 64, 256]
+}
+
+# Simulierte Netzwerklatenz je Anfrage in Millisekunden
+DEFAULT_LATENCY_MS = 20
+
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), 'doj_document_parser_corpus')
+
+# Startwert des Zufallsgenerators; bei Änderungen am Korpus erhöhen, damit er neu erzeugt wird
+CORPUS_SEED = 1
+
+_WORDS = ('Antrag', 'Behörde', 'Bescheid', 'Frist', 'Gericht', 'Urteil', 'Zeuge', 'Akte',
+          'Verfahren', 'Beschluss', 'Anhörung', 'Verwaltung', 'Gesetz', 'Vollzug', 'Klage')
+_OFFENSES = ('Mord', 'Totschlag', 'Körperverletzung', 'Diebstahl', 'Betrug', 'Raub', 'Erpressung',
+             'Sachbeschädigung', 'Hausfriedensbruch', 'Urkundenfälschung', 'Bestechung', 'Nötigung')
+_CATEGORIES = ('Vergehen an Personen', 'Eigentumsdelikte', 'Verkehrsdelikte', 'Waffendelikte',
+               'Delikte gegen die Staatsgewalt', 'Betäubungsmitteldelikte')
+_ROMAN = ('I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X')
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _offense(rng: random.Random, number: int) -> str:
+    return f'§{number} {rng.choice(_OFFENSES)} {rng.choice(_WORDS).lower()}'
+
+
+def _dollars(amount: int) -> str:
+    return '$' + f'{amount:,}'.replace(',', '.') + ',00'
+
+
+def write_pdf(path: str, pages: int, rng: random.Random):
+    """Schreibt ein minimales PDF mit einer Textseite pro Seite (Helvetica, ASCII)."""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>'
+         % (' '.join(f'{4 + 2 * i} 0 R' for i in range(pages)), pages)).encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+    ]
+    for page in range(pages):
+        objects.append(('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                        '/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (5 + 2 * page)).encode())
+        lines = [f'Seite {page + 1}'] + [
+            f'Paragraph {page * 40 + line + 1} Verstoss {rng.randint(1, 999)} Bussgeld {rng.randint(10, 5000)} Dollar'
+            for line in range(40)
+        ]
+        content = ('BT /F1 10 Tf 12 TL 40 800 Td ' + ' '.join(f"({line}) '" for line in lines) + ' ET').encode()
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as file:
+        file.write(output)
+
+
+def write_html_catalog(path: str, rows: int, rng: random.Random):
+    """Schreibt einen HTML-Katalog im Aufbau des Google-Sheets-Exports (Tabelle "waffle")."""
+    columns = 16
+    letters = ''.join(f'<th id="0C{i}" style="width:100px;" class="column-headers-background">{chr(65 + i)}</th>'
+                      for i in range(columns))
+    parts = [
+        '<meta http-equiv="Content-Type" content="text/html; charset=utf-8">'
+        '<style type="text/css">.ritz .waffle a { color: inherit; }'
+        + ''.join(f'.ritz .waffle .s{i}{{background-color:#ffffff;text-align:left;color:#000000;'
+                  f'font-family:"docs-Open Sans",Arial;font-size:10pt;vertical-align:bottom;}}' for i in range(20))
+        + '</style><div class="ritz grid-container" dir="ltr"><table class="waffle" cellspacing="0" cellpadding="0">'
+        f'<thead><tr><th class="row-header freezebar-origin-ltr"></th>{letters}</tr></thead><tbody>'
+    ]
+    # Spalte A bleibt wie im Original leer, die Inhalte beginnen in Spalte B
+    empty_cells = '<td class="s3"></td>' * (columns - 5)
+    row_number = 0
+
+    def row(cells: str):
+        nonlocal row_number
+        row_number += 1
+        parts.append(f'<tr style="height: 20px"><th id="0R{row_number}" style="height: 20px;" '
+                     f'class="row-headers-background"><div class="row-header-wrapper" '
+                     f'style="line-height: 20px">{row_number}</div></th>{cells}</tr>')
+
+    row('<td class="s3"></td><td class="s1" dir="ltr">*Strafgesetzbuch*</td><td class="s2">Bußgeld</td>'
+        '<td class="s2">Haftstrafe</td><td class="s2">Jusitz</td>' + empty_cells)
+    for index in range(rows):
+        if index % 50 == 0:
+            category = f'{_ROMAN[(index // 50) % len(_ROMAN)]}. {rng.choice(_CATEGORIES)}'
+            row(f'<td class="s3"></td><td class="s4">{category}</td>' + '<td class="s8"></td>' * 3 + empty_cells)
+        amount = _dollars(rng.randint(1, 200) * 50) if rng.random() > 0.1 else '-'
+        prison = str(rng.randint(5, 120)) if rng.random() > 0.2 else '-'
+        justice = 'JA' if rng.random() > 0.7 else ''
+        row(f'<td class="s3"></td><td class="s5" dir="ltr">{_offense(rng, index + 1)}</td><td class="s6">{amount}</td>'
+            f'<td class="s6">{prison}</td><td class="s7">{justice}</td>' + empty_cells)
+    parts.append('</tbody></table></div>')
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(''.join(parts))
+
+
+def write_docx_catalog(path: str, rows: int, rng: random.Random):
+    """Schreibt einen Katalog als Word-Tabelle mit Kopfzeile und Einleitungsabsätzen."""
+    import zipfile
+    from xml.sax.saxutils import escape
+
+    def paragraph(text: str) -> str:
+        return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+    def row(cells, header: bool = False) -> str:
+        properties = '<w:trPr><w:tblHeader/></w:trPr>' if header else ''
+        return '<w:tr>' + properties + ''.join(f'<w:tc>{paragraph(cell)}</w:tc>' for cell in cells) + '</w:tr>'
+
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>',
+        paragraph('Bußgeldkatalog'),
+        paragraph(_sentence(rng, 40)),
+        '<w:tbl>',
+        row(['Kategorie', 'Verstoß', 'Bußgeld', 'Haftzeit', 'Strafarbeit', 'Notizen'], header=True)
+    ]
+    for index in range(rows):
+        if index % 50 == 0:
+            category = rng.choice(_CATEGORIES)
+        low = rng.randint(1, 100) * 10
+        parts.append(row([category, _offense(rng, index + 1), f'{_dollars(low)} - {_dollars(low * 2)}',
+                          f'{rng.randint(0, 30)} Tage', f'{rng.randint(0, 20)} Stunden', _sentence(rng, 4)]))
+    parts.append('</w:tbl></w:body></w:document>')
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('word/document.xml', ''.join(parts))
+        archive.writestr('docProps/core.xml',
+                         '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/'
+                         'core-properties" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                         '<dc:title>Bußgeldkatalog</dc:title></cp:coreProperties>')
+
+
+def write_sections_text(path: str, sections: int, rng: random.Random):
+    """Schreibt einen langen, in §-Abschnitte gegliederten Gesetzestext."""
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('Präambel\n' + _sentence(rng, 40) + '\n\n')
+        for number in range(1, sections + 1):
+            file.write(f'§ {number}. {_sentence(rng, 3)}\n')
+            for paragraph in range(rng.randint(1, 4)):
+                file.write(f'({paragraph + 1}) {_sentence(rng, rng.randint(20, 60))}\n')
+            file.write('\n')
+
+
+def write_text_catalog(path: str, entries: int, rng: random.Random):
+    """Schreibt einen Textkatalog mit Blöcken aus "Verstoß:", "Bußgeld:", "Haftzeit:", ..."""
+    with open(path, 'w', encoding='utf-8') as file:
+        for index in range(entries):
+            if index % 50 == 0:
+                file.write(f'Kategorie: {rng.choice(_CATEGORIES)}\n')
+            low = rng.randint(1, 100) * 10
+            file.write(f'Verstoß: {_offense(rng, index + 1)}\n')
+            file.write(f'Bußgeld: {_dollars(low)} - {_dollars(low * 2)}\n')
+            file.write(f'Haftzeit: {rng.randint(0, 30)} Tage\n')
+            if rng.random() > 0.5:
+                file.write(f'Strafarbeit: {rng.randint(1, 20)} Stunden\n')
+            file.write(f'Notizen: {_sentence(rng, 6)}\n\n')
+
+
+_GENERATORS = {
+    'pdf': ('pdf', write_pdf),
+    'html': ('html', write_html_catalog),
+    'docx': ('docx', write_docx_catalog),
+    'sections': ('txt', write_sections_text),
+    'catalog': ('txt', write_text_catalog)
+}
+
+
+def generate_corpus(corpus_dir: str, size: str = 'small') -> Dict[str, List[Dict]]:
+    """
+    Erzeugt den synthetischen Korpus; vorhandene Dateien werden wiederverwendet.
+
+    Args:
+        corpus_dir: Zielverzeichnis
+        size: 'small' oder 'full', siehe CORPUS_SIZES
+
+    Returns:
+        Je Dokumentart eine Liste von {'path', 'size', 'bytes'}
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = {}
+    for kind, sizes in CORPUS_SIZES[size].items():
+        extension, generator = _GENERATORS[kind]
+        corpus[kind] = []
+        for count in sizes:
+            path = os.path.join(corpus_dir, f'{kind}_{count:06d}_s{CORPUS_SEED}.{extension}')
+            if not os.path.exists(path):
+                # Eigener Zufallsgenerator je Datei, damit jede Datei für sich reproduzierbar ist
+                generator(path + '.tmp', count, random.Random(f'{CORPUS_SEED}-{kind}-{count}'))
+                os.replace(path + '.tmp', path)
+            corpus[kind].append({'path': path, 'size': count, 'bytes': os.path.getsize(path)})
+    return corpus
+
+
+def _read_text(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def build_cases(corpus: Dict[str, List[Dict]], doc_parser: DocumentParser) -> List[Dict]:
+    """
+    Stellt die Messfälle zusammen; Dateien für die Textfunktionen werden vorab eingelesen.
+
+    Args:
+        corpus: Ergebnis von generate_corpus()
+        doc_parser: Die zu messende Parser-Instanz
+
+    Returns:
+        Liste von {'id', 'function', 'size', 'bytes', 'run'}
+    """
+    cases = []
+
+    def add(function: str, document: Dict, run: Callable):
+        cases.append({
+            'id': f"{function}[{document['size']}]",
+            'function': function,
+            'size': document['size'],
+            'bytes': document['bytes'],
+            'run': run
+        })
+
+    for document in corpus.get('pdf', []):
+        add('parse_pdf', document, lambda path=document['path']: doc_parser.parse_pdf(path))
+    for document in corpus.get('html', []):
+        add('parse_html', document, lambda path=document['path']: doc_parser.parse_html(path))
+    for document in corpus.get('html', []):
+        html_content = _read_text(document['path'])
+        add('extract_fine_catalog_from_html', document,
+            lambda content=html_content: doc_parser.extract_fine_catalog_from_html(content))
+    for document in corpus.get('docx', []):
+        add('parse_docx', document, lambda path=document['path']: doc_parser.parse_docx(path))
+        add('parse_docx_catalog', document, lambda path=document['path']: doc_parser.parse_docx_catalog(path))
+    for document in corpus.get('sections', []):
+        text = _read_text(document['path'])
+        add('extract_sections', document, lambda content=text: doc_parser.extract_sections(content))
+        add('iter_text_sections', document, lambda path=document['path']: list(doc_parser.iter_text_sections(path)))
+    for document in corpus.get('catalog', []):
+        text = _read_text(document['path'])
+        add('extract_fine_catalog', document, lambda content=text: doc_parser.extract_fine_catalog(content))
+        add('parse_text_catalog', document, lambda path=document['path']: doc_parser.parse_text_catalog(path))
+    return cases
+
+
+class _LatencyHandler(BaseHTTPRequestHandler):
+    """Liefert server.body nach server.latency Sekunden aus (simuliert die Latenz eines entfernten Hosts)."""
+
+    protocol_version = 'HTTP/1.1'
+    # Header und Inhalt werden getrennt gesendet; ohne TCP_NODELAY käme die Wartezeit
+    # durch verzögerte ACKs auf jede Anfrage hinzu und würde den sequentiellen Fall verfälschen
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        body = self.server.body
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_servers(body: bytes, latency: float, count: int = 2) -> List[ThreadingHTTPServer]:
+    """
+    Startet lokale HTTP-Server auf freien Ports; jeder gilt für den AsyncFetcher als eigener Host.
+
+    Args:
+        body: Die Antwort auf jede Anfrage
+        latency: Verzögerung je Anfrage in Sekunden
+        count: Anzahl der Server
+
+    Returns:
+        Die laufenden Server (mit shutdown() beenden)
+    """
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _LatencyHandler)
+        server.daemon_threads = True
+        server.body = body
+        server.latency = latency
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def build_url_cases(servers: List[ThreadingHTTPServer], counts: List[int]) -> List[Dict]:
+    """
+    Stellt die Messfälle für das Laden und Parsen von URLs zusammen.
+
+    Jeder Lauf nutzt neue URLs (Zähler im Pfad), damit keine Antwort aus einem
+    früheren Lauf wiederverwendet wird.
+
+    Args:
+        servers: Ergebnis von start_servers()
+        counts: Anzahl der URLs je Fall
+
+    Returns:
+        Liste von {'id', 'function', 'size', 'bytes', 'run'}
+    """
+    from batch import iter_batch
+    from url_fetcher import AsyncFetcher, fetch
+
+    hosts = [f'http://127.0.0.1:{server.server_address[1]}' for server in servers]
+    body_bytes = len(servers[0].body)
+    runs = iter(range(1 << 30))
+
+    def urls(count):
+        run = next(runs)
+        return [f'{hosts[number % len(hosts)]}/{run}/{number}.html' for number in range(count)]
+
+    def fetch_sequential(count):
+        for url in urls(count):
+            fetch(url).raise_for_status()
+
+    def fetch_async(count):
+        with AsyncFetcher() as fetcher:
+            for _, response in fetcher.fetch_many(urls(count)):
+                if isinstance(response, Exception):
+                    raise response
+
+    def process_urls_sequential(count):
+        doc_parser = DocumentParser()
+        for url in urls(count):
+            result = doc_parser.process(url, 'catalog')
+            if isinstance(result, dict) and result.get('success') is False:
+                return result
+
+    def batch_urls(count):
+        for record in iter_batch(DocumentParser, urls(count), 'catalog', jobs=1):
+            if not record['success']:
+                return record
+
+    cases = []
+    for count in counts:
+        for function in (fetch_sequential, fetch_async, process_urls_sequential, batch_urls):
+            cases.append({
+                'id': f'{function.__name__}[{count}]',
+                'function': function.__name__,
+                'size': count,
+                'bytes': body_bytes * count,
+                'run': partial(function, count)
+            })
+    return cases
+
+
+def measure(case: Dict, repeat: int = 3) -> Dict:
+    """
+    Misst einen Fall: beste Laufzeit aus repeat Läufen, danach ein Lauf mit tracemalloc.
+
+    Args:
+        case: Messfall aus build_cases()
+        repeat: Anzahl der Zeitmessungen
+
+    Returns:
+        Das Messergebnis des Falls
+    """
+    run = case['run']
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+        if isinstance(result, dict) and result.get('success') is False:
+            raise RuntimeError(f"{case['id']} ist fehlgeschlagen: {result.get('error')}")
+
+    # Getrennter Lauf, da tracemalloc die Laufzeit deutlich verlängert
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        'id': case['id'],
+        'function': case['function'],
+        'size': case['size'],
+        'bytes': case['bytes'],
+        'seconds': round(best, 4),
+        'mb_per_second': round(case['bytes'] / best / 1e6, 2) if best > 0 else None,
+        'peak_mb': round(peak / 1e6, 2)
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float = 0.25,
+            min_seconds: float = 0.005, min_mb: float = 1.0) -> List[Dict]:
+    """
+    Vergleicht die Ergebnisse mit einer Baseline.
+
+    Ein Fall gilt als Regression, wenn Laufzeit oder Spitzenspeicher um mehr
+    als die Toleranz über der Baseline liegen. Sehr kleine absolute Abweichungen
+    (min_seconds, min_mb) werden als Messrauschen ignoriert.
+
+    Args:
+        results: Ergebnisse aus measure()
+        baseline: Gespeicherte Baseline (Ausgabe einer früheren Messung)
+        tolerance: Erlaubte relative Verschlechterung (0.25 = 25 %)
+        min_seconds: Mindestabweichung der Laufzeit in Sekunden
+        min_mb: Mindestabweichung des Spitzenspeichers in MB
+
+    Returns:
+        Liste der Regressionen
+    """
+    reference = {result['id']: result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = reference.get(result['id'])
+        if base is None:
+            continue
+        for metric, minimum in (('seconds', min_seconds), ('peak_mb', min_mb)):
+            current, previous = result[metric], base[metric]
+            if current > previous * (1 + tolerance) and current - previous > minimum:
+                regressions.append({
+                    'id': result['id'],
+                    'metric': metric,
+                    'baseline': previous,
+                    'current': current,
+                    'change': f'+{(current / previous - 1) * 100:.0f} %' if previous else 'neu'
+                })
+    return regressions
+
+
+def main():
+    """Erzeugt den Korpus, misst alle Fälle und vergleicht sie optional mit einer Baseline."""
+    parser = argparse.ArgumentParser(description='Benchmark-Suite des Dokument-Parsers')
+    parser.add_argument('--size', choices=sorted(CORPUS_SIZES), default='small', help='Umfang des Korpus')
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR, help='Verzeichnis des synthetischen Korpus')
+    parser.add_argument('--only', action='append',
+                        help='Nur diese Funktion messen (mehrfach möglich, z.B. --only parse_pdf)')
+    parser.add_argument('--repeat', type=int, default=3, help='Anzahl der Zeitmessungen pro Fall')
+    parser.add_argument('--baseline', help='Baseline-Datei, gegen die verglichen wird')
+    parser.add_argument('--save-baseline', help='Ergebnisse als neue Baseline speichern')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Erlaubte relative Verschlechterung gegenüber der Baseline')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help='Simulierte Latenz je Anfrage der lokalen HTTP-Server in Millisekunden')
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.corpus_dir, args.size)
+    cases = build_cases(corpus, DocumentParser())
+    servers = start_servers(open(corpus['html'][0]['path'], 'rb').read(), args.latency_ms / 1000)
+    cases += build_url_cases(servers, URL_COUNTS[args.size])
+    if args.only:
+        cases = [case for case in cases if case['function'] in args.only]
+
+    results = []
+    try:
+        for case in cases:
+            result = measure(case, args.repeat)
+            results.append(result)
+            print(f"{result['id']:<40} {result['seconds']:>9.4f} s {result['mb_per_second'] or 0:>8.2f} MB/s "
+                  f"{result['peak_mb']:>9.2f} MB", file=sys.stderr)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    report = {
+        'version': PARSER_VERSION,
+        'python': sys.version.split()[0],
+        'size': args.size,
+        'results': results
+    }
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        report['regressions'] = regressions
+        report['success'] = not regressions
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
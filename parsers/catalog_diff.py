@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Abgleich geparster Bußgeldkatalog-Einträge mit einem bestehenden Katalog.
+
+Jeder Eintrag erhält einen Fingerabdruck über seine inhaltlichen Felder.
+Einträge werden über Kategorie und Verstoß (ohne Groß-/Kleinschreibung und
+überzählige Leerzeichen) einander zugeordnet; kommt ein Verstoß in einer
+Kategorie mehrfach vor, entscheidet die Reihenfolge. Danach noch offene
+Einträge einer umbenannten Kategorie werden über den (dort eindeutigen)
+Verstoß zugeordnet, sodass die Umbenennung als Änderung erscheint; Einträge
+anderer Kategorien oder Quellen werden dabei nie überschrieben. Das Ergebnis
+enthält nur die Änderungen:
+
+    {"success": true, "added": [...], "changed": [...], "removed": [...],
+     "unchanged": 9999, "applied": false}
+
+Mit apply_catalog_diff() werden die Änderungen unter einer exklusiven
+Sperre (<katalog>.lock) auf den aktuellen Stand der Datei angewendet und
+atomar geschrieben (temporäre Datei + os.replace). Unveränderte Einträge
+behalten ID und alle zusätzlichen Felder; wie bisher in importFineCatalog()
+werden alle Einträge beim Schreiben mit normalize_entry() vereinheitlicht.
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Felder, die in den Fingerabdruck eingehen, mit ihrem Typ (wie in importFineCatalog() in PHP)
+FINGERPRINT_FIELDS = (
+    ('category', str),
+    ('violation', str),
+    ('description', str),
+    ('amount', float),
+    ('amount_min', float),
+    ('amount_max', float),
+    ('prison_days', int),
+    ('prison_days_min', int),
+    ('prison_days_max', int),
+    ('community_service_hours', int),
+    ('community_service_hours_min', int),
+    ('community_service_hours_max', int),
+    ('notes', str)
+)
+
+
+def normalize_entry(entry: Dict) -> Dict:
+    """
+    Ergänzt fehlende Felder und vereinheitlicht die Typen eines Eintrags.
+
+    Entspricht der Normalisierung in importFineCatalog() (includes/document_importer.php),
+    damit Einträge aus PHP und aus dem Parser vergleichbar sind.
+
+    Args:
+        entry: Ein Katalogeintrag
+
+    Returns:
+        Eine normalisierte Kopie des Eintrags (weitere Felder wie 'id' bleiben erhalten)
+    """
+    entry = dict(entry)
+    entry.setdefault('category', 'Allgemein')
+    entry.setdefault('description', entry.get('violation', ''))
+    entry.setdefault('amount', 0)
+    entry.setdefault('amount_min', entry['amount'])
+    entry.setdefault('amount_max', entry['amount'])
+    entry.setdefault('prison_days', 0)
+    entry.setdefault('prison_days_min', entry['prison_days'])
+    entry.setdefault('prison_days_max', entry['prison_days'])
+    entry.setdefault('community_service_hours', 0)
+    entry.setdefault('community_service_hours_min', entry['community_service_hours'])
+    entry.setdefault('community_service_hours_max', entry['community_service_hours'])
+    entry.setdefault('notes', '')
+
+    for field, field_type in FINGERPRINT_FIELDS:
+        value = entry[field]
+        try:
+            entry[field] = field_type(value) if value is not None else field_type()
+        except (TypeError, ValueError):
+            entry[field] = field_type()
+
+    if entry['amount'] == 0 and entry['amount_max'] > 0:
+        entry['amount'] = entry['amount_max']
+    if entry['amount_min'] > 0 and entry['amount_max'] == 0:
+        entry['amount_max'] = entry['amount_min']
+    return entry
+
+
+def fingerprint(entry: Dict) -> str:
+    """
+    Berechnet den Fingerabdruck eines normalisierten Eintrags.
+
+    Args:
+        entry: Ergebnis von normalize_entry()
+
+    Returns:
+        Die ersten 16 Hex-Zeichen des SHA-1 über die Felder aus FINGERPRINT_FIELDS
+    """
+    material = json.dumps(list(_content(entry)), ensure_ascii=False)
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()[:16]
+
+
+def _content(entry: Dict) -> Tuple:
+    """Die Werte der Felder aus FINGERPRINT_FIELDS; gleiche Inhalte ergeben gleiche Fingerabdrücke."""
+    return tuple(entry[field] for field, _ in FINGERPRINT_FIELDS)
+
+
+def _normalize_text(value) -> str:
+    """Vereinheitlicht Groß-/Kleinschreibung und Leerzeichen für die Zuordnung."""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def _category(entry: Dict) -> str:
+    """Die vereinheitlichte Kategorie eines Eintrags (fehlende Kategorie wie in normalize_entry())."""
+    return _normalize_text(entry.get('category') or 'Allgemein')
+
+
+def _match_keys(entries: List[Dict]) -> List[Tuple]:
+    """
+    Bildet die Zuordnungsschlüssel in der Reihenfolge der Einträge.
+
+    Args:
+        entries: Die Katalogeinträge
+
+    Returns:
+        Je Eintrag ein Tupel (Kategorie, Verstoß, n-tes Vorkommen)
+    """
+    seen = {}
+    keys = []
+    for entry in entries:
+        key = (_category(entry), _normalize_text(entry.get('violation')))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        keys.append(key + (occurrence,))
+    return keys
+
+
+def _match_entries(existing: List[Dict], parsed: List[Dict]) -> Dict[int, int]:
+    """
+    Ordnet geparste Einträge bestehenden zu.
+
+    Zuerst über (Kategorie, Verstoß). Die übrigen Einträge werden nur dann allein
+    über den Verstoß zugeordnet, wenn die Kategorie umbenannt wurde: Die alte
+    Kategorie kommt im Dokument nicht mehr vor, die neue nicht im Katalog, jede
+    alte Kategorie wird genau einer neuen zugeordnet und der Verstoß ist unter
+    den offenen Einträgen auf beiden Seiten eindeutig. Einträge anderer Quellen
+    oder Kategorien werden so nicht überschrieben, sondern als neu gemeldet.
+
+    Returns:
+        Index in parsed -> Index in existing
+    """
+    existing_by_key = {key: index for index, key in enumerate(_match_keys(existing))}
+    matches = {}
+    for position, key in enumerate(_match_keys(parsed)):
+        index = existing_by_key.pop(key, None)
+        if index is not None:
+            matches[position] = index
+
+    open_positions = [position for position in range(len(parsed)) if position not in matches]
+    if not open_positions or not existing_by_key:
+        return matches
+
+    parsed_categories = {_category(entry) for entry in parsed}
+    existing_categories = {_category(entry) for entry in existing}
+
+    def unique_by_violation(entries, indices, other_categories):
+        # Verstoß -> Index, nur für eindeutige Verstöße in Kategorien, die es auf der anderen Seite nicht gibt
+        grouped = {}
+        for index in indices:
+            grouped.setdefault(_normalize_text(entries[index].get('violation')), []).append(index)
+        return {
+            violation: group[0] for violation, group in grouped.items()
+            if len(group) == 1 and _category(entries[group[0]]) not in other_categories
+        }
+
+    open_existing = unique_by_violation(existing, sorted(existing_by_key.values()), parsed_categories)
+    open_parsed = unique_by_violation(parsed, open_positions, existing_categories)
+
+    candidates = []
+    new_by_old = {}
+    old_by_new = {}
+    for violation, position in open_parsed.items():
+        index = open_existing.get(violation)
+        if index is None:
+            continue
+        old_category, new_category = _category(existing[index]), _category(parsed[position])
+        new_by_old.setdefault(old_category, set()).add(new_category)
+        old_by_new.setdefault(new_category, set()).add(old_category)
+        candidates.append((position, index, old_category, new_category))
+
+    for position, index, old_category, new_category in candidates:
+        if len(new_by_old[old_category]) == 1 and len(old_by_new[new_category]) == 1:
+            matches[position] = index
+    return matches
+
+
+def diff_catalog(existing: List[Dict], parsed: List[Dict]) -> Dict:
+    """
+    Vergleicht geparste Einträge mit einem bestehenden Katalog.
+
+    Args:
+        existing: Die Einträge des bestehenden Katalogs
+        parsed: Die Einträge aus extract_fine_catalog() bzw. extract_fine_catalog_from_html()
+
+    Returns:
+        Ein Dictionary mit 'added' (neue Einträge ohne ID), 'changed' (mit 'id',
+        'entry' und den Fingerabdrücken vorher/nachher), 'removed' (nur im
+        bestehenden Katalog) und der Anzahl 'unchanged'
+    """
+    return _diff(existing, parsed)[0]
+
+
+def _diff(existing: List[Dict], parsed: List[Dict]) -> Tuple[Dict, Dict[int, Dict], List[int]]:
+    """Wie diff_catalog(); zusätzlich die geänderten (Index -> Eintrag) und entfernten Indizes in existing."""
+    parsed = [normalize_entry(entry) for entry in parsed if entry.get('violation')]
+    matches = _match_entries(existing, parsed)
+
+    added = []
+    changed = []
+    changes = {}
+    unchanged = 0
+    for position, entry in enumerate(parsed):
+        index = matches.get(position)
+        if index is None:
+            added.append(dict(entry, fingerprint=fingerprint(entry)))
+            continue
+
+        # Fingerabdrücke werden nur für geänderte Einträge berechnet; der Vergleich der Werte genügt
+        old_entry = existing[index]
+        old_normalized = normalize_entry(old_entry)
+        if _content(old_normalized) == _content(entry):
+            unchanged += 1
+            continue
+
+        merged = dict(old_entry)
+        merged.update(entry)
+        changes[index] = merged
+        changed.append({
+            'id': old_entry.get('id'),
+            'fingerprint_before': fingerprint(old_normalized),
+            'fingerprint': fingerprint(entry),
+            'entry': merged
+        })
+
+    # Übrig sind die Einträge, die im Dokument nicht mehr vorkommen
+    matched = set(matches.values())
+    removed_indices = [index for index in range(len(existing)) if index not in matched]
+    removed = [
+        {
+            'id': existing[index].get('id'),
+            'violation': existing[index].get('violation'),
+            'fingerprint': fingerprint(normalize_entry(existing[index]))
+        }
+        for index in removed_indices
+    ]
+
+    diff = {
+        'success': True,
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+        'unchanged': unchanged
+    }
+    return diff, changes, removed_indices
+
+
+def load_catalog(catalog_path: str) -> List[Dict]:
+    """
+    Liest einen Katalog; eine fehlende oder leere Datei ergibt einen leeren Katalog.
+
+    Args:
+        catalog_path: Pfad zur JSON-Datei (z.B. data/fine_catalog.json)
+
+    Returns:
+        Die Einträge des Katalogs
+    """
+    try:
+        with open(catalog_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+    except FileNotFoundError:
+        return []
+    if not content.strip():
+        return []
+
+    catalog = json.loads(content)
+    if not isinstance(catalog, list):
+        raise ValueError(f'{catalog_path} enthält keine Liste von Katalogeinträgen')
+    return [entry for entry in catalog if isinstance(entry, dict)]
+
+
+@contextmanager
+def _locked(catalog_path: str):
+    """Hält eine exklusive Sperre auf <katalog>.lock, solange der Block läuft."""
+    with open(catalog_path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_atomic(catalog_path: str, catalog: List[Dict]):
+    """Schreibt den Katalog in eine temporäre Datei und ersetzt die alte Datei in einem Schritt."""
+    directory = os.path.dirname(os.path.abspath(catalog_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            # Wie json_encode(..., JSON_PRETTY_PRINT) in PHP
+            json.dump(catalog, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(catalog_path):
+            os.chmod(tmp_path, os.stat(catalog_path).st_mode & 0o777)
+        os.replace(tmp_path, catalog_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def apply_catalog_diff(catalog_path: str, parsed: List[Dict], remove: bool = False) -> Dict:
+    """
+    Gleicht geparste Einträge mit der Katalogdatei ab und schreibt nur bei Änderungen.
+
+    Der Abgleich erfolgt unter der Sperre gegen den aktuellen Dateiinhalt, sodass
+    gleichzeitige Importe keine Änderungen des jeweils anderen überschreiben.
+
+    Args:
+        catalog_path: Pfad zur Katalogdatei
+        parsed: Die geparsten Einträge
+        remove: Einträge, die im Dokument fehlen, aus dem Katalog löschen
+            (ohne diese Option bleiben Einträge anderer Quellen erhalten)
+
+    Returns:
+        Das Ergebnis von diff_catalog() mit 'applied' (ob geschrieben wurde)
+    """
+    with _locked(catalog_path):
+        existing = load_catalog(catalog_path)
+        diff, changes, removed_indices = _diff(existing, parsed)
+        removed_indices = set(removed_indices) if remove else set()
+
+        if not diff['added'] and not changes and not removed_indices:
+            diff['applied'] = False
+            return diff
+
+        # Wie früher in importFineCatalog(): bestehende Einträge auf alle Felder und Typen normalisieren
+        catalog = [normalize_entry(changes.get(index, entry))
+                   for index, entry in enumerate(existing) if index not in removed_indices]
+
+        max_id = max((int(entry['id']) for entry in existing if str(entry.get('id', '')).isdigit()), default=0)
+        for entry in diff['added']:
+            max_id += 1
+            entry['id'] = max_id
+            catalog.append({key: value for key, value in entry.items() if key != 'fingerprint'})
+
+        _write_atomic(catalog_path, catalog)
+        diff['applied'] = True
+        diff['removals_applied'] = bool(removed_indices)
+        return diff
+
+
+def catalog_diff_result(catalog: List[Dict], catalog_path: str, apply: bool = False,
+                        remove: bool = False) -> Dict:
+    """
+    Erzeugt die Ausgabe des Diff-Modus für geparste Katalogeinträge.
+
+    Args:
+        catalog: Die geparsten Einträge
+        catalog_path: Pfad zur bestehenden Katalogdatei
+        apply: Die Änderungen in die Datei schreiben
+        remove: Mit apply auch fehlende Einträge löschen
+
+    Returns:
+        Das Diff-Ergebnis mit 'catalog' (Pfad) und 'applied'
+    """
+    if apply:
+        result = apply_catalog_diff(catalog_path, catalog, remove)
+    else:
+        result = diff_catalog(load_catalog(catalog_path), catalog)
+        result['applied'] = False
+    result['catalog'] = catalog_path
+    return result
@@ -3,39 +3,881 @@
 
 import os
 import sys
-import json
 import re
+import codecs
 import argparse
-from typing import Dict, List, Optional, Union
+import mimetypes
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import traceback
 
-import requests
-from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
+from instrumentation import NULL_STATS, Stats
 
-class DocumentParser:
-    """Klasse zum Parsen verschiedener Dokumenttypen für das Justizsystem."""
+# Hinweis: requests, bs4 und PyPDF2 werden erst in den jeweiligen Parsern
+# importiert, damit z.B. eine Textdatei ohne deren Ladezeit verarbeitet wird.
+
+# Version des Parsers, wird u.a. im Server-Modus beim Health-Check gemeldet
+PARSER_VERSION = '1.1.0'
+
+# Unterstützte Ausgabemodi
+MODES = ['text', 'sections', 'catalog']
+
+# Modi des Volltextindex (siehe search_index.py), nur über die Kommandozeile bzw. den Server
+INDEX_MODES = ['index', 'search']
+
+# Strafrechner über einen Bußgeldkatalog (siehe fine_catalog.py), nur über die Kommandozeile
+CALCULATE_MODE = 'calculate'
+
+# PDFs mit weniger Seiten werden auch mit --workers seriell extrahiert,
+# da sich der Start der Prozesse sonst nicht lohnt
+PARALLEL_PDF_MIN_PAGES = 32
+
+# Anzahl der Bytes, die zur Inhaltserkennung vom Dateianfang gelesen werden
+SNIFF_BYTES = 2048
+
+# Größe der Blöcke (in Zeichen), in denen Textdateien für Abschnitte und Katalog gelesen werden
+TEXT_BLOCK_SIZE = 1024 * 1024
+
+# Kodierung für Bytes einer Textdatei, die kein gültiges UTF-8 sind (z.B. Exporte aus Windows-Programmen)
+TEXT_FALLBACK_ENCODING = 'cp1252'
+
+# Gewichtung der Erkennungsmerkmale: Inhalt schlägt MIME-Typ schlägt Endung
+SCORE_MAGIC = 4
+SCORE_SNIFF = 3
+SCORE_MIME = 2
+SCORE_EXTENSION = 1
+
+
+class ParserBackend:
+    """Beschreibt ein Eingabeformat mit Erkennungsmerkmalen und zugehörigem Parser."""
+
+    def __init__(self, name: str, loader: str, extensions: Tuple[str, ...] = (),
+                 mime_types: Tuple[str, ...] = (), magic: Tuple[bytes, ...] = (),
+                 sniff: Optional[Callable[[str, bytes], bool]] = None, url: bool = False,
+                 options: Tuple[str, ...] = (), catalog_loader: Optional[str] = None,
+                 sections_loader: Optional[str] = None):
+        """
+        Initialisiert das Backend.
+        
+        Args:
+            name: Kurzname des Formats (z.B. 'pdf')
+            loader: Name der DocumentParser-Methode, die das Format parst
+            extensions: Dateiendungen (kleingeschrieben, mit Punkt)
+            mime_types: MIME-Typen, wie sie mimetypes.guess_type liefert
+            magic: Bytefolgen, mit denen Dateien dieses Formats beginnen
+            sniff: Optionale Funktion (Pfad, Dateianfang) -> bool zur Inhaltserkennung
+            url: True, wenn das Backend URLs statt Dateien verarbeitet
+            options: Namen der zusätzlichen Schlüsselwortargumente, die der Parser versteht
+            catalog_loader: Optionaler Name einer DocumentParser-Methode, die im
+                Katalog-Modus direkt die Bußgeldkatalog-Einträge liefert
+            sections_loader: Optionaler Name einer DocumentParser-Methode, die im
+                Abschnitts-Modus die Abschnitte nacheinander liefert (Generator)
+        """
+        self.name = name
+        self.loader = loader
+        self.extensions = extensions
+        self.mime_types = mime_types
+        self.magic = magic
+        self.sniff = sniff
+        self.url = url
+        self.options = options
+        self.catalog_loader = catalog_loader
+        self.sections_loader = sections_loader
+
+    def score(self, input_path: str, head: bytes) -> int:
+        """
+        Bewertet, wie gut die Eingabe zu diesem Backend passt.
+        
+        Args:
+            input_path: Pfad zur Datei oder URL
+            head: Die ersten Bytes der Datei (leer bei URLs)
+            
+        Returns:
+            0, wenn das Backend nicht passt, sonst eine positive Punktzahl
+        """
+        if self.url:
+            return SCORE_SNIFF if self.sniff(input_path, head) else 0
+        if any(head.startswith(magic) for magic in self.magic):
+            return SCORE_MAGIC
+        if self.sniff and head and self.sniff(input_path, head):
+            return SCORE_SNIFF
+        mime_type, _ = mimetypes.guess_type(input_path)
+        if mime_type and mime_type in self.mime_types:
+            return SCORE_MIME
+        if os.path.splitext(input_path)[1].lower() in self.extensions:
+            return SCORE_EXTENSION
+        return 0
+
+
+_BACKENDS: List[ParserBackend] = []
+
+
+def register_backend(backend: ParserBackend) -> ParserBackend:
+    """
+    Registriert ein Backend. Spätere Registrierungen haben bei gleicher Punktzahl Vorrang.
+    
+    Args:
+        backend: Das zu registrierende Backend
+        
+    Returns:
+        Das registrierte Backend
+    """
+    _BACKENDS.insert(0, backend)
+    return backend
+
+
+def _is_url(input_path: str, head: bytes) -> bool:
+    return input_path.startswith('http://') or input_path.startswith('https://')
+
+
+def _is_google_docs_url(input_path: str, head: bytes) -> bool:
+    return _is_url(input_path, head) and 'docs.google.com' in input_path
+
+
+def _looks_like_html(input_path: str, head: bytes) -> bool:
+    sample = head.lstrip(b'\xef\xbb\xbf \t\r\n')[:512].lower()
+    return sample.startswith((b'<!doctype html', b'<html', b'<head', b'<body', b'<meta', b'<table')) \
+        or b'<html' in sample
+
+
+def _looks_like_docx(input_path: str, head: bytes) -> bool:
+    # DOCX ist ein ZIP-Archiv; nur Archive mit word/document.xml zählen
+    if not head.startswith(b'PK\x03\x04'):
+        return False
+    import zipfile
+    try:
+        with zipfile.ZipFile(input_path) as archive:
+            return 'word/document.xml' in archive.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def _looks_like_text(input_path: str, head: bytes) -> bool:
+    if b'\x00' in head:
+        return False
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Ein am Ende abgeschnittenes Mehrbyte-Zeichen ist kein Ausschlussgrund
+        return e.start >= len(head) - 3
+    return True
+
+
+register_backend(ParserBackend('text', 'parse_text', extensions=('.txt',),
+                               mime_types=('text/plain',), catalog_loader='parse_text_catalog',
+                               sections_loader='iter_text_sections'))
+register_backend(ParserBackend('docx', 'parse_docx', extensions=('.docx',),
+                               mime_types=('application/vnd.openxmlformats-officedocument.wordprocessingml.document',),
+                               sniff=_looks_like_docx, catalog_loader='parse_docx_catalog'))
+register_backend(ParserBackend('html', 'parse_html', extensions=('.html', '.htm'),
+                               mime_types=('text/html',), sniff=_looks_like_html,
+                               catalog_loader='parse_html_catalog'))
+register_backend(ParserBackend('pdf', 'parse_pdf', extensions=('.pdf',),
+                               mime_types=('application/pdf',), magic=(b'%PDF-',),
+                               options=('pages', 'workers')))
+# Optionen der URL-Backends für den gestreamten Download
+_URL_OPTIONS = ('stream_download', 'max_download_bytes', 'max_download_seconds')
+
+register_backend(ParserBackend('url', 'parse_url', sniff=_is_url, url=True, options=_URL_OPTIONS,
+                               catalog_loader='parse_url_catalog'))
+register_backend(ParserBackend('google_docs', 'parse_google_docs_url', sniff=_is_google_docs_url, url=True,
+                               options=_URL_OPTIONS, catalog_loader='parse_google_docs_catalog'))
+
+def _package_version(module: str, distribution: str) -> str:
+    """
+    Ermittelt die installierte Version eines Pakets, ohne es zu importieren.
+    
+    Liest den Namen des .dist-info-Verzeichnisses neben dem Paket; so bleiben
+    PyPDF2 und bs4 beim Start für Textdateien ungeladen (siehe startup_check.py).
+    
+    Args:
+        module: Name des Moduls (z.B. 'bs4')
+        distribution: Name der Distribution (z.B. 'beautifulsoup4')
+        
+    Returns:
+        Die Version, 'none' wenn das Paket fehlt, oder 'unknown'
+    """
+    import importlib.util
+    
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None or not spec.origin:
+        return 'none'
+    site_dir = os.path.dirname(os.path.dirname(spec.origin))
+    wanted = re.sub(r'[-_.]+', '_', distribution).lower()
+    try:
+        entries = sorted(os.listdir(site_dir))
+    except OSError:
+        return 'unknown'
+    for entry in entries:
+        stem, _, suffix = entry.rpartition('.')
+        if suffix not in ('dist-info', 'egg-info') or '-' not in stem:
+            continue
+        # Verzeichnisname: <Distribution>-<Version>[-pyX.Y].dist-info
+        name, version = stem.split('-')[:2]
+        if re.sub(r'[-_.]+', '_', name).lower() == wanted:
+            return version
+    return 'unknown'
+
+
+def parser_fingerprint() -> str:
+    """
+    Liefert die Parser-Version zusammen mit einem Hash des Parser-Quelltexts
+    und den Versionen von PyPDF2 und BeautifulSoup.
+    
+    Wird als Version des Ergebnis-Caches verwendet, damit jede Änderung am
+    Parser und jedes Update der Parser-Bibliotheken alte Cache-Einträge
+    ungültig macht.
+    """
+    import hashlib
+    
+    digest = hashlib.sha256()
+    with open(os.path.abspath(__file__), 'rb') as source:
+        digest.update(source.read())
+    for module, distribution in (('PyPDF2', 'PyPDF2'), ('bs4', 'beautifulsoup4')):
+        digest.update(f'\0{module}={_package_version(module, distribution)}'.encode('utf-8'))
+    return f'{PARSER_VERSION}+{digest.hexdigest()[:12]}'
+
+
+def parse_page_range(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    Wandelt eine Seitenangabe wie "1-3,7,10-" in 0-basierte Seitenindizes um.
+    
+    Args:
+        spec: Seitenangabe (1-basiert, Bereiche mit '-', offene Enden erlaubt)
+        page_count: Anzahl der Seiten im Dokument
+        
+    Returns:
+        Aufsteigend sortierte, eindeutige Seitenindizes innerhalb des Dokuments
+    """
+    if not spec:
+        return list(range(page_count))
+    
+    indices = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r'(\d*)\s*-\s*(\d*)|(\d+)', part)
+        if not match:
+            raise ValueError(f'Ungültige Seitenangabe: {part}')
+        if match.group(3):
+            first = last = int(match.group(3))
+        else:
+            first = int(match.group(1)) if match.group(1) else 1
+            last = int(match.group(2)) if match.group(2) else page_count
+        if first < 1 or last < first:
+            raise ValueError(f'Ungültige Seitenangabe: {part}')
+        indices.update(range(first - 1, min(last, page_count)))
+    return sorted(indices)
+
+
+# Zahl mit optionalen Tausenderpunkten und Dezimalkomma ("1.000,50") oder einfacher Dezimalzahl
+_NUMBER = r'\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:[.,]\d+)?'
+_RANGE_PATTERN = re.compile(rf'({_NUMBER})(?:\s*(?:-|–|bis|to|bis zu)\s*({_NUMBER}))?', flags=re.IGNORECASE)
+_THOUSANDS_PATTERN = re.compile(r'\d{1,3}(?:\.\d{3})+')
+
+
+def _parse_number(token: str) -> float:
+    """Wandelt eine Zahl im deutschen ("1.000,50") oder einfachen Format ("12.5") in float um."""
+    if token.isdigit():
+        return float(token)
+    if ',' in token and '.' in token:
+        return float(token.replace('.', '').replace(',', '.'))
+    if _THOUSANDS_PATTERN.fullmatch(token):
+        return float(token.replace('.', ''))
+    return float(token.replace(',', '.'))
+
+
+# Standardmuster für Abschnittsüberschriften (z.B. "§ 1.", "Artikel 1.", "1.") am Zeilenanfang;
+# [^\S\n] statt \s verhindert, dass eine Überschrift über ein Zeilenende hinausreicht
+_SECTION_LINE = r'[^\S\n]*(?:§|Artikel|Art\.|)[^\S\n]*(\d+)[.:]'
+_SECTION_PATTERN = re.compile(_SECTION_LINE)
+# Für die Suche im ganzen Text: nach "\n" verankert, was deutlich schneller ist als ^ mit re.MULTILINE
+_SECTION_START_PATTERN = re.compile(r'\n(?=[^\S\n]*[§A\d])' + _SECTION_LINE)
+
+# Feldbezeichnungen des textbasierten Bußgeldkatalogs; der Gruppenname ist der Feldname.
+# Leerzeilen werden als eigenes Token erkannt, da sie einen Datensatz abschließen.
+_CATALOG_TOKEN_PATTERN = re.compile(
+    # Die Vorausschau auf mögliche Anfangszeichen lässt die Suche die meisten Positionen sofort überspringen
+    r'(?=[\nABCDFGHKNSTVabcdfghknstv])'
+    r'(?:(?P<blank>\n[^\S\n]*(?=\n))'
+    r'|(?:(?P<violation>Verstoß|Delikt|Tat)'
+    r'|(?P<amount>Bußgeld|Strafe|Geldstrafe)'
+    r'|(?P<prison>Haftzeit|Gefängnis|Freiheitsstrafe)'
+    r'|(?P<category>Kategorie|Bereich)'
+    r'|(?P<notes>Notizen|Anmerkungen|Hinweise)'
+    r'|(?P<community_service>(?i:Strafarbeit|Community Service|Dienststunden|Arbeitsstunden))'
+    r'):)'
+)
+
+# Muster für Zeilen wie "§ 12 Diebstahl $250,00 10 Tage"
+_FALLBACK_DOLLAR = re.compile(r'\$\d+')
+_FALLBACK_EURO = re.compile(r'\d+\s*Euro')
+_FALLBACK_OFFENSE = re.compile(r'§\s*\d+\s*(.+?)(?:\$|\d+\s*Euro|$)')
+_FALLBACK_AMOUNT = re.compile(rf'[\$€]({_NUMBER})')
+# Einfachere Zahlform als _NUMBER (ohne Alternation), deckt "1.000,50" und "12.5" ebenfalls ab
+_FALLBACK_RANGE = re.compile(r'(\d+(?:\.\d+)*(?:,\d+)?)\s*(?:-|–|bis)\s*(\d+(?:\.\d+)*(?:,\d+)?)')
+_FALLBACK_DAYS = re.compile(r'(\d+)\s*(?:Tage|Tagen|Tag)')
+_FALLBACK_HOURS = re.compile(r'(\d+(?:[.,]\d+)?)\s*(?:Stunden|Std|h)', re.IGNORECASE)
+
+
+class _TableRowParser(HTMLParser):
+    """
+    Sammelt die Zeilen aller HTML-Tabellen, ohne einen DOM aufzubauen.
+    
+    Jede Tabelle wird als Liste von Zeilen erfasst, jede Zeile als Liste von
+    (Tag, Text)-Paaren. Der Zelltext entspricht get_text(strip=True) von
+    BeautifulSoup. Verschachtelte Tabellen werden als eigene Tabellen erfasst.
+    """
     
     def __init__(self):
-        """Initialisiert den DocumentParser."""
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._open = []
+        self._skip = 0
+    
+    def _close_cell(self, context):
+        if context['cell'] is not None:
+            if context['row'] is not None:
+                tag, parts = context['cell']
+                context['row'].append((tag, ''.join(parts)))
+            context['cell'] = None
+    
+    def _close_row(self, context):
+        self._close_cell(context)
+        if context['row'] is not None:
+            context['rows'].append(context['row'])
+            context['row'] = None
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            context = {'rows': [], 'row': None, 'cell': None}
+            # Tabellen in der Reihenfolge ihres Beginns erfassen (wie find_all('table'))
+            self.tables.append(context['rows'])
+            self._open.append(context)
+        elif not self._open:
+            return
+        elif tag == 'tr':
+            self._close_row(self._open[-1])
+            self._open[-1]['row'] = []
+        elif tag in ('td', 'th'):
+            self._close_cell(self._open[-1])
+            self._open[-1]['cell'] = (tag, [])
+        elif tag in ('script', 'style'):
+            self._skip += 1
+    
+    def handle_endtag(self, tag):
+        if not self._open:
+            return
+        if tag == 'table':
+            self._close_row(self._open.pop())
+        elif tag == 'tr':
+            self._close_row(self._open[-1])
+        elif tag in ('td', 'th'):
+            self._close_cell(self._open[-1])
+        elif tag in ('script', 'style') and self._skip:
+            self._skip -= 1
+    
+    def handle_data(self, data):
+        if self._open and not self._skip:
+            cell = self._open[-1]['cell']
+            if cell is not None:
+                data = data.strip()
+                if data:
+                    cell[1].append(data)
+
+
+_TABLE_START = re.compile(r'<table\b', re.IGNORECASE)
+_TABLE_END = re.compile(r'</table\s*>', re.IGNORECASE)
+
+
+def iter_html_tables(html_content: str) -> List[List[List[Tuple[str, str]]]]:
+    """
+    Zerlegt die Tabellen eines HTML-Dokuments in Zeilen und Zellen.
+    
+    Es wird nur der Abschnitt vom ersten <table> bis zum letzten </table>
+    tokenisiert; Kopfbereich, Stylesheets und Skripte davor und danach
+    werden übersprungen.
+    
+    Args:
+        html_content: HTML-Inhalt
+        
+    Returns:
+        Liste der Tabellen, siehe DocumentParser.extract_fine_catalog_from_rows()
+    """
+    start = _TABLE_START.search(html_content)
+    if not start:
+        return []
+    end = None
+    for end in _TABLE_END.finditer(html_content, start.start()):
         pass
+    
+    collector = _TableRowParser()
+    collector.feed(html_content[start.start():end.end() if end else len(html_content)])
+    collector.close()
+    return collector.tables
+
+
+# Elemente, deren Inhalt nicht zum Haupttext gehört (wie in DocumentParser._html_text())
+_HTML_SKIP_TAGS = ('script', 'style', 'nav', 'footer', 'header')
+_BLANK_LINES = re.compile(r'\n\s*\n')
+
+# Blockgröße beim Einlesen von HTML-Dateien in Zeichen
+_HTML_READ_SIZE = 64 * 1024
+
+# Anzahl der Textknoten, die zu einem Block verbunden werden (spart den Overhead einzelner Strings)
+_TEXT_BLOCK_SIZE = 1024
+
+
+class _HtmlTextExtractor(HTMLParser):
+    """
+    Extrahiert Haupttext, Titel und Meta-Tags eines HTML-Dokuments inkrementell.
+    
+    Das Dokument kann in beliebig großen Stücken an feed() übergeben werden.
+    Der Text entspricht DocumentParser._html_text(): jeder Textknoten wird
+    getrimmt, leere Knoten entfallen, die übrigen werden zeilenweise verbunden.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._blocks = []
+        self._parts = []
+        self._meta = {}
+        self._title = None
+        self._title_seen = False
+        self._title_parts = None
+        self._data = []
+        self._skip = 0
+    
+    def _flush(self):
+        # Ein Textknoten kann über mehrere handle_data()-Aufrufe verteilt ankommen
+        if self._data:
+            text = ''.join(self._data).strip()
+            self._data = []
+            if text and not self._skip:
+                self._parts.append(_BLANK_LINES.sub('\n\n', text))
+                if len(self._parts) >= _TEXT_BLOCK_SIZE:
+                    self._blocks.append('\n'.join(self._parts))
+                    self._parts = []
+    
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in _HTML_SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'title' and not self._title_seen and self._title_parts is None:
+            self._title_parts = []
+        elif tag == 'meta':
+            attributes = dict(attrs)
+            name = attributes.get('name') or attributes.get('property')
+            if name:
+                self._meta[name] = attributes.get('content')
+    
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in _HTML_SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag == 'title' and self._title_parts is not None:
+            self._close_title()
+    
+    def _close_title(self):
+        # Wie soup.title.string: None bei leerem Titel
+        self._title = ''.join(self._title_parts) or None
+        self._title_parts = None
+        self._title_seen = True
+    
+    def handle_data(self, data):
+        self._data.append(data)
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+    
+    def handle_comment(self, data):
+        self._flush()
+    
+    def handle_decl(self, decl):
+        self._flush()
+    
+    def close(self):
+        super().close()
+        self._flush()
+        if self._title_parts is not None:
+            self._close_title()
+    
+    @property
+    def metadata(self) -> Dict:
+        """Titel und Meta-Tags wie DocumentParser._html_metadata()."""
+        metadata = {'title': self._title} if self._title_seen else {}
+        metadata.update(self._meta)
+        return metadata
+    
+    def text(self) -> str:
+        """Liefert den bisher extrahierten Haupttext."""
+        return '\n'.join(self._blocks + self._parts)
+
+
+def extract_html_text(html_content: str) -> Tuple[str, Dict]:
+    """
+    Extrahiert Haupttext und Metadaten eines HTML-Dokuments, ohne einen DOM aufzubauen.
+    
+    Args:
+        html_content: HTML-Inhalt
+        
+    Returns:
+        Ein Tupel (Text, Metadaten) wie DocumentParser._html_text() und _html_metadata()
+    """
+    extractor = _HtmlTextExtractor()
+    extractor.feed(html_content)
+    extractor.close()
+    return extractor.text(), extractor.metadata
+
+
+def _decode_fallback(error: UnicodeDecodeError):
+    """Fehlerbehandlung für das Dekodieren: ungültige UTF-8-Bytes werden als TEXT_FALLBACK_ENCODING gelesen."""
+    return error.object[error.start:error.end].decode(TEXT_FALLBACK_ENCODING, errors='replace'), error.end
+
+
+codecs.register_error('doc_parser_fallback', _decode_fallback)
+
+
+def open_text_file(file_path: str):
+    """
+    Öffnet eine Textdatei zum schrittweisen Lesen.
+    
+    Dekodiert wird inkrementell als UTF-8 (ein BOM wird entfernt); Bytes, die
+    kein gültiges UTF-8 sind, werden als TEXT_FALLBACK_ENCODING gelesen, sodass
+    auch Windows-Exporte und Dateien mit gemischter Kodierung ohne Fehler und
+    in einem Durchgang gelesen werden. Zeilenenden werden wie bisher in "\\n"
+    umgewandelt.
+    
+    Args:
+        file_path: Pfad zur Textdatei
+        
+    Returns:
+        Das geöffnete Textdatei-Objekt
+    """
+    return open(file_path, 'r', encoding='utf-8-sig', errors='doc_parser_fallback')
+
+
+def iter_text_blocks(file_path: str, block_size: int = TEXT_BLOCK_SIZE):
+    """
+    Liest eine Textdatei in Blöcken aus ganzen Zeilen.
+    
+    Der Speicherbedarf hängt von der Blockgröße ab, nicht von der Dateigröße
+    (nur eine einzelne Zeile über block_size verlängert ihren Block).
+    Aufeinanderfolgende Blöcke überlappen um genau ein Zeichen: Ein Block endet
+    mit einem Zeilenumbruch und der nächste beginnt mit diesem. So erkennen
+    Muster, die wie _SECTION_START_PATTERN oder Leerzeilen an einem "\\n"
+    verankert sind, auch die erste Zeile eines Blocks.
+    
+    Args:
+        file_path: Pfad zur Textdatei
+        block_size: Anzahl der Zeichen, die auf einmal gelesen werden
+        
+    Yields:
+        (Offset des Blocks im Gesamttext, Block)
+    """
+    with open_text_file(file_path) as file:
+        offset = 0
+        pending = []
+        emitted = False
+        while True:
+            chunk = file.read(block_size)
+            if not chunk:
+                break
+            cut = chunk.rfind('\n')
+            if cut < 0:
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:cut + 1])
+            block = ''.join(pending)
+            yield offset, block
+            emitted = True
+            offset += len(block) - 1
+            pending = [chunk[cut:]]
+        
+        # Der Rest nach dem letzten Zeilenumbruch; ein einzelnes "\n" ist bereits im vorigen Block enthalten
+        block = ''.join(pending)
+        if block and (block != '\n' or not emitted):
+            yield offset, block
+
+
+# Namensraum von WordprocessingML (word/document.xml)
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Elemente, die nach ihrer Verarbeitung aus dem Baum entfernt werden
+_DOCX_DONE_TAGS = (_W + 'p', _W + 'tbl', _W + 'tr', _W + 'tc', _W + 'sdt')
+
+
+def iter_docx_blocks(archive):
+    """
+    Liest word/document.xml inkrementell und liefert Absätze und Tabellenzeilen.
+
+    Abgeschlossene Elemente werden sofort verworfen; der Speicherbedarf hängt
+    nur vom größten Absatz bzw. der größten Tabellenzeile ab, nicht von der
+    Größe des Dokuments.
+
+    Args:
+        archive: Die geöffnete DOCX-Datei (zipfile.ZipFile)
+
+    Yields:
+        ('paragraph', Text) für Absätze außerhalb von Tabellen,
+        ('row', (Tabellen-Nr., Zellen)) für jede Tabellenzeile, die Zellen als
+        (Tag, Text)-Paare wie bei iter_html_tables() ('th' in Kopfzeilen), und
+        ('table_end', Tabellen-Nr.) am Ende jeder Tabelle
+    """
+    from xml.etree.ElementTree import iterparse
+
+    # Offene Absätze (Textfelder können Absätze in Absätzen enthalten) und Tabellen
+    paragraphs = []
+    tables = []
+    table_count = 0
+    body = None
+
+    with archive.open('word/document.xml') as xml_file:
+        for event, element in iterparse(xml_file, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if tag == _W + 'p':
+                    paragraphs.append([])
+                elif tag == _W + 'tbl':
+                    tables.append({'id': table_count, 'row': None, 'header': False, 'cell': None})
+                    table_count += 1
+                elif tag == _W + 'tr' and tables:
+                    tables[-1]['row'] = []
+                    tables[-1]['header'] = False
+                elif tag == _W + 'tc' and tables:
+                    tables[-1]['cell'] = []
+                elif tag == _W + 'body':
+                    body = element
+                continue
+
+            if tag == _W + 't':
+                if paragraphs and element.text:
+                    paragraphs[-1].append(element.text)
+            elif tag == _W + 'tab':
+                if paragraphs:
+                    paragraphs[-1].append('\t')
+            elif tag in (_W + 'br', _W + 'cr'):
+                if paragraphs:
+                    paragraphs[-1].append('\n')
+            elif tag == _W + 'p':
+                text = ''.join(paragraphs.pop())
+                if tables and tables[-1]['cell'] is not None:
+                    tables[-1]['cell'].append(text)
+                else:
+                    yield 'paragraph', text
+            elif tag == _W + 'tblHeader':
+                # Als Kopfzeile markierte Zeilen entsprechen <th>-Zellen in HTML
+                if tables:
+                    tables[-1]['header'] = element.get(_W + 'val', 'true') not in ('0', 'false', 'off')
+            elif tag == _W + 'tc':
+                table = tables[-1]
+                if table['row'] is not None and table['cell'] is not None:
+                    text = ' '.join(part.strip() for part in table['cell'] if part.strip())
+                    table['row'].append(('th' if table['header'] else 'td', text))
+                table['cell'] = None
+            elif tag == _W + 'tr':
+                table = tables[-1]
+                row, table['row'] = table['row'], None
+                if row is not None:
+                    yield 'row', (table['id'], row)
+            elif tag == _W + 'tbl':
+                yield 'table_end', tables.pop()['id']
+
+            if tag in _DOCX_DONE_TAGS:
+                element.clear()
+                # Fertige Blöcke auf oberster Ebene aus dem Dokumentkörper lösen
+                if body is not None and not paragraphs and not tables:
+                    body.clear()
+
+
+def _docx_core_properties(archive) -> Dict:
+    """Liest die Dokumenteigenschaften (docProps/core.xml) wie title, creator, created, modified."""
+    from xml.etree.ElementTree import fromstring
+
+    try:
+        data = archive.read('docProps/core.xml')
+    except KeyError:
+        return {}
+    metadata = {}
+    for element in fromstring(data):
+        if element.text and element.text.strip():
+            metadata[element.tag.rsplit('}', 1)[-1]] = element.text.strip()
+    return metadata
+
+def _extract_pdf_pages(file_path: str, indices: List[int]) -> List[str]:
+    """
+    Extrahiert die Texte einzelner PDF-Seiten; wird in Worker-Prozessen ausgeführt.
+    
+    Args:
+        file_path: Pfad zur PDF-Datei (jeder Worker öffnet die Datei selbst)
+        indices: 0-basierte Seitenindizes
+        
+    Returns:
+        Die Seitentexte in der Reihenfolge der Indizes
+    """
+    from PyPDF2 import PdfReader
+    
+    reader = PdfReader(file_path)
+    return [reader.pages[index].extract_text() or '' for index in indices]
+
+
+def _pdf_object_digest(obj, memo: Dict) -> bytes:
+    """
+    Berechnet einen Hash über den Inhalt eines PDF-Objekts samt referenzierter Objekte.
+    
+    Objektnummern gehen nicht ein, sodass ein neu geschriebenes PDF mit
+    unveränderter Seite denselben Hash ergibt.
+    
+    Args:
+        obj: Ein PyPDF2-Objekt (Dictionary, Array, Stream, Referenz, ...)
+        memo: Bereits berechnete Hashes indirekter Objekte; wird über alle
+            Seiten eines Dokuments geteilt (Schriften sind meist gemeinsam)
+        
+    Returns:
+        Der SHA-256-Hash als Bytes
+    """
+    import hashlib
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+    
+    if isinstance(obj, IndirectObject):
+        reference = (obj.idnum, obj.generation)
+        digest = memo.get(reference)
+        if digest is None:
+            # Platzhalter gegen Zyklen, z.B. über /Parent in Formular-XObjects
+            memo[reference] = b'cycle'
+            digest = memo[reference] = _pdf_object_digest(obj.get_object(), memo)
+        return digest
+    
+    digest = hashlib.sha256()
+    if isinstance(obj, DictionaryObject):
+        digest.update(b'd')
+        for key in sorted(obj):
+            if key in ('/Parent', '/P'):
+                continue
+            digest.update(key.encode('utf-8', 'replace'))
+            digest.update(_pdf_object_digest(obj.raw_get(key), memo))
+        # Bei Streams die kodierten Rohdaten, das Dekodieren ist hier unnötig
+        data = getattr(obj, '_data', None)
+        if data is not None:
+            digest.update(b's')
+            digest.update(data if isinstance(data, bytes) else str(data).encode('utf-8', 'replace'))
+    elif isinstance(obj, ArrayObject):
+        digest.update(b'a')
+        for item in obj:
+            digest.update(_pdf_object_digest(item, memo))
+    else:
+        digest.update(type(obj).__name__.encode('ascii'))
+        digest.update(repr(obj).encode('utf-8', 'replace'))
+    return digest.digest()
+
+
+def pdf_page_hash(page, memo: Optional[Dict] = None) -> str:
+    """
+    Berechnet den Inhalts-Hash einer PDF-Seite für den Seiten-Cache.
+    
+    Eingehen der Inhaltsstrom (/Contents) und die Ressourcen (/Resources, ggf.
+    vom Seitenbaum geerbt) samt Schriften und XObjects, also alles, wovon
+    extract_text() abhängt.
+    
+    Args:
+        page: Die PyPDF2-Seite
+        memo: Gemeinsamer Speicher für die Hashes indirekter Objekte, siehe _pdf_object_digest()
+        
+    Returns:
+        Der Hash als Hex-String
+    """
+    import hashlib
+    import PyPDF2
+    
+    if memo is None:
+        memo = {}
+    resources = page
+    while '/Resources' not in resources and '/Parent' in resources:
+        resources = resources['/Parent'].get_object()
+    
+    # Die Extraktion selbst kann sich mit der PyPDF2-Version ändern
+    digest = hashlib.sha256(PyPDF2.__version__.encode('ascii'))
+    for key, owner in (('/Contents', page), ('/Resources', resources)):
+        digest.update(key.encode('ascii'))
+        if key in owner:
+            digest.update(_pdf_object_digest(owner.raw_get(key), memo))
+    return digest.hexdigest()
+
+
+def _iter_parallel_page_texts(file_path: str, indices: List[int], workers: int):
+    """
+    Extrahiert Seitentexte mit einem Prozesspool und liefert sie in Seitenreihenfolge.
+    
+    Args:
+        file_path: Pfad zur PDF-Datei
+        indices: 0-basierte Seitenindizes
+        workers: Anzahl der Worker-Prozesse
+        
+    Yields:
+        Die Seitentexte in der Reihenfolge der Indizes
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # Mehr Teilstücke als Worker, damit ungleich aufwendige Seiten sich ausgleichen
+    chunk_count = min(len(indices), workers * 4)
+    chunk_size = -(-len(indices) // chunk_count)
+    chunks = [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() liefert die Ergebnisse in der Reihenfolge der Teilstücke
+        for texts in executor.map(_extract_pdf_pages, [file_path] * len(chunks), chunks):
+            yield from texts
+
+
+class DocumentParser:
+    """Klasse zum Parsen verschiedener Dokumenttypen für das Justizsystem."""
+    
+    def __init__(self, cache=None, http_cache=None, page_cache=None):
+        """
+        Initialisiert den DocumentParser.
+        
+        Args:
+            cache: Optionaler ResultCache für die Ergebnisse von process()
+            http_cache: Optionaler HttpCache für URLs (bedingte Anfragen per ETag/Last-Modified)
+            page_cache: Optionaler PageCache für die Texte einzelner PDF-Seiten
+        """
+        self.cache = cache
+        self.http_cache = http_cache
+        self.page_cache = page_cache
+        # Bereits geladene Antworten (oder Fehler) aus prefetch_urls(), nach URL
+        self._prefetched = {}
+        # Laufende Messung je Thread (der Server nutzt eine Instanz für mehrere Clients)
+        self._local = threading.local()
+    
+    @property
+    def stats(self):
+        """Die Messung des laufenden process_with_stats()-Aufrufs oder NULL_STATS."""
+        return getattr(self._local, 'stats', NULL_STATS)
 
     def _parse_range(self, value: str, as_int: bool = False):
-        """Zerlegt einen Wert (optional mit Range) in min/max."""
+        """Zerlegt einen Wert (optional mit Range) in min/max; "1.000,50" ergibt 1000.5."""
         v = (value or '').strip()
         if not v:
             return 0, 0
+        if v.isdigit():
+            number = int(v) if as_int else float(v)
+            return number, number
 
         normalized = v.replace('€', '').replace('$', '')
-        match = re.search(r'(\d+(?:[.,]\d+)?)(?:\s*(?:-|–|bis|to|bis zu)\s*(\d+(?:[.,]\d+)?))?', normalized, flags=re.IGNORECASE)
+        match = _RANGE_PATTERN.search(normalized)
         if not match:
             return 0, 0
 
         first = match.group(1)
         second = match.group(2) if match.group(2) is not None else match.group(1)
 
-        min_val = float(first.replace(',', '.'))
-        max_val = float(second.replace(',', '.'))
+        min_val = _parse_number(first)
+        max_val = _parse_number(second)
 
         if as_int:
             min_val = int(round(min_val))
@@ -57,41 +899,137 @@ class DocumentParser:
         """Extrahiert Hafttage (min/max)."""
         return self._parse_range(value, as_int=True)
     
-    def parse_pdf(self, file_path: str) -> Dict:
+    def iter_pdf_pages(self, file_path: str, pages: Optional[str] = None, reader=None,
+                       workers: int = 1, page_counts: Optional[Dict] = None):
+        """
+        Extrahiert den Text einer PDF-Datei Seite für Seite.
+        
+        Mit einem PageCache werden nur neue oder geänderte Seiten extrahiert,
+        die übrigen Texte stammen aus dem Cache.
+        
+        Args:
+            file_path: Pfad zur PDF-Datei
+            pages: Optionale Seitenangabe wie "1-3,7" (1-basiert)
+            reader: Optional ein bereits geöffneter PdfReader
+            workers: Anzahl der Prozesse für die Extraktion (0 = alle CPU-Kerne);
+                Dokumente unter PARALLEL_PDF_MIN_PAGES Seiten bleiben seriell
+            page_counts: Optionales Dictionary, in das die Anzahl der aus dem Cache
+                übernommenen ('reused') und extrahierten ('extracted') Seiten geschrieben wird
+            
+        Yields:
+            Dictionaries mit Seitennummer ('page', 1-basiert), Text und den
+            Zeichen-Offsets ('start', 'end') im zusammengesetzten Gesamttext
+        """
+        if reader is None:
+            from PyPDF2 import PdfReader
+            reader = PdfReader(file_path)
+        
+        indices = parse_page_range(pages, len(reader.pages))
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        
+        if self.page_cache is not None:
+            texts = self._cached_page_texts(file_path, reader, indices, workers, page_counts)
+        else:
+            texts = self._extract_page_texts(file_path, reader, indices, workers)
+            if page_counts is not None:
+                page_counts.update(reused=0, extracted=len(indices))
+        
+        offset = 0
+        for index, text in zip(indices, texts):
+            yield {
+                'page': index + 1,
+                'text': text,
+                'start': offset,
+                'end': offset + len(text)
+            }
+            # Seiten werden im Gesamttext durch eine Leerzeile getrennt
+            offset += len(text) + 2
+    
+    def _extract_page_texts(self, file_path: str, reader, indices: List[int], workers: int):
+        """Extrahiert die Texte der Seiten seriell oder mit einem Prozesspool, in Seitenreihenfolge."""
+        if workers > 1 and len(indices) >= PARALLEL_PDF_MIN_PAGES:
+            return _iter_parallel_page_texts(file_path, indices, workers)
+        return (reader.pages[index].extract_text() or '' for index in indices)
+    
+    def _cached_page_texts(self, file_path: str, reader, indices: List[int], workers: int,
+                           page_counts: Optional[Dict]) -> List[str]:
+        """
+        Liefert die Seitentexte über den PageCache; nur fehlende Seiten werden extrahiert.
+        
+        Returns:
+            Die Seitentexte in der Reihenfolge der Indizes
+        """
+        stats = self.stats
+        memo = {}
+        with stats.stage('page_hash'):
+            hashes = [pdf_page_hash(reader.pages[index], memo) for index in indices]
+        cached = self.page_cache.get_pages(hashes)
+        
+        # Gleiche Seiten innerhalb des Dokuments nur einmal extrahieren
+        missing = {}
+        for index, page_hash in zip(indices, hashes):
+            if page_hash not in cached:
+                missing.setdefault(page_hash, index)
+        extracted = dict(zip(missing, self._extract_page_texts(file_path, reader, list(missing.values()), workers)))
+        self.page_cache.put_pages(extracted)
+        cached.update(extracted)
+        
+        stats.count('pages_reused', len(indices) - len(missing))
+        stats.count('pages_extracted', len(missing))
+        if page_counts is not None:
+            page_counts.update(reused=len(indices) - len(missing), extracted=len(missing))
+        return [cached[page_hash] for page_hash in hashes]
+    
+    def parse_pdf(self, file_path: str, pages: Optional[str] = None, workers: int = 1) -> Dict:
         """
         Extrahiert Text und Metadaten aus einer PDF-Datei.
         
         Args:
             file_path: Pfad zur PDF-Datei
+            pages: Optionale Seitenangabe wie "1-3,7" (1-basiert)
+            workers: Anzahl der Prozesse für die Extraktion, siehe iter_pdf_pages()
             
         Returns:
             Ein Dictionary mit dem extrahierten Text und Metadaten
         """
         try:
-            pdf_reader = PdfReader(file_path)
+            from PyPDF2 import PdfReader
             
-            text_content = ""
-            for i, page in enumerate(pdf_reader.pages):
-                text_content += page.extract_text() + "\n\n"
+            stats = self.stats
+            with stats.stage('load'):
+                pdf_reader = PdfReader(file_path)
+            
+            # Seitentexte sammeln und einmal zusammenfügen statt wiederholt zu verketten
+            page_texts = []
+            page_counts = {}
+            with stats.stage('parse'):
+                for page in self.iter_pdf_pages(file_path, pages, reader=pdf_reader, workers=workers,
+                                                page_counts=page_counts):
+                    page_texts.append(page['text'])
+                    page_texts.append("\n\n")
+                text_content = ''.join(page_texts)
+            stats.count('pages', len(page_texts) // 2)
             
             # Metadaten extrahieren
-            metadata = {}
-            if pdf_reader.metadata:
-                for key, value in pdf_reader.metadata.items():
-                    if key.startswith('/'):
-                        key = key[1:]  # Entferne führendes '/'
-                    metadata[key] = str(value)
+            metadata = self._pdf_metadata(pdf_reader)
             
             # Anzahl der Seiten
             page_count = len(pdf_reader.pages)
             
-            return {
+            result = {
                 'success': True,
                 'content': text_content,
                 'metadata': metadata,
                 'page_count': page_count,
                 'type': 'pdf'
             }
+            if pages:
+                result['pages'] = pages
+            if self.page_cache is not None:
+                result['pages_reused'] = page_counts.get('reused', 0)
+                result['pages_extracted'] = page_counts.get('extracted', 0)
+            return result
         except Exception as e:
             return {
                 'success': False,
@@ -99,49 +1037,178 @@ class DocumentParser:
                 'traceback': traceback.format_exc()
             }
     
-    def parse_html(self, file_path: str, encoding: str = 'utf-8') -> Dict:
+    def _pdf_metadata(self, pdf_reader) -> Dict:
+        """Liest die Dokumentinformationen einer PDF-Datei als Strings aus."""
+        metadata = {}
+        if pdf_reader.metadata:
+            for key, value in pdf_reader.metadata.items():
+                if key.startswith('/'):
+                    key = key[1:]  # Entferne führendes '/'
+                metadata[key] = str(value)
+        return metadata
+    
+    def _html_metadata(self, soup) -> Dict:
+        """Liest Titel und Meta-Tags aus einem BeautifulSoup-Dokument."""
+        metadata = {}
+        
+        # Titel
+        if soup.title:
+            metadata['title'] = soup.title.string
+        
+        # Meta-Tags
+        for meta in soup.find_all('meta'):
+            if meta.get('name'):
+                metadata[meta.get('name')] = meta.get('content')
+            elif meta.get('property'):
+                metadata[meta.get('property')] = meta.get('content')
+        return metadata
+    
+    def _html_text(self, soup) -> str:
+        """Liefert den Haupttext eines BeautifulSoup-Dokuments (verändert das Dokument)."""
+        # Haupttext extrahieren (entfernt Skripte, Stile und andere unwichtige Elemente)
+        for script in soup(["script", "style", "nav", "footer", "header"]):
+            script.extract()
+        
+        text_content = soup.get_text(separator='\n', strip=True)
+        
+        # Entferne mehrfache Leerzeilen
+        return re.sub(r'\n\s*\n', '\n\n', text_content)
+    
+    def _html_content(self, html_content: str, engine: str = 'fast') -> Tuple[str, Dict]:
+        """Liefert (Text, Metadaten) eines HTML-Dokuments mit dem gewählten Verfahren ('fast' oder 'bs4')."""
+        if engine == 'fast':
+            return extract_html_text(html_content)
+        
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(html_content, 'html.parser')
+        metadata = self._html_metadata(soup)
+        return self._html_text(soup), metadata
+    
+    def _load_html_soup(self, file_path: str, encoding: str = 'utf-8'):
+        from bs4 import BeautifulSoup
+        
+        with open(file_path, 'r', encoding=encoding) as file:
+            html_content = file.read()
+        return BeautifulSoup(html_content, 'html.parser')
+    
+    def _fetch_url(self, url: str):
+        """Lädt eine Webseite und liefert die Antwort (löst bei HTTP-Fehlern eine Exception aus)."""
+        prefetched = self._prefetched.pop(url, None)
+        if isinstance(prefetched, Exception):
+            raise prefetched
+        if prefetched is not None:
+            return prefetched
+        
+        # Gemeinsame Session, damit Verbindungen zum selben Host wiederverwendet werden
+        from url_fetcher import fetch
+        
+        return fetch(url)
+    
+    def _fetch_target(self, url: str) -> str:
+        """Liefert die Adresse, die für eine Eingabe-URL tatsächlich geladen wird."""
+        if _is_google_docs_url(url, b''):
+            return self._google_docs_pub_url(url)
+        return url
+    
+    def prefetch_urls(self, urls: List[str], **fetcher_options) -> int:
+        """
+        Lädt mehrere URLs (auch Google Docs) gleichzeitig vor.
+        
+        Die Antworten werden beim anschließenden process() der jeweiligen URL
+        verwendet; Fehler werden dort wie bei einem direkten Abruf gemeldet.
+        
+        Args:
+            urls: Die vorzuladenden URLs
+            **fetcher_options: Optionen für den AsyncFetcher (z.B. max_connections, per_host)
+            
+        Returns:
+            Anzahl der erfolgreich geladenen URLs
+        """
+        from url_fetcher import AsyncFetcher
+        
+        targets, headers = self._prefetch_targets(urls)
+        with AsyncFetcher(**fetcher_options) as fetcher:
+            results = fetcher.fetch_many(targets, headers)
+        
+        self._prefetched.update(results)
+        return sum(1 for _, response in results if not isinstance(response, Exception))
+    
+    def iter_prefetched(self, urls: List[str], window: Optional[int] = None, **fetcher_options):
+        """
+        Lädt mehrere URLs gleichzeitig vor und liefert jede, sobald ihre Antwort vorliegt.
+        
+        Wie prefetch_urls(), aber der Aufrufer kann eine URL schon mit process()
+        parsen, während die übrigen noch laden. URLs, deren Eintrag im HTTP-Cache
+        noch frisch ist, werden sofort geliefert.
+        
+        Args:
+            urls: Die vorzuladenden URLs
+            window: Maximale Anzahl geladener, noch nicht gelieferter Antworten
+                (Standard: url_fetcher.DEFAULT_WINDOW)
+            **fetcher_options: Optionen für den AsyncFetcher (z.B. max_connections, per_host)
+            
+        Yields:
+            Die Eingabe-URLs in der Reihenfolge, in der sie bereitstehen
+        """
+        from url_fetcher import DEFAULT_WINDOW, AsyncFetcher
+        
+        by_target = {}
+        for url in urls:
+            by_target.setdefault(self._fetch_target(url), []).append(url)
+        targets, headers = self._prefetch_targets(urls)
+        for target in by_target.keys() - set(targets):
+            yield from by_target[target]
+        
+        with AsyncFetcher(**fetcher_options) as fetcher:
+            for target, response in fetcher.iter_completed(targets, headers, window or DEFAULT_WINDOW):
+                self._prefetched[target] = response
+                yield from by_target[target]
+    
+    def _prefetch_targets(self, urls: List[str]):
+        """Die zu ladenden Adressen ohne frische Einträge des HTTP-Caches und je Adresse die bedingten Header."""
+        targets = list(dict.fromkeys(self._fetch_target(url) for url in urls))
+        headers = {}
+        if self.http_cache is not None:
+            for target in list(targets):
+                entry = self.http_cache.get(self.http_cache.url_key(target))
+                if entry is not None and self.http_cache.is_fresh(entry):
+                    targets.remove(target)
+                else:
+                    headers[target] = self.http_cache.conditional_headers(entry)
+        return targets, headers
+    
+    def parse_html(self, file_path: str, encoding: str = 'utf-8', engine: str = 'fast') -> Dict:
         """
         Extrahiert Text und Metadaten aus einer HTML-Datei.
         
         Args:
             file_path: Pfad zur HTML-Datei
             encoding: Zeichenkodierung der Datei
+            engine: 'fast' liest die Datei blockweise mit einem ereignisbasierten
+                Parser, 'bs4' baut einen vollständigen BeautifulSoup-Baum auf
             
         Returns:
             Ein Dictionary mit dem extrahierten Text und Metadaten
         """
         try:
-            with open(file_path, 'r', encoding=encoding) as file:
-                html_content = file.read()
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Metadaten extrahieren
-            metadata = {}
-            
-            # Titel
-            if soup.title:
-                metadata['title'] = soup.title.string
-            
-            # Meta-Tags
-            for meta in soup.find_all('meta'):
-                if meta.get('name'):
-                    metadata[meta.get('name')] = meta.get('content')
-                elif meta.get('property'):
-                    metadata[meta.get('property')] = meta.get('content')
-            
-            # Haupttext extrahieren (entfernt Skripte, Stile und andere unwichtige Elemente)
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.extract()
-            
-            text_content = soup.get_text(separator='\n', strip=True)
-            
-            # Entferne mehrfache Leerzeilen
-            text_content = re.sub(r'\n\s*\n', '\n\n', text_content)
+            # Die Datei wird blockweise gelesen und dabei geparst, daher ein gemeinsamer Schritt
+            with self.stats.stage('parse'):
+                if engine == 'fast':
+                    extractor = _HtmlTextExtractor()
+                    with open(file_path, 'r', encoding=encoding) as file:
+                        for block in iter(lambda: file.read(_HTML_READ_SIZE), ''):
+                            extractor.feed(block)
+                    extractor.close()
+                    content, metadata = extractor.text(), extractor.metadata
+                else:
+                    soup = self._load_html_soup(file_path, encoding)
+                    metadata = self._html_metadata(soup)
+                    content = self._html_text(soup)
             
             return {
                 'success': True,
-                'content': text_content,
+                'content': content,
                 'metadata': metadata,
                 'type': 'html'
             }
@@ -152,64 +1219,384 @@ class DocumentParser:
                 'traceback': traceback.format_exc()
             }
     
-    def parse_url(self, url: str) -> Dict:
+    def parse_html_catalog(self, file_path: str, encoding: str = 'utf-8') -> Union[Dict, List[Dict]]:
+        """
+        Extrahiert Bußgeldkatalog-Einträge aus einer HTML-Datei.
+        
+        Die Tabellen werden direkt aus dem HTML gelesen; nur wenn sie keine
+        Einträge liefern, wird der Text des Dokuments ausgewertet.
+        
+        Args:
+            file_path: Pfad zur HTML-Datei
+            encoding: Zeichenkodierung der Datei
+            
+        Returns:
+            Eine Liste der Bußgeldkatalog-Einträge oder ein Fehler-Dictionary
+        """
+        try:
+            with self.stats.stage('load'), open(file_path, 'r', encoding=encoding) as file:
+                html_content = file.read()
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        return self._catalog_from_html(html_content)
+    
+    def parse_url(self, url: str, stream_download: bool = False, max_download_bytes: Optional[int] = None,
+                  max_download_seconds: Optional[float] = None, engine: str = 'fast') -> Dict:
         """
         Lädt eine Webseite und extrahiert Text und Metadaten.
         
         Args:
             url: URL der Webseite
+            stream_download: Die Seite blockweise laden und schon während des Downloads parsen
+            max_download_bytes: Bytegrenze des gestreamten Downloads
+            max_download_seconds: Zeitgrenze des gestreamten Downloads in Sekunden
+            engine: Verfahren der Textextraktion ('fast' oder 'bs4'), siehe parse_html()
             
         Returns:
             Ein Dictionary mit dem extrahierten Text und Metadaten
         """
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()  # Löst eine Exception aus, wenn der Request nicht erfolgreich war
-            
-            # Encoding ermitteln
-            if response.encoding is None:
-                response.encoding = 'utf-8'
+            if stream_download and url not in self._prefetched:
+                return self._parse_url_streaming(url, max_download_bytes, max_download_seconds)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            stats = self.stats
+            with stats.stage('load'):
+                response = self._fetch_url(url)
+            with stats.stage('decode'):
+                html_content = response.text
+            if stats.enabled:
+                raw = getattr(response, 'content', None)
+                stats.count('bytes_in', len(raw if raw is not None else html_content.encode('utf-8')))
+            with stats.stage('parse'):
+                content, html_metadata = self._html_content(html_content, engine)
             
             # Metadaten extrahieren
             metadata = {
                 'url': url,
                 'status_code': response.status_code
             }
+            metadata.update(html_metadata)
             
-            # Titel
-            if soup.title:
-                metadata['title'] = soup.title.string
+            return {
+                'success': True,
+                'content': content,
+                'metadata': metadata,
+                'type': 'url'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+    
+    def _parse_url_streaming(self, url: str, max_bytes: Optional[int], max_seconds: Optional[float]) -> Dict:
+        """Parst eine Webseite, während sie geladen wird; der Speicherbedarf hängt nicht von der Seitengröße ab."""
+        from url_fetcher import DownloadLimitError, StreamingDownload
+        
+        extractor = _HtmlTextExtractor()
+        stats = self.stats
+        try:
+            # Download und Parsen laufen verschränkt und werden gemeinsam gemessen
+            with stats.stage('parse'), StreamingDownload(url, max_bytes, max_seconds) as download:
+                for text in download:
+                    extractor.feed(text)
+        except DownloadLimitError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'limit': e.limit,
+                'type': 'url'
+            }
+        extractor.close()
+        stats.count('bytes_in', download.bytes_received)
+        
+        metadata = {
+            'url': url,
+            'status_code': download.status_code
+        }
+        metadata.update(extractor.metadata)
+        
+        return {
+            'success': True,
+            'content': extractor.text(),
+            'metadata': metadata,
+            'type': 'url'
+        }
+    
+    def _download_html(self, url: str, max_bytes: Optional[int], max_seconds: Optional[float]) -> str:
+        """Lädt eine Webseite gestreamt und vollständig, begrenzt durch die Download-Grenzen."""
+        from url_fetcher import StreamingDownload
+        
+        with StreamingDownload(url, max_bytes, max_seconds) as download:
+            return ''.join(download)
+    
+    def parse_url_catalog(self, url: str, stream_download: bool = False, max_download_bytes: Optional[int] = None,
+                          max_download_seconds: Optional[float] = None) -> Union[Dict, List[Dict]]:
+        """
+        Lädt eine Webseite und extrahiert daraus Bußgeldkatalog-Einträge, siehe parse_html_catalog().
+        
+        Args:
+            url: URL der Webseite
+            stream_download: Die Seite blockweise und mit Download-Grenzen laden
+            max_download_bytes: Bytegrenze des gestreamten Downloads
+            max_download_seconds: Zeitgrenze des gestreamten Downloads in Sekunden
             
-            # Meta-Tags
-            for meta in soup.find_all('meta'):
-                if meta.get('name'):
-                    metadata[meta.get('name')] = meta.get('content')
-                elif meta.get('property'):
-                    metadata[meta.get('property')] = meta.get('content')
+        Returns:
+            Eine Liste der Bußgeldkatalog-Einträge oder ein Fehler-Dictionary
+        """
+        stats = self.stats
+        try:
+            if stream_download and url not in self._prefetched:
+                with stats.stage('load'):
+                    html_content = self._download_html(url, max_download_bytes, max_download_seconds)
+            else:
+                with stats.stage('load'):
+                    response = self._fetch_url(url)
+                with stats.stage('decode'):
+                    html_content = response.text
+            if stats.enabled:
+                stats.count('bytes_in', len(html_content.encode('utf-8')))
+        except Exception as e:
+            if getattr(e, 'limit', None):
+                return {
+                    'success': False,
+                    'error': str(e),
+                    'limit': e.limit,
+                    'type': 'url'
+                }
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        return self._catalog_from_html(html_content)
+    
+    def _catalog_from_html(self, html_content: str) -> List[Dict]:
+        """Wertet zuerst die Tabellen eines Dokuments aus und greift sonst auf dessen Text zurück."""
+        try:
+            catalog_entries = self.extract_fine_catalog_from_html(html_content)
+            if catalog_entries:
+                return catalog_entries
+        except Exception as e:
+            print(f"Fehler bei HTML-Extraktion: {str(e)}", file=sys.stderr)
+            # Fortfahren mit regulärer Textextraktion
+        
+        # Ohne verwertbare Tabellen wird der Text des Dokuments ausgewertet
+        with self.stats.stage('parse'):
+            text, _ = extract_html_text(html_content)
+        return self.extract_fine_catalog(text)
+    
+    def parse_docx(self, file_path: str) -> Dict:
+        """
+        Extrahiert Text und Metadaten aus einer DOCX-Datei.
+        
+        Args:
+            file_path: Pfad zur DOCX-Datei
             
-            # Haupttext extrahieren (entfernt Skripte, Stile und andere unwichtige Elemente)
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.extract()
+        Returns:
+            Ein Dictionary mit dem extrahierten Text und Metadaten
+        """
+        try:
+            text, metadata, tables = self._read_docx(file_path)
+            return {
+                'success': True,
+                'content': text,
+                'metadata': metadata,
+                'table_count': len(tables),
+                'type': 'docx'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+
+    def parse_docx_catalog(self, file_path: str) -> Union[Dict, List[Dict]]:
+        """
+        Extrahiert Bußgeldkatalog-Einträge aus einer DOCX-Datei.
+
+        Die Tabellen werden wie HTML-Tabellen ausgewertet; nur wenn sie keine
+        Einträge liefern, wird der Text des Dokuments ausgewertet.
+
+        Args:
+            file_path: Pfad zur DOCX-Datei
+
+        Returns:
+            Eine Liste der Bußgeldkatalog-Einträge oder ein Fehler-Dictionary
+        """
+        try:
+            text, _, tables = self._read_docx(file_path, keep_rows=True)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+
+        with self.stats.stage('extract'):
+            catalog_entries = self.extract_fine_catalog_from_rows(tables)
+        if catalog_entries:
+            return catalog_entries
+        return self.extract_fine_catalog(text)
+
+    def _read_docx(self, file_path: str, keep_rows: bool = False) -> Tuple[str, Dict, List]:
+        """
+        Liest Text, Dokumenteigenschaften und Tabellen einer DOCX-Datei in einem Durchgang.
+
+        Tabellenzeilen erscheinen im Text als eine Zeile mit tabulatorgetrennten Zellen.
+
+        Args:
+            file_path: Pfad zur DOCX-Datei
+            keep_rows: Die Zeilen der Tabellen behalten (sonst nur deren Anzahl)
+
+        Returns:
+            Ein Tupel (Text, Metadaten, Tabellen); jede Tabelle ist eine Liste von Zeilen
+            wie bei extract_fine_catalog_from_rows() (leer ohne keep_rows)
+        """
+        import zipfile
+
+        stats = self.stats
+        lines = []
+        paragraph_count = 0
+        tables = []
+        open_tables = {}
+        with zipfile.ZipFile(file_path) as archive:
+            with stats.stage('load'):
+                metadata = _docx_core_properties(archive)
+            with stats.stage('parse'):
+                for kind, value in iter_docx_blocks(archive):
+                    if kind == 'paragraph':
+                        lines.append(value)
+                        paragraph_count += 1
+                    elif kind == 'row':
+                        table_id, cells = value
+                        lines.append('\t'.join(text for _, text in cells))
+                        if keep_rows:
+                            open_tables.setdefault(table_id, []).append(cells)
+                    else:
+                        tables.append(open_tables.pop(value, []))
+        stats.count('paragraphs', paragraph_count)
+        return '\n'.join(lines), metadata, tables
+    
+    def _google_docs_pub_url(self, url: str) -> str:
+        """Wandelt eine Google Docs URL in die Adresse der veröffentlichten Webansicht um."""
+        # Füge "/pub" hinzu, wenn es nicht für die Webansicht formatiert ist
+        if "/pub" not in url and "output=html" not in url:
+            if "/edit" in url:
+                url = url.replace("/edit", "/pub")
+            elif url.endswith("/"):
+                url = url + "pub"
+            else:
+                url = url + "/pub"
+        return url
+    
+    def parse_google_docs_url(self, url: str, **options) -> Dict:
+        """
+        Versucht, eine Google Docs URL zu parsen, indem die Webansicht geladen wird.
+        
+        Args:
+            url: Google Docs URL
+            **options: Download-Optionen, siehe parse_url()
             
-            text_content = soup.get_text(separator='\n', strip=True)
+        Returns:
+            Ein Dictionary mit dem extrahierten Text und Metadaten
+        """
+        # Stellen Sie sicher, dass es sich um eine Google Docs URL handelt
+        if "docs.google.com" not in url:
+            return {
+                'success': False,
+                'error': 'Die URL scheint keine Google Docs URL zu sein.',
+                'type': 'url'
+            }
+        
+        # Versuchen Sie, die URL zu parsen
+        return self.parse_url(self._google_docs_pub_url(url), **options)
+    
+    def parse_google_docs_catalog(self, url: str, **options) -> Union[Dict, List[Dict]]:
+        """
+        Extrahiert Bußgeldkatalog-Einträge aus der Webansicht eines Google Docs.
+        
+        Args:
+            url: Google Docs URL
+            **options: Download-Optionen, siehe parse_url_catalog()
             
-            # Entferne mehrfache Leerzeilen
-            text_content = re.sub(r'\n\s*\n', '\n\n', text_content)
+        Returns:
+            Eine Liste der Bußgeldkatalog-Einträge oder ein Fehler-Dictionary
+        """
+        return self.parse_url_catalog(self._google_docs_pub_url(url), **options)
+    
+    def parse_text(self, file_path: str) -> Dict:
+        """
+        Liest eine einfache Textdatei ein.
+        
+        Args:
+            file_path: Pfad zur Textdatei (UTF-8, ungültige Bytes siehe open_text_file())
             
+        Returns:
+            Ein Dictionary mit dem Text und Metadaten
+        """
+        try:
+            # Lesen und Dekodieren erfolgen in einem Schritt (inkl. Zeilenende-Umwandlung)
+            with self.stats.stage('load'), open_text_file(file_path) as file:
+                content = file.read()
             return {
                 'success': True,
-                'content': text_content,
-                'metadata': metadata,
-                'type': 'url'
+                'content': content,
+                'metadata': {
+                    'title': os.path.basename(file_path)
+                },
+                'type': 'text'
             }
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
                 'traceback': traceback.format_exc()
             }
+    
+    def parse_text_catalog(self, file_path: str) -> Union[Dict, List[Dict]]:
+        """
+        Extrahiert Bußgeldkatalog-Einträge aus einer Textdatei, ohne sie vollständig einzulesen.
+        
+        Die Datei wird blockweise gelesen und zerlegt (siehe iter_text_blocks()),
+        das Ergebnis entspricht extract_fine_catalog() auf dem ganzen Text. Nur
+        wenn die Datei HTML-Tabellen enthält, wird sie dafür ganz eingelesen.
+        
+        Args:
+            file_path: Pfad zur Textdatei
+            
+        Returns:
+            Eine Liste der Bußgeldkatalog-Einträge oder ein Fehler-Dictionary
+        """
+        try:
+            markup = set()
+            length = 0
+            
+            def blocks():
+                nonlocal length
+                for offset, block in iter_text_blocks(file_path):
+                    markup.update(tag for tag in ('<table', '</table>') if tag in block)
+                    length = offset + len(block)
+                    yield offset, block
+            
+            with self.stats.stage('extract'):
+                catalog = self._catalog_from_records(self._iter_catalog_records(blocks()))
+                if len(markup) == 2 or not length:
+                    # HTML-Tabellen im Text bzw. leere Datei: wie extract_fine_catalog() auf dem ganzen Text
+                    with open_text_file(file_path) as file:
+                        return self.extract_fine_catalog(file.read())
+                if catalog:
+                    return catalog
+                # Ohne das überlappende "\n" am Anfang jedes weiteren Blocks
+                return self._fallback_catalog(
+                    line for index, (_, block) in enumerate(iter_text_blocks(file_path))
+                    for line in (block[1:] if index else block).splitlines())
         except Exception as e:
             return {
                 'success': False,
@@ -217,163 +1604,491 @@ class DocumentParser:
                 'traceback': traceback.format_exc()
             }
     
-    def parse_docx(self, file_path: str) -> Dict:
+    def iter_text_sections(self, file_path: str, with_content: bool = True):
+        """
+        Liefert die Abschnitte einer Textdatei nacheinander, ohne sie vollständig einzulesen.
+        
+        Das Ergebnis entspricht iter_sections() auf dem ganzen Text (inkl. der
+        Offsets); gehalten wird nur der Inhalt des jeweils offenen Abschnitts.
+        
+        Args:
+            file_path: Pfad zur Textdatei
+            with_content: Ob der Inhalt jedes Abschnitts als String erzeugt wird
+            
+        Yields:
+            Ein Dictionary pro Abschnitt
+        """
+        yield from self._iter_block_sections(iter_text_blocks(file_path), with_content)
+    
+    def detect_backend(self, input_path: str) -> Optional[ParserBackend]:
+        """
+        Ermittelt das passende Backend anhand von Magic Bytes, Inhalt, MIME-Typ und Endung.
+        
+        Args:
+            input_path: Pfad zur Datei oder URL
+            
+        Returns:
+            Das am besten passende Backend oder None
+        """
+        head = b''
+        if not _is_url(input_path, head):
+            with open(input_path, 'rb') as file:
+                head = file.read(SNIFF_BYTES)
+        
+        best_backend, best_score = None, 0
+        for backend in _BACKENDS:
+            score = backend.score(input_path, head)
+            if score > best_score:
+                best_backend, best_score = backend, score
+        
+        # Unbekannte Endung, aber offensichtlich Text: als Textdatei behandeln
+        if best_backend is None and head and _looks_like_text(input_path, head):
+            best_backend = next(backend for backend in _BACKENDS if backend.name == 'text')
+        return best_backend
+    
+    def detect_and_parse(self, input_path: str, **options) -> Dict:
         """
-        Extrahiert Text und Metadaten aus einer DOCX-Datei.
+        Erkennt den Dateityp und wendet den entsprechenden Parser an.
         
         Args:
-            file_path: Pfad zur DOCX-Datei
+            input_path: Pfad zur Datei oder URL
+            **options: Zusätzliche Parser-Optionen (z.B. pages); Optionen, die das
+                erkannte Format nicht unterstützt, werden ignoriert
             
         Returns:
             Ein Dictionary mit dem extrahierten Text und Metadaten
         """
-        try:
-            # Da wir docx nicht direkt installiert haben, geben wir eine Fehlermeldung zurück
-            return {
+        backend, error = self._select_backend(input_path)
+        if error:
+            return error
+        return getattr(self, backend.loader)(input_path, **self._loader_options(backend, options))
+    
+    def _select_backend(self, input_path: str) -> Tuple[Optional[ParserBackend], Optional[Dict]]:
+        """Ermittelt das Backend für eine Eingabe; liefert (Backend, None) oder (None, Fehler)."""
+        # Überprüfen, ob die Datei existiert
+        if not _is_url(input_path, b'') and not os.path.exists(input_path):
+            return None, {
                 'success': False,
-                'error': 'DOCX-Parsing ist aktuell nicht unterstützt. Bitte installieren Sie die "python-docx" Bibliothek.',
-                'type': 'docx'
+                'error': f'Die Datei {input_path} wurde nicht gefunden.'
             }
-        except Exception as e:
-            return {
+        
+        try:
+            backend = self.detect_backend(input_path)
+        except OSError as e:
+            return None, {
                 'success': False,
                 'error': str(e),
                 'traceback': traceback.format_exc()
             }
+        
+        if backend is None:
+            _, ext = os.path.splitext(input_path)
+            return None, {
+                'success': False,
+                'error': f'Nicht unterstützter Dateityp: {ext.lower()}'
+            }
+        return backend, None
+    
+    def _loader_options(self, backend: ParserBackend, options: Dict) -> Dict:
+        """Filtert die Optionen, die das Backend unterstützt."""
+        return {key: value for key, value in options.items()
+                if key in backend.options and value is not None}
     
-    def parse_google_docs_url(self, url: str) -> Dict:
+    def process(self, input_path: str, mode: str = 'text', **options) -> Union[Dict, List[Dict]]:
         """
-        Versucht, eine Google Docs URL zu parsen, indem die Webansicht geladen wird.
+        Parst eine Eingabe und bereitet das Ergebnis für den gewünschten Modus auf.
         
         Args:
-            url: Google Docs URL
+            input_path: Pfad zur Datei oder URL
+            mode: Ausgabemodus ('text', 'sections' oder 'catalog')
+            **options: Zusätzliche Parser-Optionen, siehe detect_and_parse()
             
         Returns:
-            Ein Dictionary mit dem extrahierten Text und Metadaten
+            Das Ergebnis-Dictionary (Text-Modus oder Fehler) bzw. die Liste der
+            Abschnitte oder Bußgeldkatalog-Einträge
         """
-        # Stellen Sie sicher, dass es sich um eine Google Docs URL handelt
-        if "docs.google.com" not in url:
+        if mode not in MODES:
             return {
                 'success': False,
-                'error': 'Die URL scheint keine Google Docs URL zu sein.',
-                'type': 'url'
+                'error': f'Ungültiger Modus: {mode}'
             }
         
-        # Füge "/pub" hinzu, wenn es nicht für die Webansicht formatiert ist
-        if "/pub" not in url and "output=html" not in url:
-            if "/edit" in url:
-                url = url.replace("/edit", "/pub")
-            elif url.endswith("/"):
-                url = url + "pub"
-            else:
-                url = url + "/pub"
+        # Gestreamte Downloads behalten den Seiteninhalt nicht und umgehen daher den HTTP-Cache
+        if self.http_cache is not None and _is_url(input_path, b'') and not options.get('stream_download'):
+            return self._process_url_cached(input_path, mode, options)
         
-        # Versuchen Sie, die URL zu parsen
-        return self.parse_url(url)
+        cache_key = None
+        if self.cache is not None and not _is_url(input_path, b'') and os.path.isfile(input_path):
+            try:
+                cache_key = self.cache.key(input_path, mode, options)
+                cached = self.cache.get(cache_key)
+            except OSError:
+                cache_key = cached = None
+            if cached is not None:
+                self.stats.count('cache_hits')
+                return cached
+        
+        output = self._process_uncached(input_path, mode, options)
+        if isinstance(output, dict) and not output.get('success', True):
+            return output
+        
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, output)
+            except OSError as e:
+                print(f"Cache konnte nicht geschrieben werden: {str(e)}", file=sys.stderr)
+        return output
     
-    def detect_and_parse(self, input_path: str) -> Dict:
+    def process_with_stats(self, input_path: str, mode: str = 'text', trace_memory: bool = False,
+                           **options) -> Tuple[Union[Dict, List[Dict]], Stats]:
         """
-        Erkennt den Dateityp und wendet den entsprechenden Parser an.
+        Wie process(), misst dabei aber die einzelnen Verarbeitungsschritte.
+        
+        Die Serialisierung ist nicht enthalten; sie wird vom Aufrufer mit
+        stats.stage('serialize') gemessen, siehe instrumentation.attach_stats().
         
         Args:
             input_path: Pfad zur Datei oder URL
+            mode: Ausgabemodus ('text', 'sections' oder 'catalog')
+            trace_memory: Zusätzlich den Spitzenspeicher per tracemalloc messen
+            **options: Zusätzliche Parser-Optionen, siehe detect_and_parse()
             
         Returns:
-            Ein Dictionary mit dem extrahierten Text und Metadaten
+            (Ergebnis wie bei process(), Stats)
         """
-        # Überprüfen, ob es sich um eine URL handelt
-        if input_path.startswith('http://') or input_path.startswith('https://'):
-            # Wenn es eine Google Docs URL ist
-            if 'docs.google.com' in input_path:
-                return self.parse_google_docs_url(input_path)
-            # Andere URLs
-            return self.parse_url(input_path)
+        stats = Stats(trace_memory)
+        if not _is_url(input_path, b'') and os.path.isfile(input_path):
+            stats.count('bytes_in', os.path.getsize(input_path))
         
-        # Überprüfen, ob die Datei existiert
-        if not os.path.exists(input_path):
-            return {
-                'success': False,
-                'error': f'Die Datei {input_path} wurde nicht gefunden.'
-            }
+        self._local.stats = stats
+        stats.start()
+        try:
+            output = self.process(input_path, mode, **options)
+        finally:
+            stats.stop()
+            del self._local.stats
+        
+        if isinstance(output, list):
+            stats.count('sections' if mode == 'sections' else 'entries', len(output))
+        return output, stats
+    
+    def _process_url_cached(self, url: str, mode: str, options: Dict) -> Union[Dict, List[Dict]]:
+        """Verarbeitet eine URL mit bedingter Anfrage; bei 304 wird das gespeicherte Ergebnis genutzt."""
+        target = self._fetch_target(url)
+        result_key = self.http_cache.result_key(mode, options)
+        entry = self.http_cache.get(self.http_cache.url_key(target))
+        if entry is not None and self.http_cache.is_fresh(entry) and result_key in entry['results']:
+            return entry['results'][result_key]
         
-        # Dateityp anhand der Erweiterung erkennen
-        _, ext = os.path.splitext(input_path)
-        ext = ext.lower()
-        
-        if ext == '.pdf':
-            return self.parse_pdf(input_path)
-        elif ext in ['.html', '.htm']:
-            return self.parse_html(input_path)
-        elif ext in ['.docx']:
-            return self.parse_docx(input_path)
-        elif ext in ['.txt']:
-            # Einfache Textdatei parsen
+        # Die Antwort wird über _prefetched an den Loader des Backends weitergereicht
+        if target not in self._prefetched:
+            from url_fetcher import fetch
             try:
-                with open(input_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                return {
-                    'success': True,
-                    'content': content,
-                    'metadata': {
-                        'title': os.path.basename(input_path)
-                    },
-                    'type': 'text'
-                }
+                self._prefetched[target] = fetch(target, headers=self.http_cache.conditional_headers(entry))
             except Exception as e:
-                return {
-                    'success': False,
-                    'error': str(e),
-                    'traceback': traceback.format_exc()
-                }
+                self._prefetched[target] = e
+        response = self._prefetched[target]
+        
+        if entry is not None and getattr(response, 'status_code', None) == 304:
+            self.http_cache.revalidated += 1
+            response = None
+            if result_key in entry['results']:
+                del self._prefetched[target]
+                output = entry['results'][result_key]
+                if self.http_cache.ttl:
+                    self._store_http_result(target, None, result_key, output, entry)
+                return output
+            # Unverändert, aber in diesem Modus noch nicht geparst: gespeicherten Inhalt verwenden
+            self._prefetched[target] = self.http_cache.response(entry)
+        
+        output = self._process_uncached(url, mode, options)
+        if isinstance(output, dict) and not output.get('success', True):
+            return output
+        if not isinstance(response, Exception):
+            self._store_http_result(target, response, result_key, output, entry)
+        return output
+    
+    def _store_http_result(self, url: str, response, result_key: str, output, entry: Optional[Dict]):
+        try:
+            self.http_cache.store(url, response, result_key, output, entry)
+        except OSError as e:
+            print(f"HTTP-Cache konnte nicht geschrieben werden: {str(e)}", file=sys.stderr)
+    
+    def _process_uncached(self, input_path: str, mode: str, options: Dict) -> Union[Dict, List[Dict]]:
+        # Formate mit eigenem Katalog-Loader (z.B. HTML) werden nur einmal geparst
+        if mode == 'catalog':
+            backend, error = self._select_backend(input_path)
+            if error:
+                return error
+            if backend.catalog_loader:
+                return getattr(self, backend.catalog_loader)(input_path, **self._loader_options(backend, options))
+        
+        # Formate mit eigenem Abschnitts-Loader (Textdateien) werden blockweise gelesen
+        if mode == 'sections':
+            backend, error = self._select_backend(input_path)
+            if error:
+                return error
+            if backend.sections_loader:
+                try:
+                    with self.stats.stage('extract'):
+                        return list(getattr(self, backend.sections_loader)(input_path,
+                                                                           **self._loader_options(backend, options)))
+                except Exception as e:
+                    return {
+                        'success': False,
+                        'error': str(e),
+                        'traceback': traceback.format_exc()
+                    }
+        
+        result = self.detect_and_parse(input_path, **options)
+        if not result['success']:
+            return result
+        
+        if mode == 'sections':
+            with self.stats.stage('extract'):
+                return self.extract_sections(result['content'])
+        if mode == 'catalog':
+            with self.stats.stage('extract'):
+                return self.extract_fine_catalog(result['content'])
+        return result
+    
+    def iter_records(self, input_path: str, mode: str = 'text', **options):
+        """
+        Liefert das Ergebnis als Folge einzelner Datensätze für die NDJSON-Ausgabe.
+        
+        PDF-Dateien werden im Text-Modus seitenweise ausgegeben, sobald eine Seite
+        extrahiert ist ('record': 'page'), gefolgt von einem Datensatz mit den
+        Metadaten ('record': 'document'). In den anderen Modi ist jeder Abschnitt
+        bzw. Katalogeintrag ein Datensatz. Fehler werden als Datensatz mit
+        'success': False gemeldet.
+        
+        Args:
+            input_path: Pfad zur Datei oder URL
+            mode: Ausgabemodus ('text', 'sections' oder 'catalog')
+            **options: Zusätzliche Parser-Optionen, siehe detect_and_parse()
+            
+        Yields:
+            Die einzelnen Datensätze
+        """
+        if mode == 'text' and not _is_url(input_path, b'') and os.path.exists(input_path):
+            backend = self.detect_backend(input_path)
+            if backend is not None and backend.name == 'pdf':
+                yield from self._iter_pdf_records(input_path, options.get('pages'), options.get('workers') or 1)
+                return
+        
+        if mode == 'sections' and not _is_url(input_path, b'') and os.path.exists(input_path):
+            backend = self.detect_backend(input_path)
+            if backend is not None and backend.sections_loader:
+                # Abschnitte direkt beim Lesen der Datei ausgeben
+                try:
+                    yield from getattr(self, backend.sections_loader)(input_path,
+                                                                      **self._loader_options(backend, options))
+                except Exception as e:
+                    yield {
+                        'record': 'error',
+                        'success': False,
+                        'error': str(e),
+                        'traceback': traceback.format_exc()
+                    }
+                return
+        
+        if mode == 'sections':
+            # Abschnitte direkt aus dem Text erzeugen, ohne die vollständige Liste aufzubauen
+            result = self.process(input_path, 'text', **options)
+            if result.get('success', True) and 'content' in result:
+                yield from self.iter_sections(result['content'])
+                return
         else:
-            return {
+            result = self.process(input_path, mode, **options)
+        
+        if isinstance(result, list):
+            yield from result
+        elif not result.get('success', True):
+            yield dict(result, record='error')
+        else:
+            yield dict(result, record='document')
+    
+    def _iter_pdf_records(self, file_path: str, pages: Optional[str] = None, workers: int = 1):
+        """Erzeugt die Seiten- und Dokument-Datensätze einer PDF-Datei für iter_records()."""
+        try:
+            from PyPDF2 import PdfReader
+            
+            pdf_reader = PdfReader(file_path)
+            extracted = 0
+            for page in self.iter_pdf_pages(file_path, pages, reader=pdf_reader, workers=workers):
+                extracted += 1
+                yield dict(page, record='page')
+            
+            yield {
+                'record': 'document',
+                'success': True,
+                'metadata': self._pdf_metadata(pdf_reader),
+                'page_count': len(pdf_reader.pages),
+                'pages_extracted': extracted,
+                'type': 'pdf'
+            }
+        except Exception as e:
+            yield {
+                'record': 'error',
                 'success': False,
-                'error': f'Nicht unterstützter Dateityp: {ext}'
+                'error': str(e),
+                'traceback': traceback.format_exc()
             }
     
-    def extract_sections(self, text: str, section_pattern: Optional[str] = None) -> List[Dict]:
+    def extract_sections(self, text: str, section_pattern: Optional[str] = None,
+                         with_content: bool = True) -> List[Dict]:
         """
         Extrahiert Abschnitte aus dem Text basierend auf einem Muster.
         
         Args:
             text: Der zu verarbeitende Text
             section_pattern: Ein regulärer Ausdruck, um Abschnitte zu erkennen
+            with_content: Ob der Inhalt jedes Abschnitts als String erzeugt wird
             
         Returns:
             Eine Liste von Dictionaries mit den erkannten Abschnitten
         """
+        return list(self.iter_sections(text, section_pattern, with_content))
+    
+    def iter_sections(self, text: str, section_pattern: Optional[str] = None, with_content: bool = True):
+        """
+        Liefert die Abschnitte eines Textes nacheinander, ohne den Text zu kopieren.
+        
+        Jeder Abschnitt enthält die Offsets 'start' (Überschriftszeile),
+        'content_start' und 'end', sodass text[content_start:end] den Inhalt
+        ergibt. Mit with_content=False wird 'content' nicht erzeugt.
+        
+        Args:
+            text: Der zu verarbeitende Text
+            section_pattern: Ein regulärer Ausdruck, um Abschnitte zu erkennen
+            with_content: Ob der Inhalt jedes Abschnitts als String erzeugt wird
+            
+        Yields:
+            Ein Dictionary pro Abschnitt
+        """
         if not section_pattern:
-            # Standardmuster für Abschnitte (z.B. "§ 1.", "Artikel 1.", "1.")
-            section_pattern = r'(?:§|Artikel|Art\.|)\s*(\d+)[\.:]'
+            yield from self._iter_block_sections([(0, text)], with_content)
+            return
         
-        sections = []
-        current_section = None
+        previous = None
+        for header in self._iter_section_headers(text, section_pattern):
+            if previous is not None:
+                yield self._make_section(text, previous, header[0], with_content)
+            previous = header
         
-        for line in text.split('\n'):
-            match = re.match(section_pattern, line.strip())
-            if match:
-                if current_section:
-                    sections.append(current_section)
-                
-                section_number = match.group(1)
-                current_section = {
-                    'number': section_number,
-                    'title': line.strip(),
-                    'content': ''
-                }
-            elif current_section:
-                current_section['content'] += line + '\n'
+        if previous is not None:
+            yield self._make_section(text, previous, len(text), with_content)
+    
+    def _iter_block_sections(self, blocks, with_content: bool = True):
+        """
+        Liefert die Abschnitte (Standardmuster) eines Textes, der in Blöcken vorliegt.
+        
+        Args:
+            blocks: (Offset, Block)-Paare wie von iter_text_blocks(); ein ganzer
+                Text ist der einzelne Block (0, text)
+            with_content: Ob der Inhalt jedes Abschnitts als String erzeugt wird
+            
+        Yields:
+            Ein Dictionary pro Abschnitt, wie iter_sections()
+        """
+        # Der offene Abschnitt: (Anfang, Zeilenende, Nummer, Titel) in Offsets des Gesamttextes
+        header = None
+        # Inhalt des offenen Abschnitts aus früheren Blöcken und Offset, bis zu dem er gesammelt ist
+        pieces = []
+        collected = 0
+        length = 0
         
-        # Den letzten Abschnitt hinzufügen
-        if current_section:
-            sections.append(current_section)
+        for offset, block in blocks:
+            length = offset + len(block)
+            for start, line_end, number in self._iter_section_headers(block):
+                if header is not None:
+                    yield self._block_section(header, pieces, collected, block, offset, offset + start,
+                                              with_content, False)
+                header = (offset + start, offset + line_end, number, block[start:line_end].strip())
+                pieces = []
+                collected = header[1] + 1
+            
+            if header is not None and with_content and collected < length:
+                pieces.append(block[max(collected - offset, 0):])
+                collected = length
+        
+        if header is not None:
+            yield self._block_section(header, pieces, collected, '', length, length, with_content, True)
+    
+    def _block_section(self, header, pieces: List[str], collected: int, block: str, offset: int, end: int,
+                       with_content: bool, last: bool) -> Dict:
+        """Erzeugt den Abschnitt für _iter_block_sections(), der bis zum Offset end reicht."""
+        start, line_end, number, title = header
+        content_start = min(line_end + 1, end)
+        section = {
+            'number': number,
+            'title': title
+        }
+        if with_content:
+            if collected < end:
+                pieces.append(block[max(collected - offset, 0):end - offset])
+            content = ''.join(pieces)
+            # Wie bisher endet der Inhalt des letzten Abschnitts mit einem Zeilenumbruch
+            if last and line_end < end:
+                content += '\n'
+            section['content'] = content
+        section['start'] = start
+        section['content_start'] = content_start
+        section['end'] = end
+        return section
+    
+    def _iter_section_headers(self, text: str, section_pattern: Optional[str] = None):
+        """Liefert (Zeilenanfang, Zeilenende, Nummer) für jede Überschriftszeile."""
+        if not section_pattern:
+            match = _SECTION_PATTERN.match(text)
+            if match:
+                line_end = text.find('\n', match.end())
+                yield 0, len(text) if line_end < 0 else line_end, match.group(1)
+            for match in _SECTION_START_PATTERN.finditer(text):
+                line_end = text.find('\n', match.end())
+                yield match.start() + 1, len(text) if line_end < 0 else line_end, match.group(1)
+            return
         
-        return sections
+        # Eigene Muster werden wie bisher auf die bereinigte Zeile angewendet
+        pattern = re.compile(section_pattern)
+        length = len(text)
+        line_start = 0
+        while line_start <= length:
+            line_end = text.find('\n', line_start)
+            if line_end < 0:
+                line_end = length
+            match = pattern.match(text[line_start:line_end].strip())
+            if match:
+                yield line_start, line_end, match.group(1)
+            line_start = line_end + 1
+    
+    def _make_section(self, text: str, header, end: int, with_content: bool) -> Dict:
+        """Erzeugt den Abschnitt zu einer Überschrift, der bis zum Offset end reicht."""
+        start, line_end, number = header
+        content_start = min(line_end + 1, end)
+        section = {
+            'number': number,
+            'title': text[start:line_end].strip()
+        }
+        if with_content:
+            content = text[content_start:end]
+            # Wie bisher endet der Inhalt des letzten Abschnitts mit einem Zeilenumbruch
+            if end == len(text) and line_end < end:
+                content += '\n'
+            section['content'] = content
+        section['start'] = start
+        section['content_start'] = content_start
+        section['end'] = end
+        return section
     
     def extract_fine_catalog(self, text: str) -> List[Dict]:
         """
         Spezielle Funktion zur Extraktion von Bußgeldkatalog-Einträgen aus Text.
         
+        Eine Zeile "Kategorie: ..." (bzw. "Bereich: ...") gilt für alle folgenden
+        Einträge bis zur nächsten Kategorie; Einträge vor der ersten Kategorie
+        erhalten 'Allgemein'. Beträge mit Tausenderpunkt ("$1.000,00") ergeben 1000.
+        
         Args:
             text: Der zu verarbeitende Text
             
@@ -394,151 +2109,254 @@ class DocumentParser:
             print(f"Fehler bei HTML-Extraktion: {str(e)}", file=sys.stderr)
             # Fortfahren mit regulärer Textextraktion
         
-        # Einfache Implementierung: Suche nach Mustern wie "Verstoß: XYZ" oder "Bußgeld: 123"
+        # Zeilenweise Zerlegung in Datensätze ("Verstoß: XYZ", "Bußgeld: 123", ...)
         try:
-            violations = re.findall(r'(?:Verstoß|Delikt|Tat):\s*([^\n]+)', text)
-            amounts = re.findall(r'(?:Bußgeld|Strafe|Geldstrafe):\s*(\d+(?:[.,]\d+)?)', text)
-            amount_ranges = re.findall(r'(?:Bußgeld|Strafe|Geldstrafe)?\s*:?\s*(\d+(?:[.,]\d+)?)\s*(?:-|–|bis|to)\s*(\d+(?:[.,]\d+)?)', text, flags=re.IGNORECASE)
-            prison_days = re.findall(r'(?:Haftzeit|Gefängnis|Freiheitsstrafe):\s*([\d\-–bis\s.,]+)', text)
-            categories = re.findall(r'(?:Kategorie|Bereich):\s*([^\n]+)', text)
-            notes = re.findall(r'(?:Notizen|Anmerkungen|Hinweise):\s*([^\n]+)', text)
-            community_services = re.findall(r'(?:Strafarbeit|Community Service|Dienststunden|Arbeitsstunden):\s*([\d\-–bis\s.,]+)', text, flags=re.IGNORECASE)
+            records = self._tokenize_fine_catalog(text)
         except Exception as e:
             print(f"Fehler bei Regex-Extraktion: {str(e)}", file=sys.stderr)
             return [{'category': 'Allgemein', 'violation': 'Extraktionsfehler', 'description': 'Fehler bei der Textextraktion', 'amount': 0, 'amount_min': 0, 'amount_max': 0, 'prison_days': 0, 'prison_days_min': 0, 'prison_days_max': 0, 'community_service_hours': 0, 'community_service_hours_min': 0, 'community_service_hours_max': 0, 'notes': str(e)}]
         
-        # Bestimme die maximale Anzahl von Einträgen
-        max_entries = max(
-            len(violations),
-            len(amounts),
-            len(amount_ranges),
-            len(prison_days),
-            len(categories),
-            len(community_services)
-        )
+        catalog = self._catalog_from_records(records)
+        if catalog:
+            return catalog
         
-        if max_entries == 0:
-            # Versuche allgemeinere Muster, die in Zeilen vorkommen könnten
-            lines = text.split('\n')
-            fallback_entries = []
-            for line in lines:
-                # Suche nach Zeilen, die ein Paragraphenzeichen und Geldbeträge enthalten
-                if ('§' in line or 'Paragraph' in line) and (re.search(r'\$\d+', line) or re.search(r'\d+\s*Euro', line)):
-                    match_offense = re.search(r'§\s*\d+\s*(.+?)(?:\$|\d+\s*Euro|$)', line)
-                    match_amount = re.search(r'[\$€](\d+(?:[.,]\d+)?)', line)
-                    match_prison = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:-|–|bis)\s*(\d+(?:[.,]\d+)?)', line)
-                    match_prison_single = re.search(r'(\d+)\s*(?:Tage|Tagen|Tag)', line)
-                    match_range = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:-|–|bis)\s*(\d+(?:[.,]\d+)?)', line)
-                    match_cs = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:Stunden|Std|h)', line, flags=re.IGNORECASE)
-                    
-                    prison_min = prison_max = 0
-                    if match_prison:
-                        prison_min = int(float(match_prison.group(1).replace(',', '.')))
-                        prison_max = int(float(match_prison.group(2).replace(',', '.')))
-                    elif match_prison_single:
-                        prison_min = prison_max = int(match_prison_single.group(1))
-
-                    entry = {
-                        'category': 'Allgemein',
-                        'violation': match_offense.group(1).strip() if match_offense else line,
-                        'amount': float(match_amount.group(1).replace(',', '.')) if match_amount else float(match_range.group(2).replace(',', '.')) if match_range else 0,
-                        'amount_min': float(match_range.group(1).replace(',', '.')) if match_range else float(match_amount.group(1).replace(',', '.')) if match_amount else 0,
-                        'amount_max': float(match_range.group(2).replace(',', '.')) if match_range else float(match_amount.group(1).replace(',', '.')) if match_amount else 0,
-                        'prison_days': prison_max or prison_min,
-                        'prison_days_min': prison_min,
-                        'prison_days_max': prison_max or prison_min,
-                        'community_service_hours': int(float(match_cs.group(1).replace(',', '.'))) if match_cs else 0,
-                        'community_service_hours_min': int(float(match_cs.group(1).replace(',', '.'))) if match_cs else 0,
-                        'community_service_hours_max': int(float(match_cs.group(1).replace(',', '.'))) if match_cs else 0,
-                        'description': line.strip(),
-                        'notes': ''
-                    }
-                    fallback_entries.append(entry)
-            
-            return fallback_entries
+        return self._fallback_catalog(text.splitlines())
+    
+    def _catalog_from_records(self, records) -> List[Dict]:
+        """
+        Erzeugt die Bußgeldkatalog-Einträge aus den Datensätzen von _tokenize_fine_catalog().
         
+        Die zuletzt gelesene Kategorie gilt auch für die folgenden Einträge ohne
+        eigene Kategorie; Zahlen mit Tausenderpunkt ("1.000,50") werden als solche
+        gelesen (siehe CHANGELOG.md).
+        
+        Args:
+            records: Iterierbare Folge von Datensätzen (Feldname -> Rohwert)
+            
+        Returns:
+            Eine Liste von Dictionaries mit den Bußgeldkatalog-Einträgen
+        """
         # Erzeuge die Einträge
         catalog = []
-        for i in range(max_entries):
-            entry = {}
+        current_category = 'Allgemein'
+        for record in records:
+            # Eine Kategorie gilt auch für die folgenden Einträge ohne eigene Kategorie
+            if 'category' in record:
+                current_category = record['category']
+            if not any(field in record for field in ('violation', 'amount', 'prison', 'community_service')):
+                continue
             
-            if i < len(categories):
-                entry['category'] = categories[i].strip()
-            else:
-                entry['category'] = 'Allgemein'
+            entry = {}
+            entry['category'] = current_category
+            entry['violation'] = record.get('violation') or f'Unbekannter Verstoß {len(catalog) + 1}'
             
-            if i < len(violations):
-                entry['violation'] = violations[i].strip()
-            else:
-                entry['violation'] = f'Unbekannter Verstoß {i+1}'
+            amount_value, amount_min, amount_max = self._parse_amount_field(record.get('amount', ''))
+            entry['amount'] = float(amount_value)
+            entry['amount_min'] = float(amount_min)
+            entry['amount_max'] = float(amount_max)
             
-            amount_value = amount_min = amount_max = 0.0
-            if i < len(amount_ranges):
-                try:
-                    amount_min = float(amount_ranges[i][0].replace(',', '.'))
-                    amount_max = float(amount_ranges[i][1].replace(',', '.'))
-                    amount_value = amount_max or amount_min
-                except (ValueError, IndexError):
-                    pass
-            elif i < len(amounts):
-                try:
-                    amount_value = amount_min = amount_max = float(amounts[i].replace(',', '.'))
-                except ValueError:
-                    pass
-            entry['amount'] = amount_value
-            entry['amount_min'] = amount_min
-            entry['amount_max'] = amount_max
-            
-            prison_min = prison_max = 0
-            if i < len(prison_days):
-                prison_min, prison_max = self._parse_prison_days(prison_days[i])
+            prison_min, prison_max = self._parse_prison_days(record.get('prison', ''))
             entry['prison_days'] = prison_max or prison_min
             entry['prison_days_min'] = prison_min
             entry['prison_days_max'] = prison_max or prison_min
 
-            cs_min = cs_max = 0
-            if i < len(community_services):
-                cs_min, cs_max = self._parse_community_service(community_services[i])
+            cs_min, cs_max = self._parse_community_service(record.get('community_service', ''))
             entry['community_service_hours'] = cs_max or cs_min
             entry['community_service_hours_min'] = cs_min
             entry['community_service_hours_max'] = cs_max or cs_min
             
             entry['description'] = entry['violation']
-            
-            if i < len(notes):
-                entry['notes'] = notes[i].strip()
-            else:
-                entry['notes'] = ''
+            entry['notes'] = record.get('notes', '')
             
             catalog.append(entry)
         
         return catalog
+    
+    def _fallback_catalog(self, lines) -> List[Dict]:
+        """
+        Sucht Einträge zeilenweise über allgemeinere Muster (Paragraph und Geldbetrag in einer Zeile).
+        
+        Args:
+            lines: Iterierbare Folge der Zeilen des Textes
+            
+        Returns:
+            Eine Liste von Dictionaries mit den gefundenen Bußgeldkatalog-Einträgen
+        """
+        fallback_entries = []
+        for line in lines:
+            # Suche nach Zeilen, die ein Paragraphenzeichen und Geldbeträge enthalten
+            if ('§' in line or 'Paragraph' in line) and (_FALLBACK_DOLLAR.search(line) or _FALLBACK_EURO.search(line)):
+                # Teure Muster nur prüfen, wenn die Zeile das nötige Stichwort enthält
+                match_offense = _FALLBACK_OFFENSE.search(line) if '§' in line else None
+                match_amount = _FALLBACK_AMOUNT.search(line)
+                match_range = _FALLBACK_RANGE.search(line) if ('-' in line or '–' in line or 'bis' in line) else None
+                match_prison_single = _FALLBACK_DAYS.search(line) if 'Tag' in line else None
+                match_cs = _FALLBACK_HOURS.search(line)
+                
+                amount = _parse_number(match_amount.group(1)) if match_amount else None
+                range_min = range_max = None
+                prison_min = prison_max = 0
+                if match_range:
+                    try:
+                        range_min = _parse_number(match_range.group(1))
+                        range_max = _parse_number(match_range.group(2))
+                        prison_min, prison_max = int(range_min), int(range_max)
+                    except ValueError:
+                        range_min = range_max = None
+                if range_min is None and match_prison_single:
+                    prison_min = prison_max = int(match_prison_single.group(1))
+                hours = int(_parse_number(match_cs.group(1))) if match_cs else 0
+
+                entry = {
+                    'category': 'Allgemein',
+                    'violation': match_offense.group(1).strip() if match_offense else line,
+                    'amount': amount if amount is not None else range_max if range_max is not None else 0,
+                    'amount_min': range_min if range_min is not None else amount if amount is not None else 0,
+                    'amount_max': range_max if range_max is not None else amount if amount is not None else 0,
+                    'prison_days': prison_max or prison_min,
+                    'prison_days_min': prison_min,
+                    'prison_days_max': prison_max or prison_min,
+                    'community_service_hours': hours,
+                    'community_service_hours_min': hours,
+                    'community_service_hours_max': hours,
+                    'description': line.strip(),
+                    'notes': ''
+                }
+                fallback_entries.append(entry)
+        
+        return fallback_entries
+    
+    def _tokenize_fine_catalog(self, text: str) -> List[Dict[str, str]]:
+        """
+        Zerlegt einen Text in einem Durchgang in Datensätze aus Feldern wie "Verstoß: ...".
+        
+        Ein Datensatz endet, wenn ein Feld erneut auftritt oder nach einem Verstoß
+        eine Leerzeile folgt. Fehlende Felder verschieben daher keine späteren Einträge.
+        
+        Args:
+            text: Der zu verarbeitende Text
+            
+        Returns:
+            Eine Liste von Datensätzen (Feldname -> Rohwert)
+        """
+        return list(self._iter_catalog_records([(0, text)]))
+    
+    def _iter_catalog_records(self, blocks):
+        """
+        Wie _tokenize_fine_catalog(), für einen Text, der in Blöcken vorliegt.
+        
+        Ein Feldwert endet spätestens am Zeilenende und damit im selben Block;
+        über Blockgrenzen hinweg bleibt nur der offene Datensatz erhalten.
+        
+        Args:
+            blocks: (Offset, Block)-Paare wie von iter_text_blocks()
+            
+        Yields:
+            Die Datensätze (Feldname -> Rohwert)
+        """
+        records = []
+        current = {}
         
-    def extract_fine_catalog_from_html(self, html_content: str) -> List[Dict]:
+        for _, text in blocks:
+            pending_field = None
+            value_start = 0
+            
+            def add_field(field, value_end):
+                nonlocal current
+                # Der Wert reicht bis zum nächsten Token, höchstens bis zum Zeilenende
+                line_end = text.find('\n', value_start, value_end)
+                value = text[value_start:value_end if line_end < 0 else line_end].strip()
+                if not value:
+                    return
+                if field in current:
+                    records.append(current)
+                    current = {}
+                current[field] = value
+            
+            for match in _CATALOG_TOKEN_PATTERN.finditer(text):
+                if pending_field is not None:
+                    add_field(pending_field, match.start())
+                    pending_field = None
+                
+                if match.lastgroup == 'blank':
+                    if 'violation' in current:
+                        records.append(current)
+                        current = {}
+                else:
+                    pending_field = match.lastgroup
+                    value_start = match.end()
+            
+            if pending_field is not None:
+                add_field(pending_field, len(text))
+            yield from records
+            records.clear()
+        
+        if current:
+            yield current
+        
+    def extract_fine_catalog_from_html(self, html_content, engine: str = 'fast') -> List[Dict]:
         """
         Extrahiert Bußgeldkatalog-Einträge aus einer HTML-Tabelle.
         
         Args:
-            html_content: HTML-Inhalt mit einer Tabelle
+            html_content: HTML-Inhalt mit einer Tabelle oder ein bereits
+                geparstes BeautifulSoup-Dokument
+            engine: 'fast' liest nur die Tabellen mit einem ereignisbasierten
+                Parser, 'bs4' baut einen vollständigen BeautifulSoup-Baum auf
+                (bei einem BeautifulSoup-Dokument wird immer dieses verwendet)
             
         Returns:
             Eine Liste von Dictionaries mit den extrahierten Bußgeldkatalog-Einträgen
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        catalog = []
+        stats = self.stats
+        if isinstance(html_content, str) and engine == 'fast':
+            with stats.stage('parse'):
+                tables = iter_html_tables(html_content)
+            with stats.stage('extract'):
+                return self.extract_fine_catalog_from_rows(tables)
+        
+        if isinstance(html_content, str):
+            from bs4 import BeautifulSoup
+            
+            soup = BeautifulSoup(html_content, 'html.parser')
+        else:
+            soup = html_content
+        
+        tables = (
+            [[(cell.name, cell.get_text(strip=True)) for cell in row.find_all(['th', 'td'])]
+             for row in table.find_all('tr')]
+            for table in soup.find_all('table')
+        )
+        with stats.stage('extract'):
+            return self.extract_fine_catalog_from_rows(tables)
+    
+    def extract_fine_catalog_from_rows(self, tables) -> List[Dict]:
+        """
+        Erzeugt Bußgeldkatalog-Einträge aus bereits zerlegten Tabellen.
         
-        # Suche nach Tabellen
-        tables = soup.find_all('table')
+        Die erste Zeile jeder Tabelle wird auf Spaltenüberschriften untersucht;
+        Zeilen, deren zweite Zelle mit einer römischen Ziffer beginnt ("I.",
+        "II." ...), setzen die Kategorie der folgenden Einträge.
         
-        for table in tables:
+        Args:
+            tables: Iterierbare Folge von Tabellen; jede Tabelle ist eine Liste von
+                Zeilen, jede Zeile eine Liste von (Tag, Text)-Paaren mit Tag 'th' oder 'td'
+            
+        Returns:
+            Eine Liste von Dictionaries mit den extrahierten Bußgeldkatalog-Einträgen
+        """
+        catalog = []
+        stats = self.stats
+        
+        for rows in tables:
             current_category = 'Allgemein'
             
-            rows = table.find_all('tr')
             if not rows:
                 continue
+            stats.count('rows', len(rows))
 
-            header_cells = rows[0].find_all(['th', 'td'])
-            header_titles = [cell.get_text(strip=True).lower() for cell in header_cells]
+            header_cells = rows[0]
+            header_titles = [text.lower() for _, text in header_cells]
             header_map = {}
             for idx, title in enumerate(header_titles):
                 if 'kategorie' in title:
@@ -554,18 +2372,14 @@ class DocumentParser:
                 if 'anmerk' in title or 'notiz' in title or 'hinweis' in title:
                     header_map['notes'] = idx
 
-            start_index = 1 if header_cells and any(cell.name == 'th' for cell in header_cells) else 0
-
-            for row_index, row in enumerate(rows[start_index:], start=start_index):
-                cells = row.find_all('td')
-                if not cells:
-                    continue
+            start_index = 1 if header_cells and any(name == 'th' for name, _ in header_cells) else 0
 
-                cell_texts = [cell.get_text(strip=True) for cell in cells]
+            for row in rows[start_index:]:
+                cell_texts = [text for name, text in row if name == 'td']
                 if not any(cell_texts):
                     continue
 
-                if len(cells) >= 2:
+                if len(cell_texts) >= 2:
                     potential_category = cell_texts[1]
                     if potential_category.startswith(('I.', 'II.', 'III.', 'IV.', 'V.')):
                         current_category = potential_category
@@ -622,40 +2436,373 @@ class DocumentParser:
         
         return catalog
 
+def _parser_options(args) -> Dict:
+    """Sammelt die Parser-Optionen aus den Kommandozeilenargumenten (None = nicht gesetzt)."""
+    return {
+        'pages': args.pages,
+        'workers': args.workers,
+        'stream_download': args.stream_download or None,
+        'max_download_bytes': int(args.max_download_mb * 1024 * 1024) if args.max_download_mb else None,
+        'max_download_seconds': args.max_download_seconds
+    }
+
+def _supervision_options(args) -> Dict:
+    """Sammelt die Limits für --supervised aus den Kommandozeilenargumenten."""
+    return {
+        'timeout': args.timeout,
+        'memory_limit_mb': args.memory_limit_mb or None,
+        'cpu_seconds': args.cpu_limit,
+        'max_documents': args.max_documents
+    }
+
+def run_index(doc_parser: DocumentParser, args) -> int:
+    """
+    Führt --mode=index (Dokumente aufnehmen bzw. mit --remove entfernen) oder --mode=search aus.
+    
+    Args:
+        doc_parser: Instanz des DocumentParser
+        args: Die Kommandozeilenargumente
+        
+    Returns:
+        Exit-Code (0 bei Erfolg, 1 wenn ein Dokument nicht indexiert werden konnte)
+    """
+    from batch import expand_inputs
+    from output_writer import open_output
+    from search_index import DEFAULT_INDEX_PATH, SearchIndex
+    
+    with SearchIndex(args.index or DEFAULT_INDEX_PATH, version=parser_fingerprint()) as index:
+        if args.mode == 'search':
+            query = ' '.join(args.input)
+            started = time.perf_counter()
+            result = index.search(query, limit=args.limit)
+            result = dict(success=True, query=query, took_ms=round((time.perf_counter() - started) * 1000, 3),
+                          **result)
+        else:
+            result = {'success': True, 'indexed': [], 'skipped': [], 'removed': [], 'failed': []}
+            for input_path in expand_inputs(args.input):
+                if args.remove:
+                    source = input_path if _is_url(input_path, b'') else os.path.abspath(input_path)
+                    if index.remove_document(source):
+                        result['removed'].append(source)
+                    continue
+                try:
+                    record = index.index_file(doc_parser, input_path, **_parser_options(args))
+                except Exception as e:
+                    record = {
+                        'success': False,
+                        'error': str(e),
+                        'traceback': traceback.format_exc()
+                    }
+                if not record.get('success'):
+                    result['failed'].append({'input': input_path, 'error': record.get('error')})
+                    print(f"Fehler: {input_path}: {record.get('error')}", file=sys.stderr)
+                elif record['skipped']:
+                    result['skipped'].append(record['source'])
+                else:
+                    result['indexed'].append({'source': record['source'], 'sections': record['sections']})
+            result['success'] = not result['failed']
+            result.update(index.info())
+    
+    with open_output(args.output, args.format, args.json_encoder) as writer:
+        writer.write_result(result)
+    return 0 if result['success'] else 1
+
+def run_calculate(doc_parser: DocumentParser, args) -> int:
+    """
+    Führt --mode=calculate aus: Strafen für --query bzw. NDJSON-Anfragen von stdin.
+    
+    Args:
+        doc_parser: Instanz des DocumentParser (parst den Katalog, falls er kein JSON ist)
+        args: Die Kommandozeilenargumente
+        
+    Returns:
+        Exit-Code (0 bei Erfolg, 1 wenn der Katalog nicht geladen werden konnte oder eine Anfrage ungültig war)
+    """
+    from fine_catalog import FineCatalog, run_calculator
+    from output_writer import open_output
+    
+    try:
+        catalog = FineCatalog.from_file(args.input[0], doc_parser)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {str(e)}", file=sys.stderr)
+        return 1
+    
+    with open_output(args.output, 'ndjson', args.json_encoder) as writer:
+        return run_calculator(catalog, writer, args.query, sys.stdin)
+
+def write_stream(doc_parser: DocumentParser, input_path: str, args, flush: bool = True) -> int:
+    """
+    Schreibt die Datensätze aus iter_records() als NDJSON, jeweils direkt nach ihrer Erzeugung.
+    
+    Args:
+        doc_parser: Instanz des DocumentParser
+        input_path: Pfad zur Datei oder URL
+        args: Die Kommandozeilenargumente
+        flush: Jeden Datensatz sofort ausgeben (--stream); sonst puffert der Ausgabestrom
+        
+    Returns:
+        Exit-Code (0 bei Erfolg, 1 wenn ein Fehler-Datensatz geschrieben wurde)
+    """
+    from output_writer import open_output
+    
+    exit_code = 0
+    with open_output(args.output, 'ndjson', args.json_encoder) as writer:
+        for record in doc_parser.iter_records(input_path, args.mode, **_parser_options(args)):
+            if record.get('success') is False:
+                print(f"Fehler: {record.get('error', 'Unbekannter Fehler')}", file=sys.stderr)
+                exit_code = 1
+            writer.write_record(record, flush=flush)
+    return exit_code
+
 def main():
     """Hauptfunktion zum Ausführen des Parsers über die Kommandozeile."""
+    from output_writer import ENCODERS, FORMATS
+    
     parser = argparse.ArgumentParser(description='Dokument-Parser für das Justizsystem')
-    parser.add_argument('input', help='Datei oder URL zum Parsen')
+    parser.add_argument('input', nargs='*',
+                        help='Datei oder URL zum Parsen (mit --batch auch mehrere Dateien, Verzeichnisse oder Glob-Muster)')
     parser.add_argument('--output', help='Ausgabedatei (JSON)')
-    parser.add_argument('--mode', choices=['text', 'sections', 'catalog'], 
-                        default='text', help='Ausgabemodus (Text, Abschnitte oder Bußgeldkatalog)')
+    parser.add_argument('--format', choices=FORMATS, default='json',
+                        help='Ausgabeformat: kompaktes JSON, eingerücktes JSON oder NDJSON (ein Datensatz pro '
+                             'Zeile, wie --stream, aber gepuffert)')
+    parser.add_argument('--json-encoder', choices=ENCODERS, default='auto',
+                        help='JSON-Encoder (auto = orjson, falls installiert)')
+    parser.add_argument('--mode', choices=MODES + INDEX_MODES + [CALCULATE_MODE], 
+                        default='text', help='Ausgabemodus (Text, Abschnitte oder Bußgeldkatalog); '
+                                             'index nimmt die Eingaben in den Suchindex auf, search sucht '
+                                             'die Eingabe als Anfrage im Suchindex, calculate berechnet '
+                                             'Strafen für --query bzw. NDJSON-Anfragen von stdin mit der '
+                                             'Eingabe als Katalog')
+    parser.add_argument('--pages', help='Nur diese PDF-Seiten extrahieren, z.B. "1-3,7,10-"')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Anzahl der Prozesse für die PDF-Extraktion (0 = alle CPU-Kerne)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Datensätze schon während des Parsens als NDJSON ausgeben (PDF-Seiten sobald extrahiert)')
+    parser.add_argument('--stream-download', action='store_true',
+                        help='URLs blockweise laden und schon während des Downloads parsen (mit Größen- und Zeitgrenze)')
+    parser.add_argument('--max-download-mb', type=float,
+                        help='Größengrenze für --stream-download in MB (Standard: 20)')
+    parser.add_argument('--max-download-seconds', type=float,
+                        help='Zeitgrenze für --stream-download in Sekunden (Standard: 60)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Mehrere Eingaben parallel parsen und je Dokument einen NDJSON-Datensatz ausgeben')
+    parser.add_argument('--jobs', type=int, default=0,
+                        help='Anzahl der parallelen Dokumente im Batch-Modus (0 = alle CPU-Kerne)')
+    parser.add_argument('--fetch-connections', type=int, default=16,
+                        help='Maximale Anzahl gleichzeitiger URL-Abrufe im Batch-Modus')
+    parser.add_argument('--fetch-per-host', type=int, default=4,
+                        help='Maximale Anzahl gleichzeitiger URL-Abrufe pro Host im Batch-Modus')
+    parser.add_argument('--cache-dir', help='Verzeichnis des Ergebnis-Caches')
+    parser.add_argument('--cache-max-mb', type=int, default=256, help='Maximale Größe des Ergebnis-Caches in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Ergebnis-Cache und HTTP-Cache nicht verwenden')
+    parser.add_argument('--http-cache-ttl', type=float, default=0,
+                        help='Sekunden, in denen geladene URLs ohne erneute Anfrage genutzt werden '
+                             '(0 = immer per ETag/Last-Modified prüfen)')
+    parser.add_argument('--http-cache-max-mb', type=int, default=64, help='Maximale Größe des HTTP-Caches in MB')
+    parser.add_argument('--page-cache-max-mb', type=int, default=64,
+                        help='Maximale Größe des Caches für PDF-Seitentexte in MB (0 = nicht verwenden)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Als langlebiger Server laufen (JSON-Lines über stdin/stdout oder --socket)')
+    parser.add_argument('--socket', help='Unix-Socket, auf dem der Server lauscht (nur mit --serve)')
+    parser.add_argument('--watch', metavar='INBOX',
+                        help='Eingangsordner überwachen und abgelegte Dokumente im Hintergrund parsen (siehe ingest.py)')
+    parser.add_argument('--outbox', metavar='ORDNER',
+                        help='Mit --watch: Ordner für Ergebnisse und Status (Standard: neben INBOX)')
+    parser.add_argument('--quarantine', metavar='ORDNER',
+                        help='Mit --watch: Ordner für fehlgeschlagene Eingaben (Standard: neben INBOX)')
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help='Mit --watch: Sekunden zwischen zwei Prüfungen des Eingangsordners')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='Mit --watch: Sekunden, die eine Datei unverändert sein muss, bevor sie geparst wird')
+    parser.add_argument('--once', action='store_true',
+                        help='Mit --watch: Nur die vorhandenen Dateien verarbeiten und danach beenden')
+    parser.add_argument('--diff-against', metavar='KATALOG',
+                        help='Im Katalog-Modus nur die Änderungen (added/changed/removed) gegenüber dieser '
+                             'Katalogdatei ausgeben, z.B. data/fine_catalog.json')
+    parser.add_argument('--apply', action='store_true',
+                        help='Mit --diff-against die Änderungen gesperrt und atomar in die Katalogdatei schreiben')
+    parser.add_argument('--apply-removals', action='store_true',
+                        help='Mit --apply auch Einträge löschen, die im Dokument nicht mehr vorkommen')
+    parser.add_argument('--index', metavar='DATEI',
+                        help='Indexdatei für --mode=index/search (Standard: data/search_index.sqlite)')
+    parser.add_argument('--remove', action='store_true',
+                        help='Mit --mode=index die Eingaben aus dem Suchindex entfernen statt sie aufzunehmen')
+    parser.add_argument('--limit', type=int, default=10, help='Maximale Anzahl der Treffer bei --mode=search')
+    parser.add_argument('--query', action='append', metavar='VERSTOSS',
+                        help='Mit --mode=calculate: Verstoß einer einzelnen Anfrage (mehrfach möglich); '
+                             'ohne Angabe wird NDJSON von stdin gelesen')
+    parser.add_argument('--supervised', action='store_true',
+                        help='Jedes Dokument in einem überwachten Worker-Prozess mit Zeit-, Speicher- und CPU-Limit parsen')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='Mit --supervised: Zeitlimit je Dokument in Sekunden')
+    parser.add_argument('--memory-limit-mb', type=int, default=1024,
+                        help='Mit --supervised: Zusätzlicher Adressraum je Worker in MB (0 = unbegrenzt)')
+    parser.add_argument('--cpu-limit', type=float,
+                        help='Mit --supervised: CPU-Zeit je Dokument in Sekunden (Standard: wie --timeout, 0 = unbegrenzt)')
+    parser.add_argument('--max-documents', type=int, default=100,
+                        help='Mit --supervised: Worker nach so vielen Dokumenten ersetzen')
+    parser.add_argument('--stats', action='store_true',
+                        help='Zeiten je Verarbeitungsschritt, Byte- und Mengenangaben ausgeben '
+                             '(als "stats" im Ergebnis, bei Listen auf stderr)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Mit --stats zusätzlich den Spitzenspeicher per tracemalloc messen (langsamer)')
+    parser.add_argument('--profile', metavar='DATEI',
+                        help='cProfile-Profil des Aufrufs in DATEI schreiben (auswertbar mit python3 -m pstats)')
     
     args = parser.parse_args()
     
-    doc_parser = DocumentParser()
-    result = doc_parser.detect_and_parse(args.input)
+    cache = http_cache = page_cache = None
+    if not args.no_cache:
+        from result_cache import DEFAULT_CACHE_DIR, HttpCache, PageCache, ResultCache
+        cache_dir = args.cache_dir or DEFAULT_CACHE_DIR
+        cache = ResultCache(cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024, version=parser_fingerprint())
+        http_cache = HttpCache(os.path.join(cache_dir, 'http'), max_bytes=args.http_cache_max_mb * 1024 * 1024,
+                               version=cache.version, ttl=args.http_cache_ttl)
+        if args.page_cache_max_mb:
+            page_cache = PageCache(os.path.join(cache_dir, 'pages'), max_bytes=args.page_cache_max_mb * 1024 * 1024,
+                                   version=cache.version)
     
-    if not result['success']:
-        print(f"Fehler: {result.get('error', 'Unbekannter Fehler')}", file=sys.stderr)
-        sys.exit(1)
+    doc_parser = DocumentParser(cache=cache, http_cache=http_cache, page_cache=page_cache)
+    if args.supervised:
+        from functools import partial
+        from supervisor import SupervisedParser
+        
+        # Im Batch- und Ingest-Modus wird der Pool dort angelegt
+        if not args.batch and not args.watch:
+            doc_parser = SupervisedParser(partial(DocumentParser, cache=cache, http_cache=http_cache,
+                                                  page_cache=page_cache),
+                                          workers=(args.jobs or os.cpu_count() or 1) if args.serve else 1,
+                                          **_supervision_options(args))
     
-    # Verarbeite den Text je nach Modus
-    if args.mode == 'sections':
-        sections = doc_parser.extract_sections(result['content'])
-        output = json.dumps(sections, ensure_ascii=False, indent=2)
-    elif args.mode == 'catalog':
-        catalog = doc_parser.extract_fine_catalog(result['content'])
-        output = json.dumps(catalog, ensure_ascii=False, indent=2)
-    else:
-        # Text-Modus
-        output = json.dumps(result, ensure_ascii=False, indent=2)
+    if not args.profile:
+        run(parser, args, doc_parser)
+        return
+    
+    import cProfile
+    
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run, parser, args, doc_parser)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"Profil geschrieben: {args.profile}", file=sys.stderr)
+
+def run_ingest(parser: argparse.ArgumentParser, args, doc_parser: DocumentParser) -> int:
+    """
+    Führt --watch aus: überwacht den Eingangsordner, bis der Prozess beendet wird.
+    
+    Die Dokumente werden immer in überwachten Worker-Prozessen geparst
+    (Limits aus --timeout, --memory-limit-mb, ...), damit ein einzelnes
+    Dokument den Ingest nicht blockiert.
+    
+    Args:
+        parser: Der ArgumentParser (für Fehlermeldungen)
+        args: Die Kommandozeilenargumente
+        doc_parser: Instanz des DocumentParser, dessen Caches die Worker übernehmen
+        
+    Returns:
+        Exit-Code (0 wenn alle Dokumente erfolgreich waren, sonst 1)
+    """
+    from functools import partial
+    from ingest import Ingest
+    
+    if args.input or args.batch or args.stream or args.diff_against or args.mode not in MODES:
+        parser.error('--watch ist nicht mit Eingaben, --batch, --stream, --diff-against oder '
+                     '--mode=index/search/calculate kombinierbar')
+    
+    base = os.path.dirname(os.path.abspath(args.watch))
+    make_parser = partial(DocumentParser, cache=doc_parser.cache, http_cache=doc_parser.http_cache,
+                          page_cache=doc_parser.page_cache)
+    ingest = Ingest(make_parser, args.watch, args.outbox or os.path.join(base, 'outbox'),
+                    args.quarantine or os.path.join(base, 'quarantine'), mode=args.mode, modes=tuple(MODES),
+                    options=_parser_options(args), jobs=args.jobs or os.cpu_count() or 1, settle=args.settle,
+                    supervision=_supervision_options(args))
+    print(f"Ingest überwacht {os.path.abspath(args.watch)}", file=sys.stderr)
+    return ingest.run(poll_interval=args.poll_interval, once=args.once)
+
+def run(parser: argparse.ArgumentParser, args, doc_parser: DocumentParser):
+    """Führt den über die Kommandozeile gewählten Modus aus (Server, Batch, Stream oder Einzeldokument)."""
+    if args.serve:
+        from parser_server import serve
+        serve(doc_parser, socket_path=args.socket, version=PARSER_VERSION)
+        return
+    
+    if args.watch:
+        sys.exit(run_ingest(parser, args, doc_parser))
+    
+    if not args.input:
+        parser.error('input wird benötigt, sofern nicht --serve oder --watch verwendet wird')
+    
+    if args.mode in INDEX_MODES:
+        if args.batch or args.stream or args.diff_against:
+            parser.error(f'--mode={args.mode} ist nicht mit --batch, --stream oder --diff-against kombinierbar')
+        sys.exit(run_index(doc_parser, args))
+    
+    if args.mode == CALCULATE_MODE:
+        if args.batch or args.stream or args.diff_against or len(args.input) > 1:
+            parser.error('--mode=calculate erwartet genau einen Katalog und ist nicht mit --batch, --stream '
+                         'oder --diff-against kombinierbar')
+        sys.exit(run_calculate(doc_parser, args))
+    
+    if args.batch:
+        from functools import partial
+        from batch import run_batch
+        
+        from output_writer import open_output
+        
+        make_parser = partial(DocumentParser, cache=doc_parser.cache, http_cache=doc_parser.http_cache,
+                              page_cache=doc_parser.page_cache)
+        with open_output(args.output, 'ndjson', args.json_encoder) as writer:
+            exit_code = run_batch(make_parser, args.input, args.mode, _parser_options(args), jobs=args.jobs,
+                                  out=writer, fetch_options={'max_connections': args.fetch_connections,
+                                                             'per_host': args.fetch_per_host},
+                                  supervision=_supervision_options(args) if args.supervised else None)
+        sys.exit(exit_code)
+    
+    if len(args.input) > 1:
+        parser.error('mehrere Eingaben sind nur mit --batch möglich')
+    if args.diff_against and (args.mode != 'catalog' or args.stream):
+        parser.error('--diff-against ist nur im Katalog-Modus ohne --stream möglich')
+    input_path = args.input[0]
+    
+    if args.stream:
+        if args.supervised:
+            parser.error('--stream ist nicht mit --supervised kombinierbar')
+        sys.exit(write_stream(doc_parser, input_path, args))
     
-    # Ausgabe
-    if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(output)
+    # NDJSON direkt aus den Seiten- bzw. Abschnitts-Iteratoren schreiben, ohne die Liste aufzubauen;
+    # --diff-against, --stats und --supervised brauchen das vollständige Ergebnis
+    if args.format == 'ndjson' and not (args.diff_against or args.stats or args.trace_memory or args.supervised):
+        sys.exit(write_stream(doc_parser, input_path, args, flush=False))
+    
+    stats = None
+    if args.stats or args.trace_memory:
+        result, stats = doc_parser.process_with_stats(input_path, args.mode, trace_memory=args.trace_memory,
+                                                      **_parser_options(args))
     else:
-        print(output)
+        result = doc_parser.process(input_path, args.mode, **_parser_options(args))
+    
+    if args.diff_against and isinstance(result, list):
+        from catalog_diff import catalog_diff_result
+        try:
+            result = catalog_diff_result(result, args.diff_against, apply=args.apply, remove=args.apply_removals)
+        except (OSError, ValueError) as e:
+            result = {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+    
+    from output_writer import open_output
+    
+    # Auch Fehler werden als JSON ausgegeben, damit der Aufrufer sie ohne stderr auswerten kann
+    failed = isinstance(result, dict) and not result.get('success', True)
+    with open_output(args.output, args.format, args.json_encoder) as writer:
+        writer.write_result(result, stats)
+    
+    if failed:
+        print(f"Fehler: {result.get('error', 'Unbekannter Fehler')}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
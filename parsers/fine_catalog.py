@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Kompaktes Katalogmodell und Strafrechner für den Bußgeldkatalog.
+
+FineCatalog speichert die Einträge aus extract_fine_catalog() spaltenweise
+in array-Objekten statt als Liste von Dictionaries (ein Eintrag belegt
+damit rund 60 Bytes plus Texte statt ca. 1,5 KB). Indizes über die
+Kategorie, den normalisierten Verstoß und die Paragraphen-Angabe ("§12")
+ersetzen das lineare Durchsuchen der Liste.
+
+Der Strafrechner summiert für eine Liste von Verstößen die Bußgelder,
+Hafttage und Sozialstunden (jeweils min/max); calculate_many() berechnet
+viele solcher Anfragen auf einmal und liefert die Summen spaltenweise. Die
+Summen entstehen je Anfrage und Spalte mit sum() über die Indizes (die
+Schleife läuft in C, es gibt keine NumPy-Vektorisierung).
+
+Aufruf (auch als Modus des Dokument-Parsers, --mode=calculate):
+    python3 parsers/fine_catalog.py KATALOG --query "§1 Mord" --query "§12 Diebstahl"
+    python3 parsers/fine_catalog.py KATALOG < anfragen.ndjson
+    python3 parsers/document_parser.py --mode=calculate KATALOG < anfragen.ndjson
+
+KATALOG ist eine JSON-Datei (z.B. data/fine_catalog.json) oder ein Dokument,
+das im Katalog-Modus geparst wird. Jede Zeile von anfragen.ndjson ist eine
+Liste von Verstößen, ein einzelner Verstoß als Text oder ein Objekt
+{"id": ..., "violations": [...]}; für jede Zeile wird ein Ergebnis als NDJSON
+ausgegeben (bei anderen Werten ein Fehler-Datensatz mit "success": false).
+"""
+
+import re
+import sys
+import json
+import argparse
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Anzahl der Anfragen aus NDJSON, die gemeinsam mit calculate_many() berechnet werden
+DEFAULT_BATCH_SIZE = 1024
+
+# Spalten des Katalogs mit array-Typcode: Beträge als double, Tage/Stunden als 32-Bit-Ganzzahl
+COLUMNS = (
+    ('amount_min', 'd'),
+    ('amount_max', 'd'),
+    ('prison_days_min', 'i'),
+    ('prison_days_max', 'i'),
+    ('community_service_hours_min', 'i'),
+    ('community_service_hours_max', 'i')
+)
+
+_PARAGRAPH = re.compile(r'§\s*(\d+[a-z]?)', re.IGNORECASE)
+
+
+def normalize_violation(text: str) -> str:
+    """
+    Normalisiert einen Verstoß für den Vergleich.
+
+    Groß-/Kleinschreibung und Leerzeichen spielen keine Rolle; "§ 12" und
+    "§12" sind gleichwertig.
+
+    Args:
+        text: Der Verstoß, z.B. "§ 12  Diebstahl"
+
+    Returns:
+        Der normalisierte Text, z.B. "§12 diebstahl"
+    """
+    return _PARAGRAPH.sub(r'§\1', ' '.join(str(text).split())).casefold()
+
+
+class FineCatalog:
+    """Spaltenweise gespeicherter Bußgeldkatalog mit Indizes für die Suche."""
+
+    __slots__ = ('violations', 'categories', 'category_ids', 'columns',
+                 '_by_violation', '_by_paragraph', '_by_category', '_category_members')
+
+    def __init__(self):
+        self.violations = []
+        # Jede Kategorie wird nur einmal gespeichert; category_ids verweist darauf
+        self.categories = []
+        self.category_ids = array('i')
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS}
+        self._by_violation = {}
+        self._by_paragraph = {}
+        self._by_category = {}
+        # Je Kategorie-ID die Indizes ihrer Einträge
+        self._category_members = []
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> 'FineCatalog':
+        """
+        Erzeugt den Katalog aus Einträgen von extract_fine_catalog() oder data/fine_catalog.json.
+
+        Fehlende Bereichswerte werden wie in importFineCatalog() aus 'amount',
+        'prison_days' bzw. 'community_service_hours' abgeleitet.
+
+        Args:
+            entries: Die Katalogeinträge
+
+        Returns:
+            Der Katalog
+        """
+        catalog = cls()
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get('violation'):
+                catalog.add(entry)
+        return catalog
+
+    @classmethod
+    def from_file(cls, path: str, doc_parser=None) -> 'FineCatalog':
+        """
+        Lädt den Katalog aus einer JSON-Datei oder parst ein Dokument im Katalog-Modus.
+
+        Args:
+            path: JSON-Katalog (Liste von Einträgen) oder ein vom Parser unterstütztes Dokument
+            doc_parser: DocumentParser für Dokumente (Standard: ein neuer ohne Caches)
+
+        Returns:
+            Der Katalog
+        """
+        if path.lower().endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as file:
+                entries = json.load(file)
+        else:
+            if doc_parser is None:
+                from document_parser import DocumentParser
+
+                doc_parser = DocumentParser()
+            entries = doc_parser.process(path, 'catalog')
+            if isinstance(entries, dict):
+                raise ValueError(entries.get('error', 'Der Katalog konnte nicht geparst werden.'))
+        if not isinstance(entries, list):
+            raise ValueError(f'{path} enthält keine Liste von Katalogeinträgen')
+        return cls.from_entries(entries)
+
+    def add(self, entry: Dict) -> int:
+        """
+        Fügt einen Eintrag hinzu.
+
+        Args:
+            entry: Ein Katalogeintrag mit mindestens 'violation'
+
+        Returns:
+            Der Index des Eintrags
+        """
+        index = len(self.violations)
+        violation = str(entry['violation'])
+        self.violations.append(violation)
+
+        category = str(entry.get('category') or 'Allgemein')
+        category_id = self._by_category.get(category)
+        if category_id is None:
+            category_id = len(self.categories)
+            self.categories.append(category)
+            self._by_category[category] = category_id
+            self._category_members.append(array('i'))
+        self.category_ids.append(category_id)
+        self._category_members[category_id].append(index)
+
+        for prefix, base in (('amount', float), ('prison_days', int), ('community_service_hours', int)):
+            single = _number(entry.get(prefix), base)
+            low = _number(entry.get(prefix + '_min'), base, single)
+            high = _number(entry.get(prefix + '_max'), base, single)
+            self.columns[prefix + '_min'].append(low)
+            self.columns[prefix + '_max'].append(high or low)
+
+        # Bei doppelten Verstößen gilt der erste Eintrag
+        self._by_violation.setdefault(normalize_violation(violation), index)
+        match = _PARAGRAPH.match(violation.strip())
+        if match:
+            self._by_paragraph.setdefault(match.group(1).lower(), index)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.violations)
+
+    def entry(self, index: int) -> Dict:
+        """Liefert einen Eintrag als Dictionary (nur für die Ausgabe, nicht für Berechnungen)."""
+        entry = {
+            'index': index,
+            'category': self.categories[self.category_ids[index]],
+            'violation': self.violations[index]
+        }
+        for name, _ in COLUMNS:
+            entry[name] = self.columns[name][index]
+        return entry
+
+    def lookup(self, violation: str) -> Optional[int]:
+        """
+        Sucht einen Verstoß.
+
+        Zuerst wird der vollständige normalisierte Text verglichen, danach die
+        Paragraphen-Angabe, sodass auch "§12" allein den Eintrag "§12 Diebstahl" findet.
+
+        Args:
+            violation: Der Verstoß
+
+        Returns:
+            Der Index des Eintrags oder None
+        """
+        index = self._by_violation.get(normalize_violation(violation))
+        if index is None:
+            match = _PARAGRAPH.match(violation.strip())
+            if match:
+                index = self._by_paragraph.get(match.group(1).lower())
+        return index
+
+    def by_category(self, category: str) -> List[int]:
+        """Liefert die Indizes aller Einträge einer Kategorie."""
+        category_id = self._by_category.get(category)
+        if category_id is None:
+            return []
+        return self._category_members[category_id].tolist()
+
+    def resolve(self, violations: Iterable[str]) -> Tuple[List[int], List[str]]:
+        """
+        Ordnet Verstöße den Katalogeinträgen zu.
+
+        Args:
+            violations: Die Verstöße einer Anfrage (Wiederholungen zählen mehrfach)
+
+        Returns:
+            (Indizes der gefundenen Einträge, nicht gefundene Verstöße)
+        """
+        indices = []
+        unknown = []
+        lookup = self.lookup
+        for violation in violations:
+            index = lookup(violation)
+            if index is None:
+                unknown.append(violation)
+            else:
+                indices.append(index)
+        return indices, unknown
+
+    def calculate(self, violations: Iterable[str]) -> Dict:
+        """
+        Summiert die Strafen für eine Liste von Verstößen.
+
+        Args:
+            violations: Die Verstöße
+
+        Returns:
+            Die Summen je Spalte (amount_min, amount_max, prison_days_min, ...),
+            die gefundenen Einträge ('matched') und die unbekannten Verstöße ('unknown')
+        """
+        indices, unknown = self.resolve(violations)
+        result = {name: _sum(self.columns[name], indices) for name, _ in COLUMNS}
+        result['matched'] = [self.violations[index] for index in indices]
+        result['unknown'] = unknown
+        return result
+
+    def calculate_many(self, queries: Iterable[Iterable[str]]) -> Dict[str, list]:
+        """
+        Berechnet viele Anfragen auf einmal.
+
+        Args:
+            queries: Je Anfrage eine Liste von Verstößen
+
+        Returns:
+            Spaltenweise Ergebnisse: je Spalte eine Liste mit der Summe jeder
+            Anfrage, dazu 'unknown' mit den unbekannten Verstößen je Anfrage
+        """
+        sums = {name: [] for name, _ in COLUMNS}
+        unknown = []
+        columns = [(sums[name], self.columns[name]) for name, _ in COLUMNS]
+        for violations in queries:
+            indices, missing = self.resolve(violations)
+            for target, column in columns:
+                target.append(_sum(column, indices))
+            unknown.append(missing)
+        sums['unknown'] = unknown
+        return sums
+
+
+def _number(value, base, default=0):
+    """Wandelt einen Feldwert in int bzw. float um; leere oder ungültige Werte ergeben default."""
+    if value is None or value == '':
+        return default
+    try:
+        return base(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _sum(column: array, indices: List[int]) -> Union[int, float]:
+    """Summiert die Werte einer Spalte an den angegebenen Indizes (sum() und map() ohne Python-Schleife)."""
+    return sum(map(column.__getitem__, indices), 0.0 if column.typecode == 'd' else 0)
+
+
+def query_violations(value) -> List[str]:
+    """
+    Vereinheitlicht die Verstöße einer Anfrage.
+
+    Args:
+        value: Eine Liste von Verstößen, ein einzelner Verstoß als Text oder None
+
+    Returns:
+        Die Verstöße als Liste
+
+    Raises:
+        ValueError: Wenn value weder Text noch eine Liste von Texten ist
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        # Ein einzelner Verstoß, nicht seine Zeichen
+        return [value]
+    if isinstance(value, list) and all(isinstance(violation, str) for violation in value):
+        return value
+    raise ValueError(f'Verstöße müssen ein Text oder eine Liste von Texten sein, nicht {type(value).__name__}')
+
+
+def _read_queries(lines: Iterable[str]):
+    """Liest Anfragen aus NDJSON-Zeilen; liefert (ID, Verstöße, Fehlermeldung oder None)."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            query = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, str(e)
+            continue
+        query_id = number
+        if isinstance(query, dict):
+            query_id = query.get('id', number)
+            query = query.get('violations')
+        try:
+            yield query_id, query_violations(query), None
+        except ValueError as e:
+            yield query_id, None, str(e)
+
+
+def run_calculator(catalog: FineCatalog, writer, queries: Optional[List[str]] = None,
+                   lines: Iterable[str] = (), batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Berechnet die Strafen für eine einzelne Anfrage oder für NDJSON-Anfragen.
+
+    Args:
+        catalog: Der Katalog
+        writer: OutputWriter, der je Anfrage einen Datensatz schreibt
+        queries: Die Verstöße einer einzelnen Anfrage (--query); sonst werden lines gelesen
+        lines: NDJSON-Zeilen mit je einer Anfrage (siehe Moduldokumentation)
+        batch_size: Anzahl der Anfragen, die gemeinsam berechnet werden
+
+    Returns:
+        Exit-Code (0 bei Erfolg, 1 wenn eine Anfrage ungültig war)
+    """
+    if queries:
+        writer.write_record(dict(catalog.calculate(queries), success=True))
+        return 0
+
+    exit_code = 0
+
+    def flush(batch):
+        nonlocal exit_code
+        sums = catalog.calculate_many([violations for _, violations, error in batch if error is None])
+        position = -1
+        for query_id, _, error in batch:
+            if error is not None:
+                print(f"Fehler: Ungültige Anfrage {query_id}: {error}", file=sys.stderr)
+                writer.write_record({'id': query_id, 'success': False, 'error': error})
+                exit_code = 1
+                continue
+            position += 1
+            record = {'id': query_id, 'success': True}
+            for name, _ in COLUMNS:
+                record[name] = sums[name][position]
+            record['unknown'] = sums['unknown'][position]
+            writer.write_record(record)
+
+    batch = []
+    for query in _read_queries(lines):
+        batch.append(query)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    flush(batch)
+    return exit_code
+
+
+def main():
+    """Berechnet Strafen für die Anfragen aus --query bzw. stdin."""
+    parser = argparse.ArgumentParser(description='Strafrechner für den Bußgeldkatalog')
+    parser.add_argument('catalog', help='Katalog als JSON-Datei oder Dokument (HTML, PDF, Text, ...)')
+    parser.add_argument('--query', action='append', metavar='VERSTOSS',
+                        help='Verstoß einer einzelnen Anfrage (mehrfach möglich); ohne Angabe wird NDJSON von stdin gelesen')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Anzahl der Anfragen, die gemeinsam berechnet werden')
+    args = parser.parse_args()
+
+    from output_writer import OutputWriter
+
+    try:
+        catalog = FineCatalog.from_file(args.catalog)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.exit(run_calculator(catalog, OutputWriter(output_format='ndjson'), args.query, sys.stdin, args.batch_size))
+
+
+if __name__ == '__main__':
+    main()
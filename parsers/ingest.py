@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ablage-Ordner für Importe im Hintergrund.
+
+Die Webanwendung legt ein Dokument im Eingangsordner ab und fragt danach
+nur noch dessen Status ab, statt während der Anfrage auf den Parser zu
+warten. Der Ingest-Prozess prüft den Eingangsordner in festen Abständen,
+parst neue Dateien mit einem begrenzten Pool überwachter Worker-Prozesse
+(siehe supervisor.py) und schreibt die Ergebnisse in den Ausgangsordner:
+
+    inbox/akte.pdf                         Modus aus --mode (Standard: text)
+    inbox/catalog/katalog.html             Unterordner text, sections, catalog bestimmen den Modus
+    outbox/akte.pdf.json                   Ergebnis, wie bei document_parser.py --output
+    outbox/akte.pdf.status.json            Status: queued, processing, done oder error
+    outbox/catalog/katalog.html.json       Ergebnis einer Datei aus einem Modus-Unterordner
+    quarantine/catalog/katalog.html        Eingaben, die nicht geparst werden konnten
+
+Der Name eines Auftrags ('name' im Status) ist der Pfad relativ zum
+Eingangsordner mit "/" als Trenner, z.B. "catalog/katalog.html"; Ausgangs-
+und Quarantäne-Ordner spiegeln die Unterordner. Gleichnamige Dateien in
+verschiedenen Modus-Unterordnern überschreiben sich so nicht gegenseitig.
+
+Eine Datei wird erst übernommen, wenn Größe und Änderungszeit für die
+Beruhigungszeit (--settle) unverändert geblieben sind; noch geschriebene
+Dateien werden so nicht halb gelesen. Dateien, deren Name mit einem Punkt
+beginnt oder auf .part/.tmp endet, werden ignoriert; der Aufrufer kann
+also unter einem solchen Namen schreiben und danach umbenennen.
+
+Ergebnis und Status werden atomar geschrieben (temporäre Datei +
+os.replace). Nach erfolgreichem Parsen wird die Eingabe aus dem
+Eingangsordner entfernt, bei einem Fehler in den Quarantäne-Ordner
+verschoben; der Status enthält dann 'error' und ggf. das überschrittene
+Limit ('limit').
+
+Aufruf:
+    python3 parsers/document_parser.py --watch data/ingest/inbox --outbox data/ingest/outbox \
+        --quarantine data/ingest/quarantine --jobs 2
+"""
+
+import os
+import sys
+import time
+import shutil
+import signal
+import tempfile
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Basisverzeichnis für inbox/outbox/quarantine, kann über DOC_PARSER_INGEST_DIR überschrieben werden
+DEFAULT_INGEST_DIR = os.environ.get('DOC_PARSER_INGEST_DIR') or \
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ingest')
+
+# Abstand der Prüfungen und Beruhigungszeit in Sekunden
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# Anzahl der Aufträge pro Worker, die gleichzeitig eingereicht werden
+_QUEUE_FACTOR = 4
+
+# Endungen von Dateien, die noch geschrieben werden
+_PARTIAL_SUFFIXES = ('.part', '.tmp', '.crdownload')
+
+STATUS_SUFFIX = '.status.json'
+RESULT_SUFFIX = '.json'
+
+
+def write_json_atomic(path: str, value):
+    """
+    Schreibt einen Wert als JSON in eine temporäre Datei und ersetzt die Zieldatei in einem Schritt.
+
+    Args:
+        path: Die Zieldatei
+        value: Der zu schreibende Wert
+    """
+    from output_writer import OutputWriter
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with OutputWriter(os.fdopen(fd, 'wb')) as writer:
+            writer.write_result(value)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class Ingest:
+    """Überwacht einen Eingangsordner und parst neue Dateien im Hintergrund."""
+
+    def __init__(self, make_parser: Callable, inbox: str, outbox: str, quarantine: str,
+                 mode: str = 'text', modes: Tuple[str, ...] = ('text', 'sections', 'catalog'),
+                 options: Dict = None, jobs: int = 1, settle: float = DEFAULT_SETTLE_SECONDS,
+                 supervision: Dict = None):
+        """
+        Initialisiert den Ingest; die Ordner werden bei Bedarf angelegt.
+
+        Args:
+            make_parser: Fabrik für den DocumentParser, siehe batch.iter_batch()
+            inbox: Eingangsordner
+            outbox: Ausgangsordner für Ergebnisse und Status
+            quarantine: Ordner für Eingaben, die nicht geparst werden konnten
+            mode: Modus für Dateien direkt im Eingangsordner
+            modes: Modi, deren Unterordner im Eingangsordner beachtet werden
+            options: Zusätzliche Parser-Optionen (z.B. pages)
+            jobs: Anzahl der Worker-Prozesse
+            settle: Sekunden, die Größe und Änderungszeit einer Datei unverändert sein müssen
+            supervision: Limits der Worker, siehe supervisor.SupervisedParser
+        """
+        self.make_parser = make_parser
+        self.inbox = inbox
+        self.outbox = outbox
+        self.quarantine = quarantine
+        self.mode = mode
+        self.modes = tuple(modes)
+        self.options = dict(options or {})
+        # Kein zweiter Prozesspool pro PDF innerhalb der Worker
+        self.options.pop('workers', None)
+        self.jobs = max(1, jobs)
+        self.settle = settle
+        self.supervision = supervision or {}
+        self.processed = 0
+        self.failed = 0
+        # Beobachtete Dateien: Pfad -> (Größe, Änderungszeit, unverändert seit)
+        self._observed = {}
+        # Eingereichte bzw. laufende Dateien
+        self._active = set()
+        self._stop = threading.Event()
+
+        for directory in (inbox, outbox, quarantine):
+            os.makedirs(directory, exist_ok=True)
+        for name in self.modes:
+            os.makedirs(os.path.join(outbox, name), exist_ok=True)
+            os.makedirs(os.path.join(quarantine, name), exist_ok=True)
+
+    def _candidates(self):
+        """Liefert (Pfad, Modus) aller Dateien im Eingangsordner und in den Modus-Unterordnern."""
+        for directory, mode in [(self.inbox, self.mode)] + \
+                [(os.path.join(self.inbox, name), name) for name in self.modes]:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.') or name.endswith(_PARTIAL_SUFFIXES):
+                    continue
+                try:
+                    if entry.is_file():
+                        yield entry.path, mode
+                except OSError:
+                    continue
+
+    def scan(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Prüft den Eingangsordner einmal.
+
+        Args:
+            now: Aktuelle Zeit (time.monotonic()); nur für Tests
+
+        Returns:
+            (Pfad, Modus) der Dateien, die seit der Beruhigungszeit unverändert und noch nicht eingereicht sind
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        seen = set()
+        for path, mode in self._candidates():
+            seen.add(path)
+            if path in self._active:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = self._observed.get(path)
+            if previous is None or previous[:2] != signature:
+                self._observed[path] = signature + (now,)
+            elif now - previous[2] >= self.settle:
+                ready.append((path, mode))
+        # Verschwundene Dateien vergessen
+        for path in list(self._observed):
+            if path not in seen:
+                del self._observed[path]
+        ready.sort(key=lambda item: self._observed[item[0]][2])
+        return ready
+
+    def _name(self, path: str) -> str:
+        """Der Name eines Auftrags: der Pfad relativ zum Eingangsordner, z.B. "catalog/katalog.html"."""
+        return os.path.relpath(path, self.inbox).replace(os.sep, '/')
+
+    def _outbox_path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.outbox, *name.split('/')) + suffix
+
+    def _status_path(self, name: str) -> str:
+        return self._outbox_path(name, STATUS_SUFFIX)
+
+    def _write_status(self, name: str, status: Dict):
+        try:
+            write_json_atomic(self._status_path(name), status)
+        except OSError as e:
+            print(f"Ingest: Status für {name} konnte nicht geschrieben werden: {str(e)}", file=sys.stderr)
+
+    def _process(self, doc_parser, path: str, mode: str, status: Dict):
+        """Parst eine Datei und legt Ergebnis und Status im Ausgangsordner ab."""
+        name = status['name']
+        status.update(state='processing', started_at=time.time())
+        self._write_status(name, status)
+
+        started = time.perf_counter()
+        try:
+            result = doc_parser.process(path, mode, **self.options)
+        except Exception as e:
+            result = {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        status['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+        failed = isinstance(result, dict) and result.get('success') is False
+        try:
+            if failed:
+                status.update(state='error', success=False, error=result.get('error', 'Unbekannter Fehler'))
+                if result.get('limit'):
+                    status.update(limit=result['limit'], limit_value=result.get('limit_value'))
+                status['quarantined'] = self._quarantine(path, name)
+            else:
+                write_json_atomic(self._outbox_path(name, RESULT_SUFFIX), result)
+                status.update(state='done', success=True, result=name + RESULT_SUFFIX)
+                os.unlink(path)
+        except OSError as e:
+            failed = True
+            status.update(state='error', success=False, error=str(e))
+        status['finished_at'] = time.time()
+        self._write_status(name, status)
+        return failed
+
+    def _quarantine(self, path: str, name: str) -> str:
+        """Verschiebt eine fehlgeschlagene Eingabe in den Quarantäne-Ordner; liefert den neuen Namen."""
+        target = os.path.join(self.quarantine, *name.split('/'))
+        if os.path.exists(target):
+            stem, extension = os.path.splitext(target)
+            target = f'{stem}.{int(time.time() * 1000)}{extension}'
+        shutil.move(path, target)
+        return os.path.relpath(target, self.quarantine).replace(os.sep, '/')
+
+    def stop(self):
+        """Beendet run() nach den laufenden Dokumenten."""
+        self._stop.set()
+
+    def run(self, poll_interval: float = DEFAULT_POLL_INTERVAL, once: bool = False) -> int:
+        """
+        Überwacht den Eingangsordner, bis stop() aufgerufen wird (bzw. SIGTERM/SIGINT eintrifft).
+
+        Args:
+            poll_interval: Sekunden zwischen zwei Prüfungen
+            once: Nur die vorhandenen Dateien verarbeiten und danach beenden
+
+        Returns:
+            Exit-Code (0 wenn alle Dokumente erfolgreich waren, sonst 1)
+        """
+        from supervisor import SupervisedParser
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+
+        pending = {}
+        with SupervisedParser(self.make_parser, workers=self.jobs, **self.supervision) as doc_parser, \
+                ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            try:
+                while not self._stop.is_set():
+                    for path, mode in self.scan()[:self.jobs * _QUEUE_FACTOR - len(pending)]:
+                        self._active.add(path)
+                        name = self._name(path)
+                        status = {'name': name, 'mode': mode, 'state': 'queued',
+                                  'size': self._observed[path][0], 'queued_at': time.time()}
+                        self._write_status(name, status)
+                        pending[executor.submit(self._process, doc_parser, path, mode, status)] = path
+
+                    if once and not pending and not self._observed:
+                        break
+                    if pending:
+                        done, _ = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    else:
+                        done = ()
+                        self._stop.wait(poll_interval)
+                    for future in done:
+                        path = pending.pop(future)
+                        self._active.discard(path)
+                        self._observed.pop(path, None)
+                        if future.result():
+                            self.failed += 1
+                        else:
+                            self.processed += 1
+            except KeyboardInterrupt:
+                pass
+            # Bereits eingereichte Dokumente noch abschließen
+            for future in pending:
+                if future.result():
+                    self.failed += 1
+                else:
+                    self.processed += 1
+
+        print(f"Ingest: {self.processed} erfolgreich, {self.failed} fehlgeschlagen", file=sys.stderr)
+        return 1 if self.failed else 0
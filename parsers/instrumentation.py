@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Messpunkte für den Dokument-Parser.
+
+Ein Stats-Objekt sammelt während eines Aufrufs die Zeiten der einzelnen
+Verarbeitungsschritte (load, decode, parse, extract, serialize), Byte- und
+Mengenangaben (bytes_in/bytes_out, pages, rows, sections, entries) und auf
+Wunsch den Spitzenspeicher per tracemalloc:
+
+    {"stages": {"load": 0.0123, "parse": 0.4567, "extract": 0.0089, "serialize": 0.0021},
+     "counters": {"bytes_in": 182734, "pages": 12, "entries": 44, "bytes_out": 20931},
+     "total_seconds": 0.4811, "peak_memory_mb": 12.4}
+
+Ohne Messung nutzt der Parser NULL_STATS, dessen Methoden nichts tun; die
+Messpunkte kosten dann nur einen Methodenaufruf pro Dokument.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+# Reihenfolge der Schritte in der Ausgabe
+STAGES = ('load', 'decode', 'parse', 'extract', 'serialize')
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Stats:
+    """Sammelt Schrittzeiten, Zähler und den Spitzenspeicher eines Aufrufs."""
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Initialisiert die Messung.
+
+        Args:
+            trace_memory: Den Spitzenspeicher mit tracemalloc messen (verlangsamt den
+                Aufruf deutlich, daher nur auf Wunsch)
+        """
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.counters = {}
+        self.peak_memory = None
+        self._active = set()
+        self._started = None
+        self._finished = None
+        self._owns_tracing = False
+
+    def start(self):
+        """Beginnt die Gesamtmessung und ggf. die Speichermessung."""
+        if self.trace_memory:
+            import tracemalloc
+
+            # Eine bereits laufende Messung (z.B. benchmark.py) nicht beenden
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """Beendet die Gesamtmessung und ggf. die Speichermessung."""
+        self._finished = time.perf_counter()
+        if self.trace_memory:
+            import tracemalloc
+
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Misst die Dauer eines Verarbeitungsschritts; mehrere Aufrufe werden addiert.
+
+        Verschachtelte Aufrufe desselben Schritts (z.B. extract_fine_catalog, das
+        die HTML-Tabellenextraktion aufruft) zählen nur einmal.
+
+        Args:
+            name: Name des Schritts, siehe STAGES
+        """
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+            self._active.discard(name)
+
+    def count(self, name: str, value: int = 1):
+        """Erhöht einen Zähler (z.B. bytes_in, pages, rows)."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> Dict:
+        """
+        Liefert den stats-Block des Ergebnisses.
+
+        Returns:
+            Schrittzeiten in Sekunden, Zähler, Gesamtzeit und ggf. Spitzenspeicher in MB
+        """
+        stages = {name: round(self.stages[name], 6) for name in STAGES if name in self.stages}
+        stages.update((name, round(value, 6)) for name, value in self.stages.items() if name not in stages)
+        stats = {
+            'stages': stages,
+            'counters': dict(self.counters)
+        }
+        if self._started is not None:
+            finished = self._finished if self._finished is not None else time.perf_counter()
+            stats['total_seconds'] = round(finished - self._started, 6)
+        if self.peak_memory is not None:
+            stats['peak_memory_mb'] = round(self.peak_memory / 1024 / 1024, 3)
+        return stats
+
+
+class _NullStats:
+    """Platzhalter ohne Messung; alle Methoden sind wirkungslos."""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_CONTEXT
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+
+NULL_STATS = _NullStats()
+
+
+def attach_stats(serialized: str, stats: Stats, indent: Optional[int] = None) -> str:
+    """
+    Ergänzt ein bereits serialisiertes JSON-Objekt um den stats-Block.
+
+    Das Ergebnis wird dafür nicht erneut kodiert, sodass die gemessene
+    Serialisierungszeit und bytes_out der eigentlichen Ausgabe entsprechen.
+
+    Args:
+        serialized: Mit json.dumps(..., indent=indent) erzeugtes, nicht leeres JSON-Objekt
+        stats: Die Messung des Aufrufs
+        indent: Die bei der Serialisierung verwendete Einrückung
+
+    Returns:
+        Das JSON-Objekt mit dem zusätzlichen Schlüssel "stats"
+    """
+    stats.count('bytes_out', len(serialized.encode('utf-8')))
+    block = json.dumps(stats.as_dict(), ensure_ascii=False, indent=indent)
+    if indent:
+        padding = ' ' * indent
+        return serialized[:-2] + f',\n{padding}"stats": ' + block.replace('\n', '\n' + padding) + '\n}'
+    return serialized[:-1] + ', "stats": ' + block + '}'
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ausgabe der Parser-Ergebnisse als JSON oder NDJSON.
+
+Die Ergebnisse werden direkt in den Ausgabestrom (stdout oder --output)
+geschrieben, ohne vorher einen String des gesamten Dokuments aufzubauen.
+Listen (Abschnitte, Katalogeinträge) werden Eintrag für Eintrag kodiert;
+der Speicherbedarf der Ausgabe hängt damit nur vom größten Eintrag ab.
+
+Formate:
+    json    Kompaktes JSON ohne Einrückung (Standard)
+    pretty  Eingerücktes JSON (indent=2) wie in früheren Versionen
+    ndjson  Ein JSON-Objekt pro Zeile; Listen ergeben eine Zeile pro Eintrag.
+            document_parser.py schreibt dabei die Datensätze aus iter_records()
+            (PDF-Seiten, Abschnitte, Katalogeinträge), sobald sie erzeugt sind
+
+Ist orjson installiert, wird es für json und ndjson verwendet. In den
+Ausgabestrom gelangen ausschließlich Ergebnisse; Meldungen gehören nach
+stderr, damit Aufrufer wie includes/document_importer.php die Ausgabe
+unverändert dekodieren können.
+"""
+
+import sys
+import json
+from typing import Callable, Dict, List, Optional, Union
+
+# Unterstützte Ausgabeformate
+FORMATS = ['json', 'pretty', 'ndjson']
+
+# Unterstützte Encoder ('auto' = orjson, falls installiert)
+ENCODERS = ['auto', 'orjson', 'json']
+
+_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def _stdlib_encode(value) -> bytes:
+    return _COMPACT.encode(value).encode('utf-8')
+
+
+def get_encoder(name: str = 'auto') -> Callable[[object], bytes]:
+    """
+    Liefert eine Funktion, die einen Wert als kompaktes UTF-8-JSON kodiert.
+
+    Args:
+        name: 'auto' (orjson, falls installiert, sonst json), 'orjson' oder 'json'
+
+    Returns:
+        Die Kodierfunktion
+    """
+    if name == 'json':
+        return _stdlib_encode
+    try:
+        import orjson
+    except ImportError:
+        if name == 'orjson':
+            raise
+        return _stdlib_encode
+    return orjson.dumps
+
+
+class OutputWriter:
+    """Schreibt Ergebnisse bzw. einzelne Datensätze in einen binären Ausgabestrom."""
+
+    def __init__(self, stream=None, output_format: str = 'json', encoder: str = 'auto'):
+        """
+        Initialisiert den Writer.
+
+        Args:
+            stream: Binärer Ausgabestrom (Standard: stdout)
+            output_format: 'json', 'pretty' oder 'ndjson', siehe FORMATS
+            encoder: Kodierung für json/ndjson, siehe get_encoder()
+        """
+        if stream is None:
+            sys.stdout.flush()
+            stream = sys.stdout.buffer
+        self.stream = stream
+        self.format = output_format
+        self.encode = get_encoder(encoder)
+        self.bytes_written = 0
+
+    def _write(self, data: bytes):
+        self.stream.write(data)
+        self.bytes_written += len(data)
+
+    def write_result(self, result: Union[Dict, List], stats=None):
+        """
+        Schreibt das vollständige Ergebnis eines Aufrufs.
+
+        Args:
+            result: Ergebnis-Dictionary oder Liste von Datensätzen
+            stats: Optional die Messung des Aufrufs (instrumentation.Stats); sie wird bei
+                Dictionaries als "stats" angefügt, bei Listen auf stderr ausgegeben
+        """
+        if stats is None:
+            self._write_result(result)
+        elif isinstance(result, dict):
+            from instrumentation import attach_stats
+
+            with stats.stage('serialize'):
+                serialized = self._serialize(result)
+            serialized = attach_stats(serialized, stats, 2 if self.format == 'pretty' else None)
+            self._write(serialized.encode('utf-8') + b'\n')
+        else:
+            with stats.stage('serialize'):
+                self._write_result(result)
+            stats.count('bytes_out', self.bytes_written)
+            print(f"Statistik: {json.dumps(stats.as_dict(), ensure_ascii=False)}", file=sys.stderr)
+        self.stream.flush()
+
+    def _serialize(self, result: Dict) -> str:
+        """Kodiert ein Dictionary als String im gewählten Format (ohne Zeilenumbruch am Ende)."""
+        if self.format == 'pretty':
+            return json.dumps(result, ensure_ascii=False, indent=2)
+        return self.encode(result).decode('utf-8')
+
+    def _write_result(self, result: Union[Dict, List]):
+        if self.format == 'pretty':
+            # json.dump schreibt blockweise, ohne den Gesamtstring aufzubauen
+            text = _CountingTextWriter(self)
+            json.dump(result, text, ensure_ascii=False, indent=2)
+            self._write(b'\n')
+            return
+
+        encode = self.encode
+        if not isinstance(result, list):
+            self._write(encode(result) + b'\n')
+            return
+
+        if self.format == 'ndjson':
+            for record in result:
+                self._write(encode(record) + b'\n')
+            return
+
+        self._write(b'[')
+        for index, record in enumerate(result):
+            if index:
+                self._write(b',')
+            self._write(encode(record))
+        self._write(b']\n')
+
+    def write_record(self, record: Dict, flush: bool = True):
+        """
+        Schreibt einen Datensatz als NDJSON-Zeile.
+
+        Args:
+            record: Der Datensatz
+            flush: Die Zeile sofort ausgeben, statt sie im Ausgabestrom zu puffern
+        """
+        self._write(self.encode(record) + b'\n')
+        if flush:
+            self.stream.flush()
+
+    def close(self):
+        """Schließt den Ausgabestrom, sofern es nicht stdout ist."""
+        if self.stream is sys.stdout.buffer:
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _CountingTextWriter:
+    """Textschnittstelle für json.dump, die UTF-8-kodiert an den OutputWriter weiterreicht."""
+
+    def __init__(self, writer: OutputWriter):
+        self._writer = writer
+
+    def write(self, text: str):
+        self._writer._write(text.encode('utf-8'))
+
+
+def open_output(path: Optional[str] = None, output_format: str = 'json', encoder: str = 'auto') -> OutputWriter:
+    """
+    Öffnet das Ausgabeziel.
+
+    Args:
+        path: Ausgabedatei; ohne Angabe wird nach stdout geschrieben
+        output_format: Ausgabeformat, siehe FORMATS
+        encoder: Kodierung, siehe get_encoder()
+
+    Returns:
+        Der OutputWriter (als Kontextmanager verwendbar)
+    """
+    stream = open(path, 'wb') if path else None
+    return OutputWriter(stream, output_format, encoder)
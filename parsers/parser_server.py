@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Langlebiger Server-Modus für den Dokument-Parser.
+
+Der Server hält einen vorgewärmten DocumentParser im Speicher, sodass
+Python-Start und der Import von requests/bs4/PyPDF2 nur einmal anfallen.
+Das Protokoll ist zeilenbasiertes JSON (eine Anfrage bzw. Antwort pro Zeile):
+
+    {"id": 1, "action": "parse", "input": "/pfad/datei.pdf", "mode": "catalog"}
+    {"id": 1, "success": true, "result": [...]}
+
+    Optional können Parser-Optionen mitgegeben werden, z.B.
+    {"id": 3, "input": "/pfad/akte.pdf", "options": {"pages": "1-5"}}
+
+    Mit "stats": true (und ggf. "trace_memory": true) enthält die Antwort
+    zusätzlich die Messung des Aufrufs, siehe instrumentation.py:
+    {"id": 4, "success": true, "result": [...], "stats": {"stages": {...}, ...}}
+
+    Der Abgleich eines Bußgeldkatalogs mit einer Katalogdatei (siehe
+    catalog_diff.py) liefert nur die Änderungen und schreibt sie mit
+    "apply": true gesperrt und atomar in die Datei:
+    {"id": 5, "action": "catalog_diff", "input": "/pfad/katalog.html",
+     "catalog": "/pfad/data/fine_catalog.json", "apply": true, "remove": false}
+    {"id": 5, "success": true, "result": {"added": [...], "changed": [...], ...}}
+
+    Der Strafrechner (siehe fine_catalog.py) hält geladene Kataloge im Speicher,
+    bis sich die Datei ändert; "queries" berechnet mehrere Anfragen auf einmal:
+    {"id": 6, "action": "calculate", "catalog": "/pfad/data/fine_catalog.json",
+     "violations": ["§12 Diebstahl", "§1"]}
+    {"id": 6, "success": true, "result": {"amount_min": 500.0, ..., "unknown": []}}
+
+    Der Volltextindex (siehe search_index.py) nimmt Dokumente auf bzw. entfernt
+    sie ("remove": true) und beantwortet Suchanfragen:
+    {"id": 7, "action": "index", "input": "/pfad/gesetz.pdf", "index": "/pfad/index.sqlite"}
+    {"id": 8, "action": "search", "query": "§ 242 Diebstahl", "limit": 10}
+    {"id": 8, "success": true, "result": {"total": 3, "hits": [...]}}
+
+    {"id": 2, "action": "ping"}
+    {"id": 2, "success": true, "pong": true, "version": "1.1.0", ...}
+
+Der Server läuft entweder über stdin/stdout (ein Client) oder auf einem
+Unix-Socket, der beliebig viele gleichzeitige Clients bedient. Mit
+--supervised parst er jedes Dokument in einem überwachten Worker-Prozess
+(siehe supervisor.py); ein überschrittenes Limit ergibt eine Fehlerantwort:
+    {"id": 9, "success": false, "error": "...", "limit": "timeout", "limit_value": 60}
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import socketserver
+import threading
+import traceback
+from typing import Dict, Optional
+
+from instrumentation import Stats, attach_stats
+from output_writer import get_encoder
+
+# Standardpfad des Sockets, muss mit includes/document_importer.php übereinstimmen
+DEFAULT_SOCKET_PATH = '/tmp/doj_document_parser.sock'
+
+# Anzahl der Suchtreffer ohne bzw. höchstens mit Angabe von 'limit'
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+
+
+class RequestHandler:
+    """Beantwortet einzelne Protokoll-Anfragen mit einem gemeinsamen DocumentParser."""
+
+    def __init__(self, doc_parser, version: str = ''):
+        """
+        Initialisiert den Handler.
+
+        Args:
+            doc_parser: Instanz des DocumentParser, die für alle Anfragen genutzt wird
+            version: Parser-Version, die beim Health-Check gemeldet wird
+        """
+        self.doc_parser = doc_parser
+        self.version = version
+        self.started = time.time()
+        self.request_count = 0
+        self._lock = threading.Lock()
+        # orjson, falls installiert
+        self._encode = get_encoder()
+        # Geladene Kataloge des Strafrechners: Pfad -> ((mtime, Größe), FineCatalog) (Zugriff nur unter _catalog_lock)
+        self._fine_catalogs = {}
+        self._catalog_lock = threading.Lock()
+        # Geöffnete Suchindizes: Pfad -> SearchIndex (Zugriff nur unter _index_lock)
+        self._indexes = {}
+        self._index_lock = threading.Lock()
+
+    def handle(self, request: Dict) -> Dict:
+        """
+        Verarbeitet eine dekodierte Anfrage.
+
+        Args:
+            request: Anfrage mit 'action' und ggf. 'input'/'mode'
+
+        Returns:
+            Ein Antwort-Dictionary, das immer 'success' enthält; bei einer Anfrage
+            mit 'stats' liegt unter 'stats' die laufende Messung (Stats), die
+            handle_line() nach der Serialisierung einfügt
+        """
+        with self._lock:
+            self.request_count += 1
+
+        request_id = request.get('id')
+        action = request.get('action', 'parse')
+
+        if action == 'ping':
+            response = {
+                'success': True,
+                'pong': True,
+                'version': self.version,
+                'pid': os.getpid(),
+                'uptime': round(time.time() - self.started, 3),
+                'requests': self.request_count
+            }
+        elif action == 'parse':
+            input_path = request.get('input')
+            if not input_path:
+                response = {
+                    'success': False,
+                    'error': 'Keine Eingabedatei oder URL angegeben.'
+                }
+            else:
+                response = self._parse(input_path, request.get('mode', 'text'), request.get('options') or {},
+                                       with_stats=bool(request.get('stats') or request.get('trace_memory')),
+                                       trace_memory=bool(request.get('trace_memory')))
+        elif action == 'catalog_diff':
+            input_path = request.get('input')
+            catalog_path = request.get('catalog')
+            if not input_path or not catalog_path:
+                response = {
+                    'success': False,
+                    'error': 'Eingabe und Katalogdatei müssen angegeben werden.'
+                }
+            else:
+                response = self._catalog_diff(input_path, catalog_path, request.get('options') or {},
+                                              bool(request.get('apply')), bool(request.get('remove')))
+        elif action == 'calculate':
+            catalog_path = request.get('catalog')
+            if not catalog_path:
+                response = {
+                    'success': False,
+                    'error': 'Keine Katalogdatei angegeben.'
+                }
+            else:
+                response = self._calculate(catalog_path, request.get('violations'), request.get('queries'))
+        elif action == 'index':
+            input_path = request.get('input')
+            if not input_path:
+                response = {
+                    'success': False,
+                    'error': 'Keine Eingabedatei oder URL angegeben.'
+                }
+            else:
+                response = self._index(request.get('index'), input_path, request.get('options') or {},
+                                       bool(request.get('remove')))
+        elif action == 'search':
+            limit = request.get('limit')
+            if limit is None:
+                limit = DEFAULT_SEARCH_LIMIT
+            if isinstance(limit, str) and limit.strip().isdigit():
+                limit = int(limit)
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+                response = {
+                    'success': False,
+                    'error': f'Ungültiges Limit: {limit!r} (erwartet eine positive ganze Zahl)'
+                }
+            else:
+                response = self._search(request.get('index'), str(request.get('query') or ''),
+                                        min(limit, MAX_SEARCH_LIMIT))
+        else:
+            response = {
+                'success': False,
+                'error': f'Unbekannte Aktion: {action}'
+            }
+
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """
+        Verarbeitet eine Protokollzeile und gibt die serialisierte Antwort zurück.
+
+        Args:
+            line: Eine Zeile mit einer JSON-Anfrage
+
+        Returns:
+            Die Antwort als JSON-Zeile oder None bei Leerzeilen
+        """
+        line = line.strip()
+        if not line:
+            return None
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('Anfrage muss ein JSON-Objekt sein')
+        except ValueError as e:
+            response = {
+                'success': False,
+                'error': f'Ungültige Anfrage: {str(e)}'
+            }
+        else:
+            response = self.handle(request)
+
+        stats = response.pop('stats', None)
+        if not isinstance(stats, Stats):
+            return self._encode(response).decode('utf-8') + '\n'
+        with stats.stage('serialize'):
+            line = self._encode(response).decode('utf-8')
+        return attach_stats(line, stats) + '\n'
+
+    def _parse(self, input_path: str, mode: str, options: Dict, with_stats: bool = False,
+               trace_memory: bool = False) -> Dict:
+        """Führt den Parser aus und verpackt das Ergebnis in eine Antwort."""
+        stats = None
+        try:
+            if with_stats:
+                result, stats = self.doc_parser.process_with_stats(input_path, mode, trace_memory=trace_memory,
+                                                                   **options)
+            else:
+                result = self.doc_parser.process(input_path, mode, **options)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+
+        if isinstance(result, dict) and not result.get('success', True):
+            response = result
+        else:
+            response = {
+                'success': True,
+                'result': result
+            }
+        if stats is not None:
+            response['stats'] = stats
+        return response
+
+
+    def _catalog_diff(self, input_path: str, catalog_path: str, options: Dict, apply: bool,
+                      remove: bool) -> Dict:
+        """Parst ein Dokument im Katalog-Modus und gleicht es mit der Katalogdatei ab."""
+        from catalog_diff import catalog_diff_result
+
+        response = self._parse(input_path, 'catalog', options)
+        if not response.get('success'):
+            return response
+        try:
+            response['result'] = catalog_diff_result(response['result'], catalog_path, apply=apply, remove=remove)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        return response
+
+    def _calculate(self, catalog_path: str, violations: Optional[list], queries: Optional[list]) -> Dict:
+        """Berechnet die Strafen für eine Anfrage ('violations') oder mehrere ('queries')."""
+        from fine_catalog import FineCatalog, query_violations
+
+        try:
+            stat = os.stat(catalog_path)
+            version = (stat.st_mtime_ns, stat.st_size)
+            with self._catalog_lock:
+                cached = self._fine_catalogs.get(catalog_path)
+            if cached is None or cached[0] != version:
+                # Geladen wird ohne Sperre, damit Anfragen an andere Kataloge nicht warten
+                cached = (version, FineCatalog.from_file(catalog_path, self.doc_parser))
+                with self._catalog_lock:
+                    self._fine_catalogs[catalog_path] = cached
+            catalog = cached[1]
+
+            if queries is not None:
+                if not isinstance(queries, list):
+                    raise ValueError("'queries' muss eine Liste von Anfragen sein")
+                result = catalog.calculate_many([query_violations(query) for query in queries])
+            else:
+                result = catalog.calculate(query_violations(violations))
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        return {
+            'success': True,
+            'result': result
+        }
+
+    def _open_index(self, index_path: Optional[str]):
+        """Liefert den geöffneten Suchindex zu einem Pfad (Standard: DEFAULT_INDEX_PATH)."""
+        from document_parser import parser_fingerprint
+        from search_index import DEFAULT_INDEX_PATH, SearchIndex
+
+        index_path = index_path or DEFAULT_INDEX_PATH
+        index = self._indexes.get(index_path)
+        if index is None:
+            index = SearchIndex(index_path, version=parser_fingerprint())
+            self._indexes[index_path] = index
+        return index
+
+    def _index(self, index_path: Optional[str], input_path: str, options: Dict, remove: bool) -> Dict:
+        """
+        Nimmt ein Dokument in den Suchindex auf bzw. entfernt es.
+
+        Nur die Zugriffe auf die Indexdatei laufen unter _index_lock; das Parsen
+        erfolgt ohne Sperre, damit Suchen nicht auf langsame Dokumente warten.
+        """
+        try:
+            with self._index_lock:
+                index = self._open_index(index_path)
+            source, content_hash = index.document_key(input_path)
+            if remove:
+                with self._index_lock:
+                    return {'success': True, 'result': {'removed': index.remove_document(source)}}
+
+            if content_hash is not None:
+                with self._index_lock:
+                    current = index.is_current(source, content_hash)
+                if current:
+                    return {'success': True,
+                            'result': {'source': source, 'sections': None, 'skipped': True}}
+
+            parsed = index.parse_sections(self.doc_parser, input_path, source, **options)
+            if not parsed.get('success'):
+                return dict(parsed, success=False)
+            with self._index_lock:
+                count = index.add_document(source, parsed['sections'], content_hash)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        return {'success': True, 'result': {'source': source, 'sections': count, 'skipped': False}}
+
+    def _search(self, index_path: Optional[str], query: str, limit: int) -> Dict:
+        """Sucht im Volltextindex."""
+        try:
+            with self._index_lock:
+                result = self._open_index(index_path).search(query, limit=limit)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+        return {'success': True, 'result': result}
+
+
+class _StreamHandler(socketserver.StreamRequestHandler):
+    """Bedient eine Client-Verbindung; pro Verbindung sind mehrere Anfragen möglich."""
+
+    def handle(self):
+        for raw_line in self.rfile:
+            response = self.server.request_handler.handle_line(raw_line.decode('utf-8', errors='replace'))
+            if response is None:
+                continue
+            self.wfile.write(response.encode('utf-8'))
+            self.wfile.flush()
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_stdio(request_handler: RequestHandler, stdin=None, stdout=None):
+    """
+    Beantwortet Anfragen zeilenweise über stdin/stdout, bis stdin geschlossen wird.
+
+    Args:
+        request_handler: Handler, der die Anfragen verarbeitet
+        stdin: Eingabestrom (Standard: sys.stdin)
+        stdout: Ausgabestrom (Standard: sys.stdout)
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    for line in stdin:
+        response = request_handler.handle_line(line)
+        if response is None:
+            continue
+        stdout.write(response)
+        stdout.flush()
+
+
+def serve_socket(request_handler: RequestHandler, socket_path: str):
+    """
+    Beantwortet Anfragen gleichzeitiger Clients auf einem Unix-Socket.
+
+    Args:
+        request_handler: Handler, der die Anfragen verarbeitet
+        socket_path: Pfad des Unix-Sockets
+    """
+    # Verwaisten Socket eines abgestürzten Servers entfernen
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = _ThreadingUnixServer(socket_path, _StreamHandler)
+    server.request_handler = request_handler
+
+    def _terminate(signum, frame):
+        raise SystemExit(0)
+
+    # Bei SIGTERM (z.B. durch systemd) sauber beenden und den Socket entfernen
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"Parser-Server lauscht auf {socket_path}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def serve(doc_parser, socket_path: Optional[str] = None, version: str = ''):
+    """
+    Startet den Server-Modus.
+
+    Args:
+        doc_parser: Vorgewärmte Instanz des DocumentParser
+        socket_path: Pfad eines Unix-Sockets; ohne Angabe wird stdin/stdout genutzt
+        version: Parser-Version für den Health-Check
+    """
+    request_handler = RequestHandler(doc_parser, version=version)
+    if socket_path:
+        serve_socket(request_handler, socket_path)
+    else:
+        serve_stdio(request_handler)
+
+
+class ParserClient:
+    """Kleiner Client für den Parser-Server auf einem Unix-Socket."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 120.0):
+        """
+        Initialisiert den Client. Die Verbindung wird beim ersten Aufruf aufgebaut.
+
+        Args:
+            socket_path: Pfad des Unix-Sockets
+            timeout: Timeout in Sekunden pro Anfrage
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+
+    def _connect(self):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout)
+            self._sock.connect(self.socket_path)
+            self._file = self._sock.makefile('rwb')
+
+    def request(self, payload: Dict) -> Dict:
+        """
+        Sendet eine Anfrage und wartet auf die Antwort.
+
+        Args:
+            payload: Die Anfrage (ohne 'id', diese wird automatisch vergeben)
+
+        Returns:
+            Die dekodierte Antwort des Servers
+        """
+        self._connect()
+        self._next_id += 1
+        payload = dict(payload, id=self._next_id)
+        self._file.write((json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            self.close()
+            raise ConnectionError('Der Parser-Server hat die Verbindung geschlossen.')
+        return json.loads(line.decode('utf-8'))
+
+    def ping(self) -> bool:
+        """Prüft, ob der Server erreichbar ist und antwortet."""
+        try:
+            return bool(self.request({'action': 'ping'}).get('pong'))
+        except (OSError, ValueError):
+            self.close()
+            return False
+
+    def parse(self, input_path: str, mode: str = 'text', **options) -> Dict:
+        """
+        Lässt ein Dokument vom Server parsen.
+
+        Args:
+            input_path: Pfad zur Datei oder URL
+            mode: Ausgabemodus ('text', 'sections' oder 'catalog')
+            **options: Zusätzliche Parser-Optionen (z.B. pages)
+
+        Returns:
+            Die Antwort des Servers ('success' und 'result' bzw. 'error')
+        """
+        return self.request({'action': 'parse', 'input': input_path, 'mode': mode, 'options': options})
+
+    def close(self):
+        """Schließt die Verbindung zum Server."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inhaltsadressierter Ergebnis-Cache für den Dokument-Parser.
+
+Der Schlüssel eines Eintrags ergibt sich aus dem Hash der Eingabedatei, ihrem
+Dateinamen, dem Ausgabemodus, den ergebnisrelevanten Optionen und der
+Parser-Version (inkl. eines Fingerabdrucks des Parser-Quelltexts und der
+Versionen von PyPDF2 und BeautifulSoup). Der Dateiname gehört dazu, weil er
+das Backend bestimmt und in die Metadaten eingeht (Titel von Textdateien).
+Ein Update des Parsers macht alte Einträge damit automatisch ungültig; sie
+werden über die LRU-Verdrängung nach und nach entfernt.
+
+Einträge werden atomar geschrieben (temporäre Datei + os.replace), sodass
+parallele Importe nie eine halb geschriebene Datei lesen. Die Gesamtgröße
+ist begrenzt; bei Überschreitung werden die am längsten nicht genutzten
+Einträge (nach mtime) gelöscht, bis EVICT_LOW_WATER der Grenze erreicht ist.
+Dafür führt jede Instanz eine laufende Gesamtgröße mit; das Verzeichnis wird
+nur beim ersten Schreiben, beim Überschreiten der Grenze und alle
+EVICT_RESCAN_PUTS Schreibvorgänge (für Einträge anderer Prozesse) vollständig
+gelesen.
+
+Das Standardverzeichnis liegt je Benutzer getrennt im temporären Verzeichnis;
+jeder Cache legt sein Verzeichnis nur für den Benutzer zugänglich an (0700).
+
+Für URLs speichert der HttpCache die Antwort samt Validatoren (ETag,
+Last-Modified) und die daraus geparsten Ergebnisse. Ein erneuter Import
+sendet eine bedingte Anfrage; bei "304 Not Modified" wird das gespeicherte
+Ergebnis ohne erneutes Parsen übernommen.
+"""
+
+import os
+import json
+import time
+import getpass
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Union
+
+
+def _user_suffix() -> str:
+    """Kennung des Benutzers für das Standardverzeichnis (UID, sonst Benutzername)."""
+    if hasattr(os, 'getuid'):
+        return str(os.getuid())
+    try:
+        return getpass.getuser()
+    except Exception:
+        return 'default'
+
+
+# Standardverzeichnis des Caches (je Benutzer), kann über DOC_PARSER_CACHE_DIR überschrieben werden
+DEFAULT_CACHE_DIR = os.environ.get('DOC_PARSER_CACHE_DIR') or \
+    os.path.join(tempfile.gettempdir(), 'doj_document_parser_cache-' + _user_suffix())
+
+# Standardgröße des Caches in Bytes
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Standardverzeichnis und -größe des HTTP-Caches
+DEFAULT_HTTP_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'http')
+DEFAULT_HTTP_MAX_BYTES = 64 * 1024 * 1024
+
+# Standardverzeichnis und -größe des Seiten-Caches für PDFs
+DEFAULT_PAGE_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'pages')
+DEFAULT_PAGE_MAX_BYTES = 64 * 1024 * 1024
+
+# Beim Verdrängen wird bis auf diesen Anteil der Größengrenze gelöscht, damit nicht jeder
+# folgende Schreibvorgang erneut verdrängt
+EVICT_LOW_WATER = 0.9
+
+# Nach so vielen Schreibvorgängen wird die laufende Gesamtgröße neu aus dem Verzeichnis bestimmt
+EVICT_RESCAN_PUTS = 256
+
+# Optionen, die das Ergebnis nicht verändern und daher nicht in den Schlüssel eingehen
+NEUTRAL_OPTIONS = ('workers', 'stream_download', 'max_download_bytes', 'max_download_seconds')
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Berechnet den SHA-256-Hash einer Datei blockweise.
+
+    Args:
+        file_path: Pfad zur Datei
+
+    Returns:
+        Der Hash als Hex-String
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _relevant_options(options: Optional[Dict]) -> str:
+    """Serialisiert die ergebnisrelevanten Optionen in stabiler Reihenfolge."""
+    relevant = {name: value for name, value in (options or {}).items()
+                if name not in NEUTRAL_OPTIONS and value is not None}
+    return json.dumps(relevant, sort_keys=True)
+
+
+class ResultCache:
+    """Speichert Parser-Ergebnisse als JSON-Dateien, adressiert über den Eingabe-Hash."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 version: str = ''):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            cache_dir: Verzeichnis der Cache-Einträge (wird bei Bedarf angelegt)
+            max_bytes: Maximale Gesamtgröße aller Einträge
+            version: Parser-Version, die in jeden Schlüssel eingeht
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        # Laufende Gesamtgröße in Bytes (None = noch nicht aus dem Verzeichnis bestimmt)
+        self._size = None
+        self._puts = 0
+
+    def key(self, file_path: str, mode: str, options: Optional[Dict] = None) -> str:
+        """
+        Bildet den Cache-Schlüssel für eine Eingabedatei.
+
+        Args:
+            file_path: Pfad zur Eingabedatei
+            mode: Ausgabemodus
+            options: Parser-Optionen; nur ergebnisrelevante gehen in den Schlüssel ein
+
+        Returns:
+            Der Schlüssel als Hex-String
+        """
+        material = '\0'.join([
+            self.version,
+            mode,
+            _relevant_options(options),
+            # Dateiendung und Titel hängen vom Namen ab, nicht nur vom Inhalt
+            os.path.basename(file_path),
+            hash_file(file_path)
+        ])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, key: str) -> Optional[Union[Dict, List]]:
+        """
+        Liest einen Eintrag und markiert ihn als zuletzt genutzt.
+
+        Args:
+            key: Schlüssel aus key()
+
+        Returns:
+            Das gespeicherte Ergebnis oder None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                result = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Fehlend, gerade verdrängt oder beschädigt: wie ein Fehlschlag behandeln
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Union[Dict, List]):
+        """
+        Speichert ein Ergebnis atomar und verdrängt bei Bedarf alte Einträge.
+
+        Args:
+            key: Schlüssel aus key()
+            result: Das zu speichernde Ergebnis
+        """
+        self._account(self._write(key, result))
+
+    def _write(self, key: str, result: Union[Dict, List]) -> int:
+        """
+        Schreibt einen Eintrag atomar (temporäre Datei + os.replace), ohne zu verdrängen.
+
+        Returns:
+            Die Größenänderung des Caches in Bytes (ein ersetzter Eintrag wird abgezogen)
+        """
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        if self._size is None:
+            # Nur der Benutzer darf Einträge lesen und unterschieben
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        os.makedirs(directory, exist_ok=True)
+
+        try:
+            old_size = os.stat(path).st_size
+        except OSError:
+            old_size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(result, file, ensure_ascii=False)
+                file.flush()
+                size = os.fstat(file.fileno()).st_size
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return size - old_size
+
+    def _account(self, delta: int):
+        """Verbucht geschriebene Bytes und verdrängt erst, wenn die laufende Gesamtgröße die Grenze überschreitet."""
+        self._puts += 1
+        if self._size is None or self._puts % EVICT_RESCAN_PUTS == 0:
+            self.evict()
+            return
+        self._size += delta
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entry_paths(self):
+        """Liefert die Pfade aller Einträge; nur die Unterverzeichnisse key[:2] gehören zum Cache."""
+        try:
+            shards = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for shard in shards:
+            directory = os.path.join(self.cache_dir, shard)
+            if len(shard) != 2 or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith('.json') and not name.startswith('.tmp-'):
+                    yield os.path.join(directory, name)
+
+    def evict(self):
+        """
+        Bestimmt die Gesamtgröße aus dem Verzeichnis und löscht bei Überschreitung der Grenze
+        die am längsten nicht genutzten Einträge, bis EVICT_LOW_WATER der Grenze erreicht ist.
+        """
+        entries = []
+        total = 0
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            target = int(self.max_bytes * EVICT_LOW_WATER)
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+        self._size = total
+
+    def clear(self):
+        """Entfernt alle Einträge des Caches."""
+        for path in list(self._entry_paths()):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._size = 0
+
+
+class CachedResponse:
+    """Antwort aus dem HttpCache mit den Attributen, die der Parser von requests.Response nutzt."""
+
+    def __init__(self, url: str, text: str, status_code: int = 200):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+
+
+class HttpCache(ResultCache):
+    """Speichert Webseiten samt Validatoren und den daraus geparsten Ergebnissen."""
+
+    def __init__(self, cache_dir: str = DEFAULT_HTTP_CACHE_DIR, max_bytes: int = DEFAULT_HTTP_MAX_BYTES,
+                 version: str = '', ttl: float = 0):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            cache_dir: Verzeichnis der Cache-Einträge (wird bei Bedarf angelegt)
+            max_bytes: Maximale Gesamtgröße aller Einträge
+            version: Parser-Version; Ergebnisse anderer Versionen werden nicht wiederverwendet
+            ttl: Sekunden, in denen ein Eintrag ohne erneute Anfrage als aktuell gilt
+                (0 = immer mit einer bedingten Anfrage prüfen)
+        """
+        super().__init__(cache_dir, max_bytes, version)
+        self.ttl = ttl
+        self.revalidated = 0
+
+    def url_key(self, url: str) -> str:
+        """Bildet den Schlüssel des Eintrags einer URL."""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def result_key(self, mode: str, options: Optional[Dict] = None) -> str:
+        """Bildet den Schlüssel eines geparsten Ergebnisses innerhalb eines Eintrags."""
+        return '\0'.join([self.version, mode, _relevant_options(options)])
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Prüft, ob ein Eintrag innerhalb der TTL liegt und ohne Anfrage genutzt werden darf."""
+        return time.time() - entry.get('checked', 0) < self.ttl
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        Liefert die Header für eine bedingte Anfrage.
+
+        Args:
+            entry: Der gespeicherte Eintrag oder None
+
+        Returns:
+            If-None-Match/If-Modified-Since, soweit Validatoren vorhanden sind
+        """
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def response(self, entry: Dict) -> CachedResponse:
+        """Erzeugt aus einem Eintrag eine Antwort, die der Parser wie einen Abruf verarbeitet."""
+        return CachedResponse(entry['url'], entry['body'], entry.get('status_code', 200))
+
+    def store(self, url: str, response, result_key: str, result: Union[Dict, List],
+              entry: Optional[Dict] = None):
+        """
+        Speichert eine Antwort bzw. bestätigt einen bestehenden Eintrag und legt das Ergebnis ab.
+
+        Args:
+            url: Die geladene URL
+            response: Die neue Antwort (Status 200) oder None, wenn entry per 304 bestätigt wurde
+            result_key: Schlüssel aus result_key()
+            result: Das geparste Ergebnis
+            entry: Der bisherige Eintrag
+        """
+        if response is not None:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            # Ohne Validatoren lohnt sich das Speichern nur innerhalb der TTL
+            if not etag and not last_modified and not self.ttl:
+                return
+            entry = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'status_code': response.status_code,
+                'body': response.text,
+                'results': {}
+            }
+
+        # Ergebnisse älterer Parser-Versionen verwerfen
+        prefix = self.version + '\0'
+        entry['results'] = {key: value for key, value in entry.get('results', {}).items() if key.startswith(prefix)}
+        entry['results'][result_key] = result
+        entry['checked'] = time.time()
+        self.put(self.url_key(url), entry)
+
+
+class PageCache(ResultCache):
+    """Speichert extrahierte PDF-Seitentexte, adressiert über den Inhalt der Seite."""
+
+    def __init__(self, cache_dir: str = DEFAULT_PAGE_CACHE_DIR, max_bytes: int = DEFAULT_PAGE_MAX_BYTES,
+                 version: str = ''):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            cache_dir: Verzeichnis der Cache-Einträge (wird bei Bedarf angelegt)
+            max_bytes: Maximale Gesamtgröße aller Einträge
+            version: Parser-Version; Texte anderer Versionen werden nicht wiederverwendet
+        """
+        super().__init__(cache_dir, max_bytes, version)
+
+    def page_key(self, page_hash: str) -> str:
+        """Bildet den Schlüssel einer Seite aus ihrem Inhalts-Hash (siehe document_parser.pdf_page_hash())."""
+        return hashlib.sha256((self.version + '\0' + page_hash).encode('utf-8')).hexdigest()
+
+    def get_pages(self, page_hashes: List[str]) -> Dict[str, str]:
+        """
+        Liest die gespeicherten Texte mehrerer Seiten.
+
+        Args:
+            page_hashes: Die Inhalts-Hashes der Seiten
+
+        Returns:
+            Die gefundenen Texte nach Inhalts-Hash
+        """
+        texts = {}
+        for page_hash in dict.fromkeys(page_hashes):
+            entry = self.get(self.page_key(page_hash))
+            if isinstance(entry, dict) and isinstance(entry.get('text'), str):
+                texts[page_hash] = entry['text']
+        return texts
+
+    def put_pages(self, texts: Dict[str, str]):
+        """
+        Speichert die Texte mehrerer Seiten und verdrängt erst danach alte Einträge.
+
+        Args:
+            texts: Die Seitentexte nach Inhalts-Hash
+        """
+        if not texts:
+            return
+        delta = 0
+        for page_hash, text in texts.items():
+            delta += self._write(self.page_key(page_hash), {'text': text})
+        self._account(delta)
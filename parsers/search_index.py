@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistenter Volltextindex über geparste Dokumente und ihre Abschnitte.
+
+Jeder Abschnitt aus extract_sections() wird als eigene Einheit indexiert
+(Dokumente ohne erkennbare Abschnitte als eine Einheit mit dem gesamten
+Text). Der Index ist eine SQLite-Datei mit einer invertierten Liste:
+je Term und Dokument ein Block mit (Abschnitt, Termhäufigkeit, Länge) als
+gepacktes Integer-Array. Eine Suche liest damit pro Term höchstens eine
+Zeile je Dokument; die Rangfolge der Treffer ergibt sich aus BM25.
+
+Die Tokenisierung berücksichtigt deutsche Texte: Groß-/Kleinschreibung,
+ß/ss und Umlaute (ä/ae) werden vereinheitlicht, häufige Füllwörter
+entfallen, Plural- und Flexionsendungen werden nach CISTEM abgeschnitten
+("Gebühren" findet "Gebühr") und Paragraphen-Angaben bleiben als ein Token erhalten
+("§ 12" und "§12" ergeben "§12").
+
+Dokumente werden einzeln hinzugefügt, ersetzt oder entfernt; unveränderte
+Dateien (gleicher Inhalt und gleiche Parser-Version) werden übersprungen.
+
+Aufruf über document_parser.py:
+    python3 parsers/document_parser.py --mode=index gesetze/ [--index DATEI]
+    python3 parsers/document_parser.py --mode=index --remove gesetze/alt.pdf
+    python3 parsers/document_parser.py --mode=search "Diebstahl geringwertiger Sachen"
+"""
+
+import os
+import re
+import math
+import time
+import heapq
+import sqlite3
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# Standardpfad des Index, kann über DOC_PARSER_INDEX überschrieben werden
+DEFAULT_INDEX_PATH = os.environ.get('DOC_PARSER_INDEX') or \
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'search_index.sqlite')
+
+# BM25-Parameter
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Länge des Textausschnitts in den Treffern
+SNIPPET_CHARS = 240
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT UNIQUE NOT NULL,
+    content_hash TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    number TEXT,
+    title TEXT,
+    content TEXT,
+    start INTEGER,
+    end INTEGER,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_document ON sections (document_id);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    document_id INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (term, document_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_document ON postings (document_id);
+"""
+
+# Paragraphen-Angaben ("§ 12", "§§ 3a") oder Wörter
+_TOKEN = re.compile(r'§+\s*(\d+[a-z]?)(?!\w)|\w+')
+
+# Häufige Wörter ohne Aussagekraft (in gefalteter Schreibweise)
+STOPWORDS = frozenset("""
+    aber als also am an auch auf aus bei bis da das dass dem den der des die dies diese dieser
+    dieses doch du durch ein eine einem einen einer eines er es fuer hat ich ihr im in ist
+    ja jede jeder jedes kann kein keine mit nach nicht noch nur ob oder ohne sein sich sie
+    sind so soll ueber um und uns von vom vor war was wenn werden wer wie wird wir zu zum zur
+""".split())
+
+# Suchen laufen ohne Sperre, Schreibvorgänge warten bis zu 30 Sekunden auf andere Prozesse
+_BUSY_TIMEOUT = 30.0
+
+
+# Version der Tokenisierung; geht in den Inhaltsschlüssel ein, damit geänderte Regeln neu indexieren
+TOKENIZER_VERSION = 2
+
+# Buchstabenfolgen, die beim Stemming als ein Zeichen gelten (nach CISTEM)
+_STEM_DIGRAPHS = (('sch', '$'), ('ei', '%'), ('ie', '&'))
+_STEM_DOUBLE = re.compile(r'(.)\1')
+_STEM_DOUBLE_BACK = re.compile(r'(.)\*')
+
+
+def _stem(word: str) -> str:
+    """
+    Stemming für deutsche Wörter nach CISTEM (Weissweiler/Fraser 2017).
+
+    Endungen werden wiederholt abgeschnitten, bis keine Regel mehr greift;
+    Singular und Plural ergeben so denselben Stamm ("gebuehr"/"gebuehren",
+    "strasse"/"strassen", "richter"/"richtern"). Das Präfix "ge" bleibt
+    anders als im Original erhalten, da sonst z.B. "Gericht" und "Richter"
+    zusammenfallen.
+    """
+    for sequence, symbol in _STEM_DIGRAPHS:
+        word = word.replace(sequence, symbol)
+    # Doppelte Buchstaben als ein Zeichen, damit "ss" nicht halbiert wird
+    word = _STEM_DOUBLE.sub(r'\1*', word)
+    while len(word) > 3:
+        if len(word) > 5 and word.endswith(('em', 'er', 'nd')):
+            word = word[:-2]
+        elif word.endswith(('t', 'e', 's', 'n')):
+            word = word[:-1]
+        else:
+            break
+    word = _STEM_DOUBLE_BACK.sub(r'\1\1', word)
+    for sequence, symbol in _STEM_DIGRAPHS:
+        word = word.replace(symbol, sequence)
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Zerlegt einen Text in normalisierte Suchbegriffe.
+
+    Args:
+        text: Der Text, z.B. "Die Gebühren nach § 12 StGB"
+
+    Returns:
+        Die Tokens in Textreihenfolge, z.B. ['gebuehr', '§12', 'stgb']
+    """
+    tokens = []
+    text = text.casefold().replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue')
+    for match in _TOKEN.finditer(text):
+        number = match.group(1)
+        if number:
+            tokens.append('§' + number)
+            continue
+        word = match.group()
+        if word.isdigit():
+            tokens.append(word)
+        elif len(word) > 1 and word not in STOPWORDS:
+            tokens.append(_stem(word))
+    return tokens
+
+
+class SearchIndex:
+    """Invertierter Index mit BM25-Ranking in einer SQLite-Datei."""
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH, version: str = ''):
+        """
+        Öffnet den Index und legt ihn bei Bedarf an.
+
+        Args:
+            index_path: Pfad der Indexdatei
+            version: Parser-Version; Dokumente, die mit einer anderen Version indexiert
+                wurden, gelten als geändert
+        """
+        directory = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = index_path
+        self.version = version
+        self.db = sqlite3.connect(index_path, timeout=_BUSY_TIMEOUT, check_same_thread=False)
+        # WAL erlaubt Suchen, während ein anderer Prozess indexiert
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        """Schließt die Indexdatei."""
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _meta(self, key: str, default: int = 0) -> int:
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return int(row[0]) if row else default
+
+    def _add_meta(self, key: str, delta: int):
+        self.db.execute('INSERT INTO meta (key, value) VALUES (?, ?) '
+                        'ON CONFLICT (key) DO UPDATE SET value = value + excluded.value', (key, delta))
+
+    def content_hash(self, file_path: str) -> str:
+        """Bildet den Inhaltsschlüssel einer Datei aus ihrem Hash, der Parser-Version und TOKENIZER_VERSION."""
+        from result_cache import hash_file
+
+        return f'{self.version}+t{TOKENIZER_VERSION}:{hash_file(file_path)}'
+
+    def add_document(self, source: str, sections: Iterable[Dict], content_hash: Optional[str] = None) -> int:
+        """
+        Indexiert die Abschnitte eines Dokuments; ein bereits vorhandenes Dokument wird ersetzt.
+
+        Args:
+            source: Eindeutiger Name des Dokuments (absoluter Pfad oder URL)
+            sections: Abschnitte wie von extract_sections() ('number', 'title', 'content',
+                optional 'start'/'end')
+            content_hash: Inhaltsschlüssel zum Überspringen unveränderter Dokumente
+
+        Returns:
+            Die Anzahl der indexierten Abschnitte
+        """
+        with self.db:
+            self._remove(source)
+            document_id = self.db.execute(
+                'INSERT INTO documents (source, content_hash, indexed_at) VALUES (?, ?, ?)',
+                (source, content_hash, time.time())
+            ).lastrowid
+
+            # Term -> [Abschnitt, Häufigkeit, Länge, Abschnitt, ...]
+            postings = {}
+            total_length = 0
+            count = 0
+            for section in sections:
+                number = section.get('number')
+                title = section.get('title') or ''
+                content = section.get('content') or ''
+                tokens = tokenize(title + '\n' + content)
+                number_token = '§' + str(number).casefold() if number else None
+                if number_token and number_token not in tokens:
+                    # "§12" findet den Abschnitt auch, wenn die Überschrift nur "12." lautet
+                    tokens.append(number_token)
+                if not tokens:
+                    continue
+
+                section_id = self.db.execute(
+                    'INSERT INTO sections (document_id, number, title, content, start, end, length) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (document_id, number, title, content, section.get('start'), section.get('end'), len(tokens))
+                ).lastrowid
+                for term, tf in Counter(tokens).items():
+                    entry = postings.get(term)
+                    if entry is None:
+                        postings[term] = entry = array('i')
+                    entry.extend((section_id, tf, len(tokens)))
+                total_length += len(tokens)
+                count += 1
+
+            self.db.executemany('INSERT INTO postings (term, document_id, data) VALUES (?, ?, ?)',
+                                ((term, document_id, entry.tobytes()) for term, entry in postings.items()))
+            self._add_meta('sections', count)
+            self._add_meta('total_length', total_length)
+        return count
+
+    def remove_document(self, source: str) -> bool:
+        """
+        Entfernt ein Dokument aus dem Index.
+
+        Args:
+            source: Name des Dokuments wie bei add_document()
+
+        Returns:
+            True, wenn das Dokument im Index war
+        """
+        with self.db:
+            return self._remove(source)
+
+    def _remove(self, source: str) -> bool:
+        """Entfernt ein Dokument innerhalb der laufenden Transaktion."""
+        row = self.db.execute('SELECT id FROM documents WHERE source = ?', (source,)).fetchone()
+        if row is None:
+            return False
+        document_id = row[0]
+
+        count, total_length = self.db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(length), 0) FROM sections WHERE document_id = ?', (document_id,)
+        ).fetchone()
+        self.db.execute('DELETE FROM postings WHERE document_id = ?', (document_id,))
+        self.db.execute('DELETE FROM sections WHERE document_id = ?', (document_id,))
+        self.db.execute('DELETE FROM documents WHERE id = ?', (document_id,))
+        self._add_meta('sections', -count)
+        self._add_meta('total_length', -total_length)
+        return True
+
+    def is_current(self, source: str, content_hash: str) -> bool:
+        """Prüft, ob ein Dokument mit diesem Inhaltsschlüssel bereits indexiert ist."""
+        row = self.db.execute('SELECT content_hash FROM documents WHERE source = ?', (source,)).fetchone()
+        return row is not None and row[0] == content_hash
+
+    def document_key(self, input_path: str):
+        """
+        Bestimmt den Namen und Inhaltsschlüssel eines Dokuments, ohne den Index zu lesen.
+
+        Args:
+            input_path: Pfad zur Datei oder URL
+
+        Returns:
+            (source, content_hash); content_hash ist None für URLs und fehlende Dateien
+        """
+        if input_path.startswith(('http://', 'https://')):
+            return input_path, None
+        source = os.path.abspath(input_path)
+        return source, self.content_hash(input_path) if os.path.isfile(input_path) else None
+
+    @staticmethod
+    def parse_sections(doc_parser, input_path: str, source: str, **options) -> Dict:
+        """
+        Parst ein Dokument in die zu indexierenden Abschnitte, ohne den Index zu verändern.
+
+        Ein Dokument ohne erkennbare Abschnitte ergibt einen Abschnitt mit dem gesamten Text.
+
+        Args:
+            doc_parser: Instanz des DocumentParser
+            input_path: Pfad zur Datei oder URL
+            source: Name des Dokuments aus document_key()
+            **options: Parser-Optionen wie bei DocumentParser.process()
+
+        Returns:
+            {'success': True, 'sections': [...]} oder ein Fehler-Dictionary
+        """
+        result = doc_parser.process(input_path, 'text', **options)
+        if not result.get('success'):
+            return result
+
+        text = result['content']
+        sections = doc_parser.extract_sections(text)
+        if not sections:
+            sections = [{
+                'number': None,
+                'title': os.path.basename(source),
+                'content': text,
+                'start': 0,
+                'end': len(text)
+            }]
+        return {'success': True, 'sections': sections}
+
+    def index_file(self, doc_parser, input_path: str, **options) -> Dict:
+        """
+        Parst ein Dokument und indexiert seine Abschnitte.
+
+        Unveränderte lokale Dateien werden nicht erneut geparst. Ein Dokument
+        ohne erkennbare Abschnitte wird als ein Abschnitt mit dem gesamten Text
+        indexiert.
+
+        Args:
+            doc_parser: Instanz des DocumentParser
+            input_path: Pfad zur Datei oder URL
+            **options: Parser-Optionen wie bei DocumentParser.process()
+
+        Returns:
+            {'success': True, 'source': ..., 'sections': n, 'skipped': bool} oder ein Fehler-Dictionary
+        """
+        source, content_hash = self.document_key(input_path)
+        if content_hash is not None and self.is_current(source, content_hash):
+            return {'success': True, 'source': source, 'sections': None, 'skipped': True}
+
+        parsed = self.parse_sections(doc_parser, input_path, source, **options)
+        if not parsed.get('success'):
+            return parsed
+        count = self.add_document(source, parsed['sections'], content_hash)
+        return {'success': True, 'source': source, 'sections': count, 'skipped': False}
+
+    def search(self, query: str, limit: int = 10) -> Dict:
+        """
+        Sucht Abschnitte zu einer Anfrage und sortiert sie nach BM25.
+
+        Args:
+            query: Suchbegriffe, z.B. "§ 242 Diebstahl"
+            limit: Maximale Anzahl der Treffer
+
+        Returns:
+            Ein Dictionary mit 'total' (Anzahl der passenden Abschnitte) und 'hits'
+            (Dokument, Abschnitt, Score und Textausschnitt je Treffer)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {'total': 0, 'hits': []}
+
+        section_count = self._meta('sections')
+        average_length = self._meta('total_length') / section_count if section_count else 1.0
+        norm = BM25_K1 * (1 - BM25_B)
+        scale = BM25_K1 * BM25_B / average_length
+
+        posting_lists = []
+        for term in terms:
+            data = array('i')
+            for (blob,) in self.db.execute('SELECT data FROM postings WHERE term = ?', (term,)):
+                data.frombytes(blob)
+            if data:
+                posting_lists.append(data)
+
+        # Die längste Liste bildet den Grundstock (dict(zip()) statt Einzelzuweisungen)
+        posting_lists.sort(key=len, reverse=True)
+        scores = {}
+        get = scores.get
+        for data in posting_lists:
+            df = len(data) // 3
+            weight = math.log(1 + (section_count - df + 0.5) / (df + 0.5)) * (BM25_K1 + 1)
+            section_ids = data[0::3]
+            values = [weight * tf / (tf + norm + scale * length) for tf, length in zip(data[1::3], data[2::3])]
+            if not scores:
+                scores = dict(zip(section_ids, values))
+                get = scores.get
+                continue
+            for section_id, value in zip(section_ids, values):
+                scores[section_id] = get(section_id, 0.0) + value
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        hits = []
+        for section_id, score in best:
+            source, number, title, content, start, end = self.db.execute(
+                'SELECT documents.source, sections.number, sections.title, sections.content, sections.start, '
+                'sections.end FROM sections JOIN documents ON documents.id = sections.document_id '
+                'WHERE sections.id = ?', (section_id,)
+            ).fetchone()
+            hits.append({
+                'source': source,
+                'number': number,
+                'title': title,
+                'score': round(score, 4),
+                'start': start,
+                'end': end,
+                'snippet': _snippet(content or '', query)
+            })
+        return {'total': len(scores), 'hits': hits}
+
+    def info(self) -> Dict:
+        """Liefert die Größe des Index (Dokumente und Abschnitte)."""
+        documents = self.db.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+        return {'index': self.index_path, 'documents': documents, 'sections': self._meta('sections')}
+
+
+def _snippet(content: str, query: str) -> str:
+    """Schneidet den Textausschnitt um das erste Vorkommen eines Suchworts aus."""
+    lowered = content.casefold()
+    position = -1
+    for word in re.findall(r'\w{3,}', query.casefold()):
+        position = lowered.find(word)
+        if position >= 0:
+            break
+    start = max(0, position - SNIPPET_CHARS // 4) if position > 0 else 0
+    snippet = ' '.join(content[start:start + SNIPPET_CHARS].split())
+    return ('…' if start else '') + snippet + ('…' if start + SNIPPET_CHARS < len(content) else '')
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prüft die Kaltstartzeit des Dokument-Parsers.
+
+Startet document_parser.py mit `python -X importtime` auf einer kleinen
+Textdatei im Abschnittsmodus und wertet die Importzeiten aus. Das Skript
+schlägt fehl (Exit-Code 1), wenn
+
+  * eines der schweren Pakete (requests, bs4, PyPDF2) geladen wurde, obwohl
+    für eine Textdatei keines davon benötigt wird, oder
+  * die vom Parser verursachte Importzeit (ohne die Module, die schon der
+    nackte Interpreter lädt) bzw. die Laufzeit das Budget überschreitet.
+
+Aufruf:
+    python3 parsers/startup_check.py [--import-budget-ms 40] [--wall-budget-ms 400]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Tuple
+
+PARSER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'document_parser.py')
+
+# Pakete, die für den Textpfad nicht geladen werden dürfen
+HEAVY_MODULES = ['requests', 'bs4', 'PyPDF2']
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Liest die Ausgabe von -X importtime.
+
+    Args:
+        stderr: Die stderr-Ausgabe des Prozesses
+
+    Returns:
+        Eine Liste von (Modul, eigene Zeit in µs, kumulierte Zeit in µs) für
+        Module der obersten Ebene
+    """
+    imports = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        # Eingerückte Module sind bereits in der kumulierten Zeit ihres Elternmoduls enthalten
+        if len(match.group(3)) > 1:
+            continue
+        imports.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return imports
+
+
+def _run_importtime(args: List[str]) -> Tuple[subprocess.CompletedProcess, float]:
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime'] + args, capture_output=True, text=True)
+    return completed, (time.perf_counter() - started) * 1000
+
+
+def measure(runs: int = 3) -> Dict:
+    """
+    Misst den Kaltstart des Parsers im Abschnittsmodus.
+
+    Args:
+        runs: Anzahl der Messläufe; gemeldet wird der schnellste Lauf
+
+    Returns:
+        Ein Dictionary mit Importzeit, Laufzeit und geladenen schweren Modulen
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as sample:
+        sample.write('§ 1. Allgemeines\nText des ersten Paragraphen.\n§ 2. Geltungsbereich\nWeiterer Text.\n')
+        sample_path = sample.name
+
+    # Module, die schon der nackte Interpreter lädt (site, encodings, ...), zählen nicht zum Parser
+    bare, _ = _run_importtime(['-c', 'pass'])
+    interpreter_modules = {name for name, _, _ in parse_importtime(bare.stderr)}
+
+    best = None
+    try:
+        for _ in range(max(1, runs)):
+            completed, wall_ms = _run_importtime([PARSER_SCRIPT, sample_path, '--mode=sections'])
+            if completed.returncode != 0:
+                raise RuntimeError(f'Parser ist fehlgeschlagen: {completed.stderr[-2000:]}')
+
+            imports = [item for item in parse_importtime(completed.stderr) if item[0] not in interpreter_modules]
+            loaded = {name.split('.')[0] for name, _, _ in imports}
+            run = {
+                'wall_ms': round(wall_ms, 1),
+                'import_ms': round(sum(cumulative for _, _, cumulative in imports) / 1000, 1),
+                'heavy_modules': [name for name in HEAVY_MODULES if name in loaded],
+                'slowest_imports': [
+                    {'module': name, 'ms': round(cumulative / 1000, 1)}
+                    for name, _, cumulative in sorted(imports, key=lambda item: -item[2])[:5]
+                ]
+            }
+            if best is None or run['wall_ms'] < best['wall_ms']:
+                best = run
+    finally:
+        os.unlink(sample_path)
+
+    return best
+
+
+def main():
+    """Führt die Messung aus und vergleicht sie mit dem Budget."""
+    parser = argparse.ArgumentParser(description='Kaltstart-Budget des Dokument-Parsers prüfen')
+    parser.add_argument('--import-budget-ms', type=float, default=40.0,
+                        help='Maximale vom Parser verursachte Importzeit in Millisekunden')
+    parser.add_argument('--wall-budget-ms', type=float, default=400.0,
+                        help='Maximale Laufzeit des Prozesses in Millisekunden')
+    parser.add_argument('--runs', type=int, default=3, help='Anzahl der Messläufe')
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    problems = []
+    if report['heavy_modules']:
+        problems.append('Schwere Module im Textpfad geladen: ' + ', '.join(report['heavy_modules']))
+    if report['import_ms'] > args.import_budget_ms:
+        problems.append(f"Importzeit {report['import_ms']} ms über Budget {args.import_budget_ms} ms")
+    if report['wall_ms'] > args.wall_budget_ms:
+        problems.append(f"Laufzeit {report['wall_ms']} ms über Budget {args.wall_budget_ms} ms")
+
+    report['success'] = not problems
+    report['problems'] = problems
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    sys.exit(0 if report['success'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Überwachte Ausführung des Dokument-Parsers in Worker-Prozessen.
+
+Jedes Dokument wird in einem Worker-Prozess geparst, den der aufrufende
+Prozess überwacht. Ein fehlerhaftes Dokument, bei dem PyPDF2 in einer
+Schleife hängt oder sehr viel Speicher belegt, trifft damit nur den Worker:
+
+- Zeitlimit: Liefert der Worker nicht rechtzeitig ein Ergebnis, wird er beendet.
+- Speicherlimit: RLIMIT_AS begrenzt den Adressraum, den ein Dokument zusätzlich
+  belegen darf; Allokationen darüber schlagen mit MemoryError fehl.
+- CPU-Limit: RLIMIT_CPU begrenzt die CPU-Zeit je Dokument; beim Überschreiten
+  beendet der Kernel den Worker (SIGXCPU), auch wenn der Aufrufer selbst hängt.
+- Recycling: Nach max_documents Dokumenten oder wenn der Spitzenspeicher des
+  Workers um mehr als max_growth_mb gewachsen ist, wird er ersetzt.
+
+Wird ein Limit erreicht, ist das Ergebnis ein Fehler-Dictionary, das das
+Limit benennt:
+
+    {"success": false, "error": "Zeitlimit von 60 s überschritten",
+     "limit": "timeout", "limit_value": 60}
+
+SupervisedParser kann überall anstelle eines DocumentParser verwendet werden
+(Server, Batch, Suchindex); nur process() und process_with_stats() laufen im
+Worker, alle anderen Methoden im eigenen Prozess.
+"""
+
+import os
+import sys
+import math
+import queue
+import signal
+import threading
+import traceback
+import multiprocessing
+from typing import Callable, Dict, Optional
+
+# Standardwerte, müssen unter dem Socket-Timeout von includes/document_importer.php (120 s) liegen
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MEMORY_LIMIT_MB = 1024
+DEFAULT_MAX_DOCUMENTS = 100
+DEFAULT_MAX_GROWTH_MB = 256
+
+# Zeit, die ein Worker zum Starten bzw. geordneten Beenden erhält
+_START_TIMEOUT = 30.0
+_STOP_TIMEOUT = 2.0
+
+# Methoden des DocumentParser, die im Worker ausgeführt werden
+SUPERVISED_METHODS = ('process', 'process_with_stats')
+
+
+def _address_space() -> Optional[int]:
+    """Aktuelle Größe des Adressraums in Bytes (nur unter Linux verfügbar)."""
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_kb() -> int:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS meldet Bytes, Linux Kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _is_memory_error(result) -> bool:
+    # Die parse_*-Methoden fangen Ausnahmen selbst ab; ein MemoryError kommt daher als Fehler-Dictionary an
+    if isinstance(result, tuple):
+        result = result[0]
+    return isinstance(result, dict) and result.get('success') is False and \
+        (result.get('traceback') or '').rstrip().endswith('MemoryError')
+
+
+def _worker_main(connection, make_parser: Callable, memory_limit: Optional[int], cpu_seconds: Optional[float]):
+    """
+    Hauptschleife eines Worker-Prozesses.
+
+    Empfängt (Methode, args, kwargs) und antwortet mit (Status, Wert, Spitzenspeicher in KB).
+    None beendet den Worker. Nach einem MemoryError beendet sich der Worker selbst,
+    da sein Zustand nicht mehr verlässlich ist.
+    """
+    import resource
+
+    # Abbruch per Strg+C übernimmt der überwachende Prozess
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    doc_parser = make_parser()
+    if memory_limit:
+        # Das Limit gilt zusätzlich zum Adressraum nach dem Start (Interpreter, Module, geerbte Seiten)
+        limit = (_address_space() or 0) + memory_limit
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    connection.send(('ready', None, _peak_rss_kb()))
+
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+
+        method, args, kwargs = request
+        if cpu_seconds:
+            # RLIMIT_CPU zählt die gesamte Laufzeit des Prozesses, daher je Dokument neu setzen
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+
+        try:
+            value = getattr(doc_parser, method)(*args, **kwargs)
+            status = 'memory' if _is_memory_error(value) else 'ok'
+        except MemoryError:
+            value = None
+            status = 'memory'
+        except Exception as e:
+            value = {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+            status = 'ok'
+
+        try:
+            connection.send((status, value if status == 'ok' else None, _peak_rss_kb()))
+        except MemoryError:
+            connection.send(('memory', None, _peak_rss_kb()))
+            return
+        if status == 'memory':
+            return
+
+
+def limit_error(limit: str, value, message: str) -> Dict:
+    """
+    Erzeugt das Ergebnis für ein überschrittenes Limit.
+
+    Args:
+        limit: 'timeout', 'memory' oder 'cpu'
+        value: Der Grenzwert (Sekunden bzw. MB)
+        message: Die Fehlermeldung
+
+    Returns:
+        Ein Fehler-Dictionary mit 'limit' und 'limit_value'
+    """
+    return {
+        'success': False,
+        'error': message,
+        'limit': limit,
+        'limit_value': value
+    }
+
+
+class _Worker:
+    """Ein Worker-Prozess mit der Verbindung zum überwachenden Prozess."""
+
+    def __init__(self, context, make_parser: Callable, memory_limit: Optional[int], cpu_seconds: Optional[float]):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, daemon=True,
+                                       args=(child_connection, make_parser, memory_limit, cpu_seconds))
+        self.process.start()
+        child_connection.close()
+        self.documents = 0
+        self.baseline_kb = None
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Wartet auf die Startmeldung und merkt sich den Speicherbedarf nach dem Start."""
+        try:
+            if not self.connection.poll(timeout):
+                return False
+            status, _, peak_kb = self.connection.recv()
+        except (EOFError, OSError):
+            return False
+        self.baseline_kb = peak_kb
+        return status == 'ready'
+
+    def stop(self):
+        """Beendet den Worker geordnet, notfalls mit SIGKILL."""
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(_STOP_TIMEOUT)
+        self.kill()
+
+    def kill(self):
+        """Beendet den Worker sofort."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class SupervisedParser:
+    """Führt process()/process_with_stats() eines DocumentParser in überwachten Worker-Prozessen aus."""
+
+    def __init__(self, make_parser: Callable, workers: int = 1, timeout: float = DEFAULT_TIMEOUT,
+                 memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB, cpu_seconds: Optional[float] = None,
+                 max_documents: int = DEFAULT_MAX_DOCUMENTS, max_growth_mb: int = DEFAULT_MAX_GROWTH_MB):
+        """
+        Initialisiert den Pool; Worker werden erst bei Bedarf gestartet.
+
+        Args:
+            make_parser: Aufrufbares Objekt ohne Argumente, das einen DocumentParser erzeugt
+                (muss picklebar sein, z.B. functools.partial)
+            workers: Anzahl der Worker, also der gleichzeitig geparsten Dokumente
+            timeout: Zeitlimit je Dokument in Sekunden
+            memory_limit_mb: Zusätzlicher Adressraum je Worker in MB (None = unbegrenzt)
+            cpu_seconds: CPU-Zeit je Dokument in Sekunden (None = wie timeout, 0 = unbegrenzt)
+            max_documents: Anzahl der Dokumente, nach denen ein Worker ersetzt wird
+            max_growth_mb: Wachstum des Spitzenspeichers in MB, ab dem ein Worker ersetzt wird
+        """
+        self.make_parser = make_parser
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_seconds = timeout if cpu_seconds is None else cpu_seconds
+        self.max_documents = max_documents
+        self.max_growth_mb = max_growth_mb
+        self.recycled = 0
+        # forkserver startet Worker aus einem schlanken Prozess; fork aus einem Server mit Threads ist unsicher
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        # Freie Plätze des Pools; None steht für einen noch nicht gestarteten Worker
+        self._slots = queue.LifoQueue()
+        for _ in range(max(1, workers)):
+            self._slots.put(None)
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._local_parser = None
+
+    def __getattr__(self, name: str):
+        # Alle übrigen Methoden (extract_sections, iter_records, ...) laufen im eigenen Prozess
+        if name.startswith('_'):
+            raise AttributeError(name)
+        with self._lock:
+            if self._local_parser is None:
+                self._local_parser = self.make_parser()
+        return getattr(self._local_parser, name)
+
+    def process(self, input_path: str, mode: str = 'text', **options):
+        """Wie DocumentParser.process(), im Worker mit Zeit-, Speicher- und CPU-Limit."""
+        return self._call('process', (input_path, mode), options)
+
+    def process_with_stats(self, input_path: str, mode: str = 'text', trace_memory: bool = False, **options):
+        """
+        Wie DocumentParser.process_with_stats(), im Worker.
+
+        Returns:
+            Ein Tupel (Ergebnis, Stats); bei einem überschrittenen Limit ist Stats None
+        """
+        result = self._call('process_with_stats', (input_path, mode, trace_memory), options)
+        return result if isinstance(result, tuple) else (result, None)
+
+    def _call(self, method: str, args: tuple, kwargs: Dict):
+        # Ein Prozesspool für PDF-Seiten im Worker entzöge sich Zeitlimit und Recycling
+        kwargs.pop('workers', None)
+        worker = self._slots.get()
+        try:
+            if worker is None:
+                worker = self._start_worker()
+            result, keep = self._run(worker, method, args, kwargs)
+            if keep and self._exhausted(worker):
+                self.recycled += 1
+                keep = False
+            if not keep:
+                self._retire(worker)
+                worker = None
+            return result
+        except BaseException:
+            if worker is not None:
+                self._retire(worker, kill=True)
+                worker = None
+            raise
+        finally:
+            self._slots.put(worker)
+
+    def _start_worker(self) -> _Worker:
+        memory_limit = self.memory_limit_mb * 1024 * 1024 if self.memory_limit_mb else None
+        worker = _Worker(self._context, self.make_parser, memory_limit, self.cpu_seconds or None)
+        with self._lock:
+            self._workers.add(worker)
+        if not worker.wait_ready(_START_TIMEOUT):
+            self._retire(worker, kill=True)
+            raise RuntimeError('Der Worker-Prozess des Parsers konnte nicht gestartet werden.')
+        return worker
+
+    def _run(self, worker: _Worker, method: str, args: tuple, kwargs: Dict):
+        """Führt einen Aufruf im Worker aus; liefert (Ergebnis, Worker weiterverwenden)."""
+        worker.documents += 1
+        try:
+            worker.connection.send((method, args, kwargs))
+            if not worker.connection.poll(self.timeout):
+                worker.kill()
+                return limit_error('timeout', self.timeout,
+                                   f'Zeitlimit von {self.timeout:g} s beim Parsen überschritten'), False
+            status, value, peak_kb = worker.connection.recv()
+        except (EOFError, OSError):
+            return self._crash_result(worker), False
+
+        worker.peak_kb = peak_kb
+        if status == 'memory':
+            return limit_error('memory', self.memory_limit_mb,
+                               f'Speicherlimit von {self.memory_limit_mb} MB beim Parsen überschritten'), False
+        return value, True
+
+    def _crash_result(self, worker: _Worker) -> Dict:
+        """Ermittelt aus dem Exit-Status eines beendeten Workers das Ergebnis."""
+        worker.process.join(_STOP_TIMEOUT)
+        exitcode = worker.process.exitcode
+        if exitcode == -signal.SIGXCPU:
+            return limit_error('cpu', self.cpu_seconds, f'CPU-Limit von {self.cpu_seconds:g} s beim Parsen überschritten')
+        if exitcode == -signal.SIGKILL and self.memory_limit_mb:
+            # Ohne eigenes Zutun beendet, in der Regel durch den OOM-Killer des Kernels
+            return limit_error('memory', self.memory_limit_mb, 'Der Worker-Prozess wurde wegen Speichermangels beendet')
+        return {
+            'success': False,
+            'error': f'Der Worker-Prozess des Parsers wurde unerwartet beendet (Exit-Code {exitcode})'
+        }
+
+    def _exhausted(self, worker: _Worker) -> bool:
+        """Prüft, ob ein Worker ersetzt werden soll (Anzahl der Dokumente oder Speicherwachstum)."""
+        if worker.documents >= self.max_documents:
+            return True
+        growth_kb = getattr(worker, 'peak_kb', 0) - (worker.baseline_kb or 0)
+        return bool(self.max_growth_mb) and growth_kb > self.max_growth_mb * 1024
+
+    def _retire(self, worker: _Worker, kill: bool = False):
+        with self._lock:
+            self._workers.discard(worker)
+        if kill or not worker.process.is_alive():
+            worker.kill()
+        else:
+            worker.stop()
+
+    def close(self):
+        """Beendet alle Worker."""
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+Referenz: der textbasierte Katalog-Extraktor vor dem Tokenizer (Stand der Ausgangsversion).
+
+Unverändert aus DocumentParser.extract_fine_catalog() bzw. _parse_range() übernommen,
+nur als Funktionen ohne Klasse. Die Tests vergleichen den Tokenizer damit.
+"""
+
+import re
+from typing import Dict, List
+
+
+def parse_range(value: str, as_int: bool = False):
+    """Zerlegt einen Wert (optional mit Range) in min/max."""
+    v = (value or '').strip()
+    if not v:
+        return 0, 0
+
+    normalized = v.replace('€', '').replace('$', '')
+    match = re.search(r'(\d+(?:[.,]\d+)?)(?:\s*(?:-|–|bis|to|bis zu)\s*(\d+(?:[.,]\d+)?))?', normalized, flags=re.IGNORECASE)
+    if not match:
+        return 0, 0
+
+    first = match.group(1)
+    second = match.group(2) if match.group(2) is not None else match.group(1)
+
+    min_val = float(first.replace(',', '.'))
+    max_val = float(second.replace(',', '.'))
+
+    if as_int:
+        min_val = int(round(min_val))
+        max_val = int(round(max_val))
+
+    return min_val, max_val
+
+
+def extract_fine_catalog(text: str) -> List[Dict]:
+    """Textpfad von extract_fine_catalog() in der Ausgangsversion (ohne HTML-Tabellen)."""
+    violations = re.findall(r'(?:Verstoß|Delikt|Tat):\s*([^\n]+)', text)
+    amounts = re.findall(r'(?:Bußgeld|Strafe|Geldstrafe):\s*(\d+(?:[.,]\d+)?)', text)
+    amount_ranges = re.findall(r'(?:Bußgeld|Strafe|Geldstrafe)?\s*:?\s*(\d+(?:[.,]\d+)?)\s*(?:-|–|bis|to)\s*(\d+(?:[.,]\d+)?)', text, flags=re.IGNORECASE)
+    prison_days = re.findall(r'(?:Haftzeit|Gefängnis|Freiheitsstrafe):\s*([\d\-–bis\s.,]+)', text)
+    categories = re.findall(r'(?:Kategorie|Bereich):\s*([^\n]+)', text)
+    notes = re.findall(r'(?:Notizen|Anmerkungen|Hinweise):\s*([^\n]+)', text)
+    community_services = re.findall(r'(?:Strafarbeit|Community Service|Dienststunden|Arbeitsstunden):\s*([\d\-–bis\s.,]+)', text, flags=re.IGNORECASE)
+
+    max_entries = max(
+        len(violations),
+        len(amounts),
+        len(amount_ranges),
+        len(prison_days),
+        len(categories),
+        len(community_services)
+    )
+
+    if max_entries == 0:
+        lines = text.split('\n')
+        fallback_entries = []
+        for line in lines:
+            if ('§' in line or 'Paragraph' in line) and (re.search(r'\$\d+', line) or re.search(r'\d+\s*Euro', line)):
+                match_offense = re.search(r'§\s*\d+\s*(.+?)(?:\$|\d+\s*Euro|$)', line)
+                match_amount = re.search(r'[\$€](\d+(?:[.,]\d+)?)', line)
+                match_prison = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:-|–|bis)\s*(\d+(?:[.,]\d+)?)', line)
+                match_prison_single = re.search(r'(\d+)\s*(?:Tage|Tagen|Tag)', line)
+                match_range = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:-|–|bis)\s*(\d+(?:[.,]\d+)?)', line)
+                match_cs = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:Stunden|Std|h)', line, flags=re.IGNORECASE)
+
+                prison_min = prison_max = 0
+                if match_prison:
+                    prison_min = int(float(match_prison.group(1).replace(',', '.')))
+                    prison_max = int(float(match_prison.group(2).replace(',', '.')))
+                elif match_prison_single:
+                    prison_min = prison_max = int(match_prison_single.group(1))
+
+                entry = {
+                    'category': 'Allgemein',
+                    'violation': match_offense.group(1).strip() if match_offense else line,
+                    'amount': float(match_amount.group(1).replace(',', '.')) if match_amount else float(match_range.group(2).replace(',', '.')) if match_range else 0,
+                    'amount_min': float(match_range.group(1).replace(',', '.')) if match_range else float(match_amount.group(1).replace(',', '.')) if match_amount else 0,
+                    'amount_max': float(match_range.group(2).replace(',', '.')) if match_range else float(match_amount.group(1).replace(',', '.')) if match_amount else 0,
+                    'prison_days': prison_max or prison_min,
+                    'prison_days_min': prison_min,
+                    'prison_days_max': prison_max or prison_min,
+                    'community_service_hours': int(float(match_cs.group(1).replace(',', '.'))) if match_cs else 0,
+                    'community_service_hours_min': int(float(match_cs.group(1).replace(',', '.'))) if match_cs else 0,
+                    'community_service_hours_max': int(float(match_cs.group(1).replace(',', '.'))) if match_cs else 0,
+                    'description': line.strip(),
+                    'notes': ''
+                }
+                fallback_entries.append(entry)
+
+        return fallback_entries
+
+    catalog = []
+    for i in range(max_entries):
+        entry = {}
+
+        if i < len(categories):
+            entry['category'] = categories[i].strip()
+        else:
+            entry['category'] = 'Allgemein'
+
+        if i < len(violations):
+            entry['violation'] = violations[i].strip()
+        else:
+            entry['violation'] = f'Unbekannter Verstoß {i+1}'
+
+        amount_value = amount_min = amount_max = 0.0
+        if i < len(amount_ranges):
+            try:
+                amount_min = float(amount_ranges[i][0].replace(',', '.'))
+                amount_max = float(amount_ranges[i][1].replace(',', '.'))
+                amount_value = amount_max or amount_min
+            except (ValueError, IndexError):
+                pass
+        elif i < len(amounts):
+            try:
+                amount_value = amount_min = amount_max = float(amounts[i].replace(',', '.'))
+            except ValueError:
+                pass
+        entry['amount'] = amount_value
+        entry['amount_min'] = amount_min
+        entry['amount_max'] = amount_max
+
+        prison_min = prison_max = 0
+        if i < len(prison_days):
+            prison_min, prison_max = parse_range(prison_days[i], as_int=True)
+        entry['prison_days'] = prison_max or prison_min
+        entry['prison_days_min'] = prison_min
+        entry['prison_days_max'] = prison_max or prison_min
+
+        cs_min = cs_max = 0
+        if i < len(community_services):
+            cs_min, cs_max = parse_range(community_services[i], as_int=True)
+        entry['community_service_hours'] = cs_max or cs_min
+        entry['community_service_hours_min'] = cs_min
+        entry['community_service_hours_max'] = cs_max or cs_min
+
+        entry['description'] = entry['violation']
+
+        if i < len(notes):
+            entry['notes'] = notes[i].strip()
+        else:
+            entry['notes'] = ''
+
+        catalog.append(entry)
+
+    return catalog
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+"""Gemeinsame Einstellungen der Parser-Tests: Die Module liegen direkt in parsers/."""
+
+import os
+import sys
+
+PARSERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PARSERS_DIR not in sys.path:
+    sys.path.insert(0, PARSERS_DIR)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für den Abgleich geparster Katalogeinträge mit dem bestehenden Katalog."""
+
+import json
+
+from catalog_diff import apply_catalog_diff, diff_catalog
+
+EXISTING = [
+    {'id': 1, 'category': 'A', 'violation': 'Sonstiges', 'amount': 100},
+    {'id': 2, 'category': 'B', 'violation': 'Sonstiges', 'amount': 200},
+]
+
+
+def test_reordered_categories_are_unchanged():
+    parsed = [
+        {'category': 'B', 'violation': 'Sonstiges', 'amount': 200},
+        {'category': 'A', 'violation': 'Sonstiges', 'amount': 100},
+    ]
+    diff = diff_catalog(EXISTING, parsed)
+
+    assert (len(diff['added']), len(diff['changed']), len(diff['removed']), diff['unchanged']) == (0, 0, 0, 2)
+
+
+def test_renamed_category_is_a_change():
+    parsed = [
+        {'category': 'A (neu)', 'violation': 'Sonstiges', 'amount': 100},
+        {'category': 'B', 'violation': 'Sonstiges', 'amount': 200},
+    ]
+    diff = diff_catalog(EXISTING, parsed)
+
+    assert [change['id'] for change in diff['changed']] == [1]
+    assert diff['changed'][0]['entry']['category'] == 'A (neu)'
+    assert (len(diff['added']), len(diff['removed']), diff['unchanged']) == (0, 0, 1)
+
+
+def test_apply_keeps_ids_in_their_category(tmp_path):
+    catalog_path = tmp_path / 'fine_catalog.json'
+    catalog_path.write_text(json.dumps(EXISTING), encoding='utf-8')
+    parsed = [
+        {'category': 'B', 'violation': 'Sonstiges', 'amount': 250},
+        {'category': 'A', 'violation': 'Sonstiges', 'amount': 100},
+    ]
+    diff = apply_catalog_diff(str(catalog_path), parsed)
+
+    assert diff['applied'] and [change['id'] for change in diff['changed']] == [2]
+    catalog = {entry['id']: entry for entry in json.loads(catalog_path.read_text(encoding='utf-8'))}
+    assert (catalog[1]['category'], catalog[1]['amount']) == ('A', 100.0)
+    assert (catalog[2]['category'], catalog[2]['amount']) == ('B', 250.0)
+
+
+def test_fallback_does_not_take_entries_of_other_categories():
+    existing = [
+        {'id': 1, 'category': 'Verkehr', 'violation': 'Sonstiges', 'amount': 100},
+        {'id': 2, 'category': 'Waffen', 'violation': 'Besitz', 'amount': 500},
+        {'id': 3, 'category': 'Waffen', 'violation': 'Handel', 'amount': 900},
+    ]
+    # 'Verkehr' kommt im Dokument noch vor; 'Waffen' verteilt sich auf zwei Kategorien
+    parsed = [
+        {'category': 'Verkehr', 'violation': 'Rotlicht', 'amount': 50},
+        {'category': 'Straßenverkehr', 'violation': 'Sonstiges', 'amount': 100},
+        {'category': 'Drogen', 'violation': 'Besitz', 'amount': 300},
+        {'category': 'Schmuggel', 'violation': 'Handel', 'amount': 900},
+    ]
+    diff = diff_catalog(existing, parsed)
+
+    assert diff['changed'] == []
+    assert [entry['violation'] for entry in diff['added']] == ['Rotlicht', 'Sonstiges', 'Besitz', 'Handel']
+
+
+def test_fallback_needs_a_unique_violation():
+    existing = [
+        {'id': 1, 'category': 'Alt', 'violation': 'Sonstiges', 'amount': 100},
+        {'id': 2, 'category': 'Alt', 'violation': 'Sonstiges', 'amount': 200},
+    ]
+    parsed = [{'category': 'Neu', 'violation': 'Sonstiges', 'amount': 100}]
+    diff = diff_catalog(existing, parsed)
+
+    assert diff['changed'] == [] and len(diff['added']) == 1
+
+
+def test_apply_normalizes_existing_entries(tmp_path):
+    catalog_path = tmp_path / 'fine_catalog.json'
+    existing = [
+        {'id': 1, 'category': 'A', 'violation': 'Alt', 'amount': '75', 'source': 'manuell'},
+        {'id': 2, 'category': 'A', 'violation': 'Sonstiges', 'amount': 100},
+    ]
+    catalog_path.write_text(json.dumps(existing), encoding='utf-8')
+    diff = apply_catalog_diff(str(catalog_path), [{'category': 'A', 'violation': 'Sonstiges', 'amount': 120}])
+
+    assert diff['applied'] and diff['removed'][0]['id'] == 1
+    catalog = {entry['id']: entry for entry in json.loads(catalog_path.read_text(encoding='utf-8'))}
+    assert catalog[1]['source'] == 'manuell'
+    assert (catalog[1]['amount'], catalog[1]['amount_min'], catalog[1]['amount_max']) == (75.0, 75.0, 75.0)
+    assert (catalog[1]['prison_days_min'], catalog[1]['community_service_hours']) == (0, 0)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für das Einlesen der Anfragen des Strafrechners."""
+
+import io
+import json
+
+import pytest
+
+from fine_catalog import FineCatalog, _read_queries, query_violations, run_calculator
+from output_writer import OutputWriter
+
+
+@pytest.fixture
+def catalog():
+    return FineCatalog.from_entries([
+        {'violation': 'Mord', 'amount': 100},
+        {'violation': 'M', 'amount': 5},
+        {'violation': 'o', 'amount': 7},
+    ])
+
+
+def test_single_violation_is_not_split_into_characters(catalog):
+    queries = list(_read_queries(['"Mord"', '{"id": "a", "violations": "Mord"}']))
+    assert queries == [(1, ['Mord'], None), ('a', ['Mord'], None)]
+
+    sums = catalog.calculate_many([violations for _, violations, _ in queries])
+    assert sums['amount_max'] == [100.0, 100.0]
+    assert sums['unknown'] == [[], []]
+
+
+def test_other_types_yield_error_records():
+    queries = list(_read_queries(['42', '{"violations": {"Mord": 1}}', '["Mord", 3]', '{"id": 7}']))
+
+    assert [(query_id, error is not None) for query_id, _, error in queries] == \
+        [(1, True), (2, True), (3, True), (7, False)]
+    assert queries[3][1] == []
+
+
+def test_query_violations_accepts_lists():
+    assert query_violations(['Mord', 'M']) == ['Mord', 'M']
+    with pytest.raises(ValueError):
+        query_violations(('Mord',))
+
+
+def test_invalid_json_yields_an_error_record_and_continues(catalog):
+    out = io.BytesIO()
+    exit_code = run_calculator(catalog, OutputWriter(out, 'ndjson'), lines=['["Mord"', '["Mord", "M"]'],
+                               batch_size=1)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert exit_code == 1
+    assert (records[0]['id'], records[0]['success']) == (1, False)
+    assert (records[1]['id'], records[1]['amount_max']) == (2, 105.0)
+
+
+def test_sums_keep_the_column_type(catalog):
+    result = catalog.calculate([])
+    assert (result['amount_min'], result['prison_days_min']) == (0.0, 0)
+    assert isinstance(result['amount_min'], float) and isinstance(result['prison_days_min'], int)
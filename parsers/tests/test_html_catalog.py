@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""Regressionstest: Katalog-Modus für attached_assets/Bußgeldkatalog.html."""
+
+import os
+import json
+
+import pytest
+
+from document_parser import DocumentParser
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FIXTURE = os.path.join(REPO_DIR, 'attached_assets', 'Bußgeldkatalog.html')
+EXPECTED = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'bussgeldkatalog.expected.json')
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    pytest.importorskip('bs4')
+    return DocumentParser().process(FIXTURE, 'catalog')
+
+
+def test_catalog_matches_expected_entries(catalog):
+    with open(EXPECTED, 'r', encoding='utf-8') as file:
+        expected = json.load(file)
+
+    assert catalog == expected
+
+
+def test_thousands_separator(catalog):
+    entries = {entry['violation']: entry for entry in catalog}
+
+    # "$1.000,00" in der Tabelle
+    assert entries['§1 Mord']['amount'] == 1000.0
+    assert entries['§10 Bankraub']['amount_max'] == 1000.0
+    assert entries['§27 Behinderung von Ermittlungsverfahren']['amount'] == 10.0
+
+
+def test_category_carries_forward(catalog):
+    # Die Überschriftenzeile "I. Vergehen an Personen" gilt für alle folgenden Zeilen
+    assert catalog[0]['category'] == 'Allgemein'
+    assert {entry['category'] for entry in catalog[1:]} == {'I. Vergehen an Personen'}
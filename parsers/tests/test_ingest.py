@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für die Benennung der Ergebnisse im Ausgangsordner des Ingest."""
+
+import json
+
+from ingest import Ingest
+
+
+class _FakeParser:
+    def process(self, path, mode, **options):
+        if 'kaputt' in path:
+            return {'success': False, 'error': 'kaputt'}
+        return {'success': True, 'mode': mode}
+
+
+def _ingest(tmp_path):
+    for mode in ('text', 'catalog'):
+        (tmp_path / 'inbox' / mode).mkdir(parents=True)
+    return Ingest(_FakeParser, str(tmp_path / 'inbox'), str(tmp_path / 'outbox'), str(tmp_path / 'quarantine'))
+
+
+def _run(ingest, path, mode):
+    name = ingest._name(str(path))
+    status = {'name': name, 'mode': mode}
+    failed = ingest._process(_FakeParser(), str(path), mode, status)
+    return name, failed
+
+
+def test_same_name_in_two_mode_folders_does_not_collide(tmp_path):
+    ingest = _ingest(tmp_path)
+    for mode in ('text', 'catalog'):
+        (tmp_path / 'inbox' / mode / 'akte.html').write_text('x', encoding='utf-8')
+    (tmp_path / 'inbox' / 'akte.html').write_text('x', encoding='utf-8')
+
+    names = [_run(ingest, tmp_path / 'inbox' / mode / 'akte.html', mode)[0] for mode in ('text', 'catalog')]
+    names.append(_run(ingest, tmp_path / 'inbox' / 'akte.html', 'text')[0])
+
+    assert names == ['text/akte.html', 'catalog/akte.html', 'akte.html']
+    outbox = tmp_path / 'outbox'
+    for name, mode in zip(names, ('text', 'catalog', 'text')):
+        status = json.loads((outbox / (name + '.status.json')).read_text(encoding='utf-8'))
+        assert (status['name'], status['state'], status['result']) == (name, 'done', name + '.json')
+        assert json.loads((outbox / (name + '.json')).read_text(encoding='utf-8'))['mode'] == mode
+
+
+def test_quarantine_mirrors_the_mode_folder(tmp_path):
+    ingest = _ingest(tmp_path)
+    path = tmp_path / 'inbox' / 'catalog' / 'kaputt.html'
+    path.write_text('x', encoding='utf-8')
+
+    name, failed = _run(ingest, path, 'catalog')
+
+    status = json.loads((tmp_path / 'outbox' / 'catalog' / 'kaputt.html.status.json').read_text(encoding='utf-8'))
+    assert failed and status['quarantined'] == 'catalog/kaputt.html'
+    assert (tmp_path / 'quarantine' / 'catalog' / 'kaputt.html').exists()
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für die NDJSON-Ausgabe der Kommandozeile (--format=ndjson)."""
+
+import os
+import sys
+import json
+import subprocess
+
+PARSER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'document_parser.py')
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'bussgeldkatalog.txt')
+
+
+def _run(*args):
+    completed = subprocess.run([sys.executable, PARSER, '--no-cache', *args], capture_output=True, check=False)
+    return completed.returncode, completed.stdout.decode('utf-8')
+
+
+def test_ndjson_has_one_line_per_entry_of_the_json_list():
+    _, output = _run('--mode=catalog', FIXTURE)
+    exit_code, lines = _run('--mode=catalog', '--format=ndjson', FIXTURE)
+
+    assert exit_code == 0
+    assert [json.loads(line) for line in lines.splitlines()] == json.loads(output)
+
+
+def test_ndjson_reports_errors_as_a_record(tmp_path):
+    exit_code, lines = _run('--format=ndjson', str(tmp_path / 'fehlt.txt'))
+
+    [record] = [json.loads(line) for line in lines.splitlines()]
+    assert exit_code == 1
+    assert (record['success'], record['record']) == (False, 'error')
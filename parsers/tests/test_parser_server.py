@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für die Anfragebehandlung des Parser-Servers."""
+
+import json
+import threading
+
+import pytest
+
+from parser_server import MAX_SEARCH_LIMIT, RequestHandler
+
+
+class _BlockingParser:
+    """Parser-Attrappe, deren process() wartet, bis der Test sie freigibt."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def process(self, input_path, mode='text', **options):
+        self.started.set()
+        self.release.wait(10)
+        return {'success': True, 'content': 'Die Gebühren werden erhoben.'}
+
+    def extract_sections(self, text):
+        return []
+
+
+@pytest.mark.parametrize('limit', ['abc', 0, -1, 2.5, True, [3]])
+def test_search_rejects_invalid_limit(tmp_path, limit):
+    handler = RequestHandler(_BlockingParser())
+    line = json.dumps({'id': 1, 'action': 'search', 'query': 'x', 'limit': limit,
+                       'index': str(tmp_path / 'index.sqlite')})
+    response = json.loads(handler.handle_line(line))
+
+    assert response['success'] is False
+    assert response['id'] == 1
+
+
+def test_search_caps_limit(tmp_path, monkeypatch):
+    handler = RequestHandler(_BlockingParser())
+    seen = []
+    monkeypatch.setattr(handler, '_search', lambda index_path, query, limit: seen.append(limit) or {'success': True})
+    handler.handle({'action': 'search', 'query': 'x', 'limit': '100000'})
+
+    assert seen == [MAX_SEARCH_LIMIT]
+
+
+def test_search_does_not_wait_for_parsing(tmp_path):
+    doc_parser = _BlockingParser()
+    handler = RequestHandler(doc_parser)
+    index_path = str(tmp_path / 'index.sqlite')
+    document = tmp_path / 'gebuehren.txt'
+    document.write_text('Die Gebühren werden erhoben.', encoding='utf-8')
+
+    responses = []
+    indexing = threading.Thread(target=lambda: responses.append(
+        handler.handle({'action': 'index', 'input': str(document), 'index': index_path})))
+    indexing.start()
+    try:
+        assert doc_parser.started.wait(10)
+        searching = threading.Thread(target=lambda: responses.append(
+            handler.handle({'action': 'search', 'query': 'Gebühr', 'index': index_path})))
+        searching.start()
+        searching.join(5)
+        assert not searching.is_alive(), 'Suche wartet auf das Parsen'
+    finally:
+        doc_parser.release.set()
+        indexing.join(10)
+
+    search, index = responses
+    assert search['success'] and search['result']['total'] == 0
+    assert index['success'] and index['result']['sections'] == 1
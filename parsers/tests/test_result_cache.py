@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für die Größenbegrenzung des Ergebnis-Caches."""
+
+import os
+
+import result_cache
+from result_cache import ResultCache
+
+
+def _cache_size(cache):
+    return sum(os.path.getsize(path) for path in cache._entry_paths())
+
+
+def test_put_scans_the_directory_only_when_needed(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=10_000)
+    scans = []
+    entry_paths = cache._entry_paths
+    monkeypatch.setattr(cache, '_entry_paths', lambda: scans.append(1) or entry_paths())
+
+    for number in range(20):
+        cache.put(f'{number:02d}' + 'a' * 62, {'text': 'x' * 100})
+
+    # Nur das erste Schreiben bestimmt die Größe aus dem Verzeichnis
+    assert len(scans) == 1
+    assert cache._size == _cache_size(cache)
+
+
+def test_evicts_oldest_entries_down_to_the_low_water_mark(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=2_000)
+    keys = [f'{number:02d}' + 'b' * 62 for number in range(30)]
+    for number, key in enumerate(keys):
+        cache.put(key, {'text': 'x' * 100})
+        # Eindeutige mtimes für die LRU-Reihenfolge
+        os.utime(cache._path(key), (number, number))
+
+    size = _cache_size(cache)
+    assert size <= 2_000 and cache._size == size
+    assert cache.get(keys[0]) is None and cache.get(keys[-1]) is not None
+
+
+def test_replacing_an_entry_does_not_count_twice(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=10_000)
+    for _ in range(5):
+        cache.put('cc' + 'c' * 62, {'text': 'x' * 100})
+    assert cache._size == _cache_size(cache)
+
+
+def test_default_directory_is_per_user():
+    if not os.environ.get('DOC_PARSER_CACHE_DIR'):
+        assert os.path.basename(result_cache.DEFAULT_CACHE_DIR).endswith('-' + result_cache._user_suffix())
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für Tokenisierung und Suche des Volltextindex."""
+
+import pytest
+
+from search_index import SearchIndex, tokenize
+
+# Singular/Plural bzw. Grundform/flektierte Form, die denselben Stamm ergeben müssen
+WORD_PAIRS = [
+    ('Gebühr', 'Gebühren'),
+    ('Straße', 'Straßen'),
+    ('Verkehr', 'Verkehrs'),
+    ('Richter', 'Richtern'),
+    ('Gesetz', 'Gesetzes'),
+    ('Strafe', 'Strafen'),
+    ('Bußgeld', 'Bußgeldern'),
+    ('Fahrzeug', 'Fahrzeuge'),
+    ('Mensch', 'Menschen'),
+    ('Zeuge', 'Zeugen'),
+    ('Kind', 'Kindern'),
+    ('Klasse', 'Klassen'),
+]
+
+
+@pytest.mark.parametrize('singular,plural', WORD_PAIRS)
+def test_singular_and_plural_share_stem(singular, plural):
+    assert tokenize(singular) == tokenize(plural)
+
+
+def test_stem_keeps_distinct_words_apart():
+    # Ohne das Präfix "ge" abzuschneiden, bleiben Gericht und Richter verschieden
+    assert tokenize('Gericht') != tokenize('Richter')
+
+
+def test_tokenize_normalizes_paragraphs_and_stopwords():
+    assert tokenize('Die Gebühren nach § 12 StGB') == ['gebuehr', '§12', 'stgb']
+    assert tokenize('§12') == tokenize('§ 12')
+
+
+def test_search_finds_plural_for_singular_query(tmp_path):
+    with SearchIndex(str(tmp_path / 'index.sqlite')) as index:
+        index.add_document('gebuehren.txt', [
+            {'number': '1', 'title': 'Kosten', 'content': 'Die Gebühren werden nach der Anlage erhoben.'},
+            {'number': '2', 'title': 'Zuständigkeit', 'content': 'Zuständig ist das Gericht am Wohnort.'},
+        ])
+        result = index.search('Gebühr')
+
+    assert result['total'] == 1
+    assert result['hits'][0]['number'] == '1'
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""Tests für die Extraktion von Bußgeldkatalog-Einträgen aus Text."""
+
+import os
+import random
+
+import pytest
+
+import baseline_catalog
+from document_parser import DocumentParser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+_OFFENSES = ('Mord', 'Totschlag', 'Diebstahl', 'Betrug', 'Raub', 'Erpressung', 'Nötigung')
+_CATEGORIES = ('I. Vergehen an Personen', 'II. Eigentumsdelikte', 'III. Verkehrsdelikte')
+
+
+def _well_formed_catalog(seed: int) -> str:
+    """
+    Textkatalog, den auch der alte Extraktor richtig zuordnet: jeder Eintrag hat
+    alle Felder, und Beträge sind entweder alle Bereiche oder alle Einzelwerte.
+    """
+    rng = random.Random(seed)
+    ranges = rng.random() < 0.5
+    blocks = []
+    for number in range(1, rng.randint(2, 40)):
+        low = rng.randint(1, 500) * 10
+        amount = f'{low} - {low * 2}' if ranges else rng.choice([str(low), f'{low},50'])
+        blocks.append(
+            f'Kategorie: {rng.choice(_CATEGORIES)}\n'
+            f'{rng.choice(["Verstoß", "Delikt", "Tat"])}: §{number} {rng.choice(_OFFENSES)}\n'
+            f'{rng.choice(["Bußgeld", "Strafe", "Geldstrafe"])}: {amount}\n'
+            f'Haftzeit: {rng.randint(0, 60)} Tage\n'
+            f'Strafarbeit: {rng.randint(0, 20)} Stunden\n'
+            f'Notizen: Eintrag {number}\n'
+        )
+    return '\n'.join(blocks)
+
+
+def _read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def test_matches_baseline_on_fixture():
+    text = _read_fixture('bussgeldkatalog.txt')
+    catalog = DocumentParser().extract_fine_catalog(text)
+
+    assert len(catalog) == 38
+    assert catalog == baseline_catalog.extract_fine_catalog(text)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_matches_baseline_on_well_formed_catalogs(seed):
+    text = _well_formed_catalog(seed)
+    assert DocumentParser().extract_fine_catalog(text) == baseline_catalog.extract_fine_catalog(text)
+
+
+def test_matches_baseline_on_paragraph_lines():
+    text = ('§ 12 Diebstahl $250 10 Tage\n'
+            '§ 13 Betrug 300 Euro 5 Stunden\n'
+            'Einleitung ohne Betrag\n'
+            '§ 14 Raub $400,50 20 Tage\n')
+    assert DocumentParser().extract_fine_catalog(text) == baseline_catalog.extract_fine_catalog(text)
+
+
+def test_missing_field_does_not_shift_later_entries():
+    text = ('Kategorie: I. Vergehen an Personen\nVerstoß: §1 Mord\nHaftzeit: 60 Tage\n\n'
+            'Verstoß: §2 Totschlag\nBußgeld: 800\n')
+    catalog = DocumentParser().extract_fine_catalog(text)
+
+    assert [(entry['violation'], entry['amount'], entry['prison_days']) for entry in catalog] == [
+        ('§1 Mord', 0.0, 60),
+        ('§2 Totschlag', 800.0, 0),
+    ]
+
+
+# Bewusste Abweichungen vom alten Extraktor, siehe CHANGELOG.md
+
+CATALOG_TEXT = """Verstoß: §0 Vorab
+Bußgeld: 50
+
+Kategorie: I. Vergehen an Personen
+Verstoß: §1 Mord
+Bußgeld: $1.000,00
+Haftzeit: 60 Tage
+
+Verstoß: §2 Totschlag
+Bußgeld: 1.000,50
+
+Kategorie: II. Verkehr
+Verstoß: §3 Raserei
+Bußgeld: 150
+"""
+
+
+def test_category_carries_forward_to_following_entries():
+    catalog = DocumentParser().extract_fine_catalog(CATALOG_TEXT)
+
+    assert [(entry['category'], entry['violation']) for entry in catalog] == [
+        ('Allgemein', '§0 Vorab'),
+        ('I. Vergehen an Personen', '§1 Mord'),
+        ('I. Vergehen an Personen', '§2 Totschlag'),
+        ('II. Verkehr', '§3 Raserei'),
+    ]
+
+
+def test_thousands_separator():
+    catalog = DocumentParser().extract_fine_catalog(CATALOG_TEXT)
+
+    assert [entry['amount'] for entry in catalog] == [50.0, 1000.0, 1000.5, 150.0]
+    assert DocumentParser().extract_fine_catalog('§ 1 Mord $1.000,00 60 Tage')[0]['amount'] == 1000.0
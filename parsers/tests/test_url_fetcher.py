@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests für AsyncFetcher gegen lokale http.server-Instanzen.
+
+Zwei Server auf verschiedenen Ports gelten als verschiedene Hosts. Pfade:
+/flaky/<n> antwortet beim ersten Abruf mit 503 (Retry-After aus ?retry_after=),
+danach mit 200; /missing liefert 404; /always-503 liefert immer 503;
+/slow wartet kurz und zählt die gleichzeitig laufenden Abrufe.
+"""
+
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from url_fetcher import AsyncFetcher  # noqa: E402
+
+SLOW_SECONDS = 0.2
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        with server.lock:
+            server.hits[url.path] += 1
+            hits = server.hits[url.path]
+
+        if url.path.startswith('/flaky/') and hits == 1:
+            retry_after = parse_qs(url.query).get('retry_after', ['0'])[0]
+            self._reply(503, b'busy', {'Retry-After': retry_after})
+        elif url.path == '/always-503':
+            self._reply(503, b'busy', {'Retry-After': '0'})
+        elif url.path == '/missing':
+            self._reply(404, b'not found')
+        elif url.path.startswith('/slow'):
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(SLOW_SECONDS)
+            with server.lock:
+                server.active -= 1
+            self._reply(200, b'slow')
+        else:
+            self._reply(200, b'ok')
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits = Counter()
+    server.active = server.max_active = 0
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def hosts():
+    servers = [_start_server(), _start_server()]
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retries_503_once(hosts):
+    host = hosts[0]
+    with AsyncFetcher(retries=2, backoff=0.01) as fetcher:
+        [(url, response)] = fetcher.fetch_many([host.base_url + '/flaky/1'])
+
+    assert response.status_code == 200 and response.text == 'ok'
+    assert host.hits['/flaky/1'] == 2
+
+
+def test_retry_after_takes_precedence_over_backoff(hosts):
+    host = hosts[0]
+    started = time.monotonic()
+    with AsyncFetcher(retries=1, backoff=20) as fetcher:
+        [(url, response)] = fetcher.fetch_many([host.base_url + '/flaky/2?retry_after=1'])
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert 0.9 <= elapsed < 5
+
+
+def test_404_is_not_retried(hosts):
+    host = hosts[0]
+    with AsyncFetcher(retries=3, backoff=0.01) as fetcher:
+        [(url, error)] = fetcher.fetch_many([host.base_url + '/missing'])
+
+    assert isinstance(error, requests.HTTPError)
+    assert error.response.status_code == 404
+    assert host.hits['/missing'] == 1
+
+
+def test_gives_up_after_retries(hosts):
+    host = hosts[0]
+    with AsyncFetcher(retries=2, backoff=0.01) as fetcher:
+        [(url, error)] = fetcher.fetch_many([host.base_url + '/always-503'])
+
+    assert isinstance(error, requests.HTTPError)
+    assert host.hits['/always-503'] == 3
+
+
+def test_per_host_concurrency(hosts):
+    urls = [f'{host.base_url}/slow/{number}' for host in hosts for number in range(6)]
+    started = time.monotonic()
+    with AsyncFetcher(max_connections=8, per_host=2, retries=0) as fetcher:
+        results = fetcher.fetch_many(urls)
+    elapsed = time.monotonic() - started
+
+    assert [url for url, _ in results] == urls
+    assert all(response.status_code == 200 for _, response in results)
+    assert [host.max_active for host in hosts] == [2, 2]
+    # Je Host drei Runden zu zwei Abrufen; beide Hosts laufen parallel
+    assert elapsed < 6 * SLOW_SECONDS
+
+
+def test_iter_completed_yields_each_response_as_it_arrives(hosts):
+    host = hosts[0]
+    urls = [host.base_url + '/missing'] + [f'{host.base_url}/slow/{number}' for number in range(4)]
+    with AsyncFetcher(max_connections=8, per_host=8, retries=0) as fetcher:
+        results = list(fetcher.iter_completed(urls, window=2))
+
+    assert sorted(url for url, _ in results) == sorted(urls)
+    # Der schnelle Fehler kommt vor den langsamen Antworten
+    assert results[0][0] == host.base_url + '/missing' and isinstance(results[0][1], requests.HTTPError)
+    # Nie mehr als window Abrufe gleichzeitig
+    assert host.max_active <= 2
+
+
+def test_iter_completed_stops_when_the_caller_stops(hosts):
+    host = hosts[0]
+    urls = [f'{host.base_url}/slow/{number}' for number in range(20)]
+    with AsyncFetcher(max_connections=8, per_host=8, retries=0) as fetcher:
+        results = fetcher.iter_completed(urls, window=2)
+        next(results)
+        results.close()
+
+    # Nach dem Abbruch werden keine weiteren Abrufe gestartet
+    assert sum(host.hits.values()) <= 4
+
+
+def test_batch_parses_urls_while_they_load(hosts):
+    from functools import partial
+
+    from batch import iter_batch
+    from document_parser import DocumentParser
+
+    urls = [f'{host.base_url}/ok/{number}' for host in hosts for number in range(3)]
+    records = list(iter_batch(partial(DocumentParser), urls, 'text', jobs=1))
+
+    assert sorted(record['index'] for record in records) == list(range(len(urls)))
+    assert all(record['success'] for record in records)
+    assert sum(host.hits[f'/ok/{number}'] for host in hosts for number in range(3)) == len(urls)
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gebündeltes, asynchrones Laden von Webseiten für den Dokument-Parser.
+
+Alle Abrufe teilen sich eine requests.Session, deren Verbindungspool
+TCP- und TLS-Verbindungen zum selben Host wiederverwendet. Der AsyncFetcher
+lädt viele URLs gleichzeitig über asyncio; die blockierenden Aufrufe laufen
+in einem Thread-Pool. Die Parallelität ist global und pro Host begrenzt,
+vorübergehende Fehler (Verbindungsabbruch, Timeout, HTTP 429/5xx) werden mit
+exponentiellem Backoff wiederholt.
+
+StreamingDownload liest eine Antwort blockweise, dekodiert sie inkrementell
+und bricht bei Überschreiten einer Byte- oder Zeitgrenze ab, sodass eine
+große oder bösartige Seite den Speicher eines Import-Workers nicht füllt.
+
+    fetcher = AsyncFetcher(max_connections=16, per_host=4)
+    for url, response in fetcher.fetch_many(urls):
+        ...  # response ist eine requests.Response oder die aufgetretene Exception
+
+iter_completed() liefert die Antworten dagegen einzeln, sobald sie eintreffen;
+der Aufrufer kann so eine Seite parsen, während die übrigen noch laden.
+"""
+
+import time
+import queue
+import codecs
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Standardgrenzen für gleichzeitige Verbindungen (insgesamt bzw. pro Host)
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_PER_HOST = 4
+
+# Standard-Timeout eines Abrufs in Sekunden
+DEFAULT_TIMEOUT = 10
+
+# Anzahl der Antworten, die bei iter_completed() höchstens laden oder auf den Aufrufer warten
+DEFAULT_WINDOW = 64
+
+# HTTP-Statuscodes, bei denen ein erneuter Versuch sinnvoll ist
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Obergrenze für die Wartezeit zwischen zwei Versuchen in Sekunden
+MAX_BACKOFF = 30.0
+
+# Standardgrenzen und Blockgröße für gestreamte Downloads
+DEFAULT_MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+DEFAULT_MAX_DOWNLOAD_SECONDS = 60.0
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def create_session(pool_size: int = DEFAULT_MAX_CONNECTIONS) -> requests.Session:
+    """
+    Erzeugt eine Session, deren Verbindungspool für pool_size parallele Abrufe reicht.
+
+    Args:
+        pool_size: Maximale Anzahl offener Verbindungen pro Host
+
+    Returns:
+        Die neue Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def shared_session() -> requests.Session:
+    """Liefert die prozessweit gemeinsame Session für einzelne Abrufe."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+
+def fetch(url: str, session: Optional[requests.Session] = None, timeout: float = DEFAULT_TIMEOUT,
+          headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """
+    Lädt eine URL synchron über die gemeinsame Session.
+
+    Args:
+        url: Die zu ladende URL
+        session: Session (Standard: shared_session())
+        timeout: Timeout in Sekunden
+        headers: Zusätzliche Header (z.B. für bedingte Anfragen)
+
+    Returns:
+        Die Antwort (löst bei HTTP-Fehlern eine Exception aus)
+    """
+    response = (session or shared_session()).get(url, timeout=timeout, headers=headers)
+    response.raise_for_status()
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    return response
+
+
+class AsyncFetcher:
+    """Lädt viele URLs gleichzeitig mit globaler und hostbezogener Begrenzung."""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, per_host: int = DEFAULT_PER_HOST,
+                 retries: int = 2, backoff: float = 0.5, timeout: float = DEFAULT_TIMEOUT,
+                 session: Optional[requests.Session] = None):
+        """
+        Initialisiert den Fetcher.
+
+        Args:
+            max_connections: Maximale Anzahl gleichzeitiger Abrufe insgesamt
+            per_host: Maximale Anzahl gleichzeitiger Abrufe pro Host
+            retries: Anzahl der Wiederholungen bei vorübergehenden Fehlern
+            backoff: Wartezeit vor der ersten Wiederholung in Sekunden (verdoppelt sich je Versuch)
+            timeout: Timeout eines einzelnen Abrufs in Sekunden
+            session: Zu verwendende Session (Standard: eigene Session mit passendem Pool)
+        """
+        self.max_connections = max(1, max_connections)
+        self.per_host = max(1, min(per_host, self.max_connections))
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or create_session(self.max_connections)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_connections,
+                                            thread_name_prefix='url-fetcher')
+        self._loop = None
+        self._global_limit = None
+        self._host_limits = {}
+
+    def _limits(self, url: str) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        # Semaphoren gehören zu einer Ereignisschleife und werden je Schleife neu angelegt
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global_limit = asyncio.Semaphore(self.max_connections)
+            self._host_limits = {}
+
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._global_limit, self._host_limits[host]
+
+    def _delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Wartezeit vor dem Versuch attempt; ein Retry-After des Servers hat Vorrang."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), MAX_BACKOFF)
+        delay = self.backoff * (2 ** (attempt - 1))
+        # Etwas Streuung, damit wiederholte Abrufe nicht gleichzeitig eintreffen
+        return min(delay + random.uniform(0, delay / 2), MAX_BACKOFF)
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Lädt eine URL unter Einhaltung der Grenzen und wiederholt vorübergehende Fehler.
+
+        Args:
+            url: Die zu ladende URL
+            headers: Zusätzliche Header (z.B. für bedingte Anfragen)
+
+        Returns:
+            Die Antwort (löst nach dem letzten Versuch eine Exception aus)
+        """
+        loop = asyncio.get_running_loop()
+        global_limit, host_limit = self._limits(url)
+        response = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self._delay(attempt, response))
+            try:
+                async with host_limit, global_limit:
+                    response = await loop.run_in_executor(
+                        self._executor, lambda: self.session.get(url, timeout=self.timeout, headers=headers))
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+                if attempt == self.retries:
+                    raise
+                continue
+
+            if response.status_code in RETRY_STATUS and attempt < self.retries:
+                continue
+            response.raise_for_status()
+            if response.encoding is None:
+                response.encoding = 'utf-8'
+            return response
+
+    async def _fetch_or_error(self, url: str, headers: Optional[Dict[str, str]]
+                              ) -> Tuple[str, Union[requests.Response, Exception]]:
+        try:
+            return url, await self.fetch(url, headers)
+        except Exception as e:
+            return url, e
+
+    async def fetch_all(self, urls: Iterable[str], headers: Optional[Dict[str, Dict[str, str]]] = None
+                        ) -> List[Tuple[str, Union[requests.Response, Exception]]]:
+        """
+        Lädt alle URLs gleichzeitig.
+
+        Args:
+            urls: Die zu ladenden URLs
+            headers: Optionale zusätzliche Header je URL
+
+        Returns:
+            Paare aus URL und Antwort bzw. Exception, in der Reihenfolge der Eingabe
+        """
+        headers = headers or {}
+        return await asyncio.gather(*(self._fetch_or_error(url, headers.get(url)) for url in urls))
+
+    def fetch_many(self, urls: Iterable[str], headers: Optional[Dict[str, Dict[str, str]]] = None
+                   ) -> List[Tuple[str, Union[requests.Response, Exception]]]:
+        """Synchroner Einstiegspunkt für fetch_all()."""
+        return asyncio.run(self.fetch_all(list(urls), headers))
+
+    async def _produce(self, urls: List[str], headers: Dict[str, Dict[str, str]],
+                       slots: threading.Semaphore, results: queue.Queue, stopped: threading.Event):
+        """Startet die Abrufe für iter_completed(), sobald ein Platz im Fenster frei ist."""
+        loop = asyncio.get_running_loop()
+
+        async def fetch_one(url):
+            results.put(await self._fetch_or_error(url, headers.get(url)))
+
+        tasks = []
+        for url in urls:
+            await loop.run_in_executor(None, slots.acquire)
+            if stopped.is_set():
+                break
+            tasks.append(asyncio.ensure_future(fetch_one(url)))
+        await asyncio.gather(*tasks)
+
+    def iter_completed(self, urls: Iterable[str], headers: Optional[Dict[str, Dict[str, str]]] = None,
+                       window: int = DEFAULT_WINDOW):
+        """
+        Lädt die URLs im Hintergrund und liefert jede Antwort, sobald sie vorliegt.
+
+        Höchstens window Abrufe laufen bzw. warten auf den Aufrufer; so bleibt der
+        Speicherbedarf auch bei vielen URLs begrenzt.
+
+        Args:
+            urls: Die zu ladenden URLs
+            headers: Optionale zusätzliche Header je URL
+            window: Maximale Anzahl geladener, noch nicht abgeholter Antworten
+
+        Yields:
+            Paare aus URL und Antwort bzw. Exception, in der Reihenfolge der Fertigstellung
+        """
+        urls = list(urls)
+        slots = threading.Semaphore(max(1, window))
+        results = queue.Queue()
+        stopped = threading.Event()
+
+        def run():
+            try:
+                asyncio.run(self._produce(urls, headers or {}, slots, results, stopped))
+            except BaseException as e:
+                results.put((None, e))
+
+        producer = threading.Thread(target=run, name='url-fetcher-loop', daemon=True)
+        producer.start()
+        try:
+            for _ in urls:
+                url, response = results.get()
+                if url is None:
+                    raise response
+                slots.release()
+                yield url, response
+        finally:
+            # Bei vorzeitigem Abbruch keine weiteren Abrufe starten
+            stopped.set()
+            for _ in urls:
+                slots.release()
+            producer.join()
+
+    def close(self):
+        """Beendet den Thread-Pool und schließt die Verbindungen."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class DownloadLimitError(Exception):
+    """Ein gestreamter Download hat die Byte- oder Zeitgrenze überschritten."""
+
+    def __init__(self, message: str, limit: str):
+        """
+        Args:
+            message: Fehlermeldung
+            limit: Die überschrittene Grenze ('bytes' oder 'seconds')
+        """
+        super().__init__(message)
+        self.limit = limit
+
+
+class StreamingDownload:
+    """
+    Lädt eine URL blockweise und liefert den Inhalt als inkrementell dekodierten Text.
+
+        with StreamingDownload(url, max_bytes=5 * 1024 * 1024) as download:
+            for text in download:
+                parser.feed(text)
+    """
+
+    def __init__(self, url: str, max_bytes: Optional[int] = None, max_seconds: Optional[float] = None,
+                 chunk_size: int = DOWNLOAD_CHUNK_SIZE, session: Optional[requests.Session] = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialisiert den Download. Die Verbindung wird erst mit "with" geöffnet.
+
+        Args:
+            url: Die zu ladende URL
+            max_bytes: Maximale Anzahl (entpackter) Bytes (Standard: DEFAULT_MAX_DOWNLOAD_BYTES)
+            max_seconds: Maximale Dauer des Downloads (Standard: DEFAULT_MAX_DOWNLOAD_SECONDS)
+            chunk_size: Größe der gelesenen Blöcke in Bytes
+            session: Session (Standard: shared_session())
+            timeout: Timeout für Verbindungsaufbau und einzelne Lesevorgänge in Sekunden
+        """
+        self.url = url
+        self.max_bytes = max_bytes or DEFAULT_MAX_DOWNLOAD_BYTES
+        self.max_seconds = max_seconds or DEFAULT_MAX_DOWNLOAD_SECONDS
+        self.chunk_size = chunk_size
+        self.session = session
+        self.timeout = timeout
+        self.response = None
+        self.status_code = None
+        self.bytes_received = 0
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        self.response = (self.session or shared_session()).get(
+            self.url, stream=True, timeout=min(self.timeout, self.max_seconds))
+        try:
+            self.response.raise_for_status()
+            length = self.response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > self.max_bytes:
+                raise self._bytes_exceeded()
+        except BaseException:
+            self.response.close()
+            raise
+        self.status_code = self.response.status_code
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.response.close()
+
+    def _bytes_exceeded(self) -> DownloadLimitError:
+        return DownloadLimitError(
+            f'Download von {self.url} abgebrochen: mehr als {self.max_bytes} Bytes', 'bytes')
+
+    def _iter_chunks(self):
+        raw = self.response.raw
+        if not hasattr(raw, 'read1'):
+            yield from self.response.iter_content(self.chunk_size)
+            return
+        # read1() (urllib3 >= 2) liefert, was bereits angekommen ist, statt auf einen vollen
+        # Block zu warten; sonst würde ein langsam tröpfelnder Server die Zeitgrenze aushebeln
+        while True:
+            chunk = raw.read1(self.chunk_size, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+
+    def __iter__(self):
+        try:
+            decoder = codecs.getincrementaldecoder(self.response.encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        # Gezählt wird die entpackte Größe (schützt auch vor gzip-Bomben)
+        for chunk in self._iter_chunks():
+            self.bytes_received += len(chunk)
+            if self.bytes_received > self.max_bytes:
+                raise self._bytes_exceeded()
+            if time.monotonic() - self._started > self.max_seconds:
+                raise DownloadLimitError(
+                    f'Download von {self.url} abgebrochen: Zeitlimit von {self.max_seconds:g} s überschritten',
+                    'seconds')
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text